@@ -0,0 +1,147 @@
+# app/api/execution.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from typing import Optional, Dict, Any
+from datetime import datetime
+from bson import ObjectId
+from app.core.dependencies import get_api_key_required
+from app.schemas.execution import ExecuteRequest
+from app.schemas.prompt import PromptVersionServing
+from app.services.execution_log_service import ExecutionLogService
+from app.services.llm_service import LLMService
+from app.services.prompt_service import PromptService
+from app.services.validation_service import ValidationService
+
+router = APIRouter(tags=["execution"])
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+# model_params keys forwarded to the provider call
+MODEL_PARAM_KEYS = ("temperature", "max_tokens", "top_p", "frequency_penalty", "presence_penalty")
+
+@router.post("/execute/{prompt_id}/latest")
+async def execute_latest(
+    prompt_id: str,
+    request: ExecuteRequest,
+    application_id: str = Depends(get_api_key_required)
+) -> Dict[str, Any]:
+    """Execute the most recently published version of a prompt"""
+    service = PromptService()
+    await get_prompt_or_404(service, application_id, prompt_id)
+    serving = await service.get_latest_published(prompt_id)
+    if not serving:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No published version")
+    return await run_version(serving, request, application_id)
+
+@router.post("/execute/{prompt_id}/{version}")
+async def execute_version(
+    prompt_id: str,
+    version: str,
+    request: ExecuteRequest,
+    application_id: str = Depends(get_api_key_required)
+) -> Dict[str, Any]:
+    """Execute a specific version of a prompt"""
+    service = PromptService()
+    await get_prompt_or_404(service, application_id, prompt_id)
+    serving = await service.get_serving_version(prompt_id, version)
+    if not serving:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Version not found")
+    return await run_version(serving, request, application_id)
+
+async def get_prompt_or_404(service: PromptService, application_id: str, prompt_id: str):
+    info = await service.get_prompt_info(application_id, prompt_id) if ObjectId.is_valid(prompt_id) else None
+    if not info:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prompt not found")
+    return info
+
+async def run_version(
+    serving: PromptVersionServing,
+    request: ExecuteRequest,
+    application_id: str
+) -> Dict[str, Any]:
+    """
+    Run a version and log the result. Versions with guardrails are streamed
+    so a violation closes the provider request instead of paying for the
+    rest of the generation.
+    """
+    params = {key: serving.model_params[key] for key in MODEL_PARAM_KEYS if key in serving.model_params}
+    params.update(request.model_dump(include={"temperature", "max_tokens", "overflow"}, exclude_none=True))
+    if serving.system_prompt:
+        params["system_prompt"] = serving.system_prompt
+    provider = request.provider or serving.model_params.get("provider", "openai")
+    model = request.model or serving.model_params.get("model", "gpt-3.5-turbo")
+
+    llm = LLMService()
+    guardrail_config = dict(serving.guardrail_config)
+    expected_format = guardrail_config.pop("expected_format", None) or {}
+    if guardrail_config or expected_format:
+        guardrail = ValidationService().streaming_guardrail(expected_format, guardrail_config)
+        result = await llm.execute_streaming(
+            serving.content, provider, model, request.input_data, guardrail=guardrail, **params
+        )
+    else:
+        result = await llm.execute_single(serving.content, provider, model, request.input_data, **params)
+
+    log = await ExecutionLogService().record_execution(
+        result,
+        provider,
+        model,
+        request.input_data,
+        prompt_version_id=str(serving.id),
+        application_id=application_id
+    )
+    return {
+        **result,
+        "execution_id": str(log.id),
+        "prompt_id": str(serving.prompt_id),
+        "version": serving.version
+    }
+
+@router.get("/logs")
+async def list_execution_logs(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1),
+    application_id: str = Depends(get_api_key_required)
+):
+    """List execution logs, newest first, using an opaque keyset cursor"""
+    service = ExecutionLogService()
+    try:
+        return await service.list_logs(
+            application_id,
+            start_date=start_date,
+            end_date=end_date,
+            status=status_filter,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/logs/export")
+async def export_execution_logs(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    application_id: str = Depends(get_api_key_required)
+):
+    """Stream every matching execution log as NDJSON or CSV"""
+    service = ExecutionLogService()
+    filters = {"start_date": start_date, "end_date": end_date, "status": status_filter}
+
+    if format == "csv":
+        body = service.export_csv(application_id, **filters)
+    else:
+        body = service.export_ndjson(application_id, **filters)
+
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=execution_logs.{format}"}
+    )
@@ -0,0 +1,193 @@
+# app/api/extraction.py
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi.responses import StreamingResponse
+from bson import ObjectId
+from typing import List, Dict, Any, AsyncIterator, Optional
+import asyncio
+import httpx
+import json
+import os
+import tempfile
+from app.config import settings
+from app.core.dependencies import get_api_key_required
+from app.core.exceptions import ExtractionFailedError
+from app.schemas.extraction import UrlExtractionRequest, BulkExtractionRequest
+from app.services.extraction_service import ExtractionService
+from app.services.extraction_job_service import ExtractionJobService
+
+router = APIRouter(prefix="/extract", tags=["extraction"])
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+async def spool_upload(upload: UploadFile, suffix: str) -> str:
+    """Copy an upload to a temp file in fixed-size chunks, enforcing the size limit"""
+    max_bytes = settings.max_upload_size_mb * 1024 * 1024
+    written = 0
+
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            # Disk writes run in a thread so a slow volume doesn't stall the event loop
+            while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Upload exceeds {settings.max_upload_size_mb} MB"
+                    )
+                await asyncio.to_thread(out.write, chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+
+    return path
+
+async def ndjson_prompts(
+    service: ExtractionService,
+    text: str,
+    source_type: str,
+    source_url: Optional[str],
+    application_id: str
+) -> AsyncIterator[str]:
+    """One {"type": "prompt"} line per prompt as its chunk finishes, then a {"type": "done"} summary"""
+    failed_chunks: List[Dict[str, Any]] = []
+    prompt_count = 0
+    async for prompt in service.stream_prompts_from_text(
+        text,
+        source_type=source_type,
+        source_url=source_url,
+        application_id=application_id,
+        failed_chunks=failed_chunks
+    ):
+        prompt_count += 1
+        yield json.dumps({"type": "prompt", "prompt": prompt}) + "\n"
+    yield json.dumps({
+        "type": "done",
+        "prompt_count": prompt_count,
+        "failed_chunks": sorted(failed_chunks, key=lambda failure: failure["chunk"])
+    }) + "\n"
+
+@router.post("/url")
+async def extract_url(
+    request: UrlExtractionRequest,
+    application_id: str = Depends(get_api_key_required)
+) -> List[Dict]:
+    """Extract prompts from a web page"""
+    try:
+        return await ExtractionService().extract_from_url(request.url, application_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except (httpx.HTTPError, ExtractionFailedError) as e:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
+
+@router.post("/url/stream")
+async def extract_url_stream(
+    request: UrlExtractionRequest,
+    application_id: str = Depends(get_api_key_required)
+):
+    """Stream NDJSON prompts from a web page as each chunk is extracted"""
+    service = ExtractionService()
+    try:
+        text = await service.fetch_url_text(request.url)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
+
+    return StreamingResponse(
+        ndjson_prompts(service, text, "web", request.url, application_id),
+        media_type="application/x-ndjson"
+    )
+
+@router.post("/bulk", status_code=status.HTTP_202_ACCEPTED)
+async def extract_bulk(
+    request: BulkExtractionRequest,
+    application_id: str = Depends(get_api_key_required)
+) -> Dict[str, Any]:
+    """Queue a bulk extraction job; progress is available from /extract/jobs/{job_id}"""
+    job = await ExtractionJobService().create_job(application_id, request.urls)
+    return {"job_id": str(job.id), "status": job.status, "total": job.total}
+
+@router.get("/jobs/{job_id}")
+async def get_extraction_job(
+    job_id: str,
+    include_results: bool = False,
+    application_id: str = Depends(get_api_key_required)
+) -> Dict[str, Any]:
+    """Job progress, per-source status and optionally the prompts found so far"""
+    service = ExtractionJobService()
+    job = await get_job_or_404(service, job_id, application_id)
+
+    response = {**service.progress(job), "items": job.items}
+    if include_results:
+        response["results"] = await service.get_results(job_id)
+    return response
+
+@router.get("/jobs/{job_id}/events")
+async def stream_extraction_job(
+    job_id: str,
+    application_id: str = Depends(get_api_key_required)
+):
+    """Stream NDJSON progress updates until the job finishes"""
+    service = ExtractionJobService()
+    await get_job_or_404(service, job_id, application_id)
+
+    return StreamingResponse(
+        service.watch_job(job_id, application_id),
+        media_type="application/x-ndjson"
+    )
+
+async def get_job_or_404(service: ExtractionJobService, job_id: str, application_id: str):
+    job = await service.get_job(job_id, application_id) if ObjectId.is_valid(job_id) else None
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+@router.post("/pdf")
+async def extract_pdf(
+    file: UploadFile = File(...),
+    application_id: str = Depends(get_api_key_required)
+) -> List[Dict]:
+    """Extract prompts from an uploaded PDF"""
+    if not (file.filename or "").lower().endswith(".pdf"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only PDF uploads are supported"
+        )
+
+    path = await spool_upload(file, suffix=".pdf")
+    try:
+        return await ExtractionService().extract_from_pdf(path, application_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ExtractionFailedError as e:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
+    finally:
+        os.unlink(path)
+
+@router.post("/pdf/stream")
+async def extract_pdf_stream(
+    file: UploadFile = File(...),
+    application_id: str = Depends(get_api_key_required)
+):
+    """Stream NDJSON prompts from an uploaded PDF as each chunk is extracted"""
+    if not (file.filename or "").lower().endswith(".pdf"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only PDF uploads are supported"
+        )
+
+    service = ExtractionService()
+    path = await spool_upload(file, suffix=".pdf")
+    try:
+        # Parsed up front so an unreadable file is still a 400, not a broken stream
+        text = await service.read_pdf_text(path)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    finally:
+        os.unlink(path)
+
+    return StreamingResponse(
+        ndjson_prompts(service, text, "pdf", None, application_id),
+        media_type="application/x-ndjson"
+    )
@@ -0,0 +1,129 @@
+# app/api/prompts.py
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import List, Dict, Any, Optional
+from bson import ObjectId
+from app.core.dependencies import get_api_key_required
+from app.core.http_cache import conditional_response
+from app.schemas.prompt import PromptVersionHistory, PromptVersionServing, BoostRequest, BatchBoostRequest
+from app.services.metaprompt_service import MetapromptService
+from app.services.prompt_service import PromptService
+from app.services.version_store import version_store
+
+router = APIRouter(prefix="/prompts", tags=["prompts"])
+
+def validate_prompt_id(prompt_id: str) -> str:
+    if not ObjectId.is_valid(prompt_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prompt not found")
+    return prompt_id
+
+# Reads below answer If-None-Match with 304, so polling clients such as the
+# Streamlit editor only pay for a round trip when nothing changed
+
+@router.get("")
+async def list_prompts(
+    request: Request,
+    application_id: str = Depends(get_api_key_required)
+):
+    """Active prompts of the caller's application, for selectors"""
+    return conditional_response(request, await PromptService().list_prompts(application_id))
+
+@router.get("/editor")
+async def editor_bootstrap(
+    request: Request,
+    prompt_id: Optional[str] = None,
+    application_id: str = Depends(get_api_key_required)
+):
+    """Prompt list, prompt info and the open version for the editor, in one response"""
+    if prompt_id is not None:
+        validate_prompt_id(prompt_id)
+    bootstrap = await PromptService().get_editor_bootstrap(application_id, prompt_id)
+    if prompt_id is not None and bootstrap["prompt"] is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prompt not found")
+    return conditional_response(request, bootstrap)
+
+@router.post("/boost")
+async def boost_prompt(
+    request: BoostRequest,
+    application_id: str = Depends(get_api_key_required)
+) -> Dict[str, Any]:
+    """Enhance a prompt; repeated requests are served from cache unless regenerate is set"""
+    return await MetapromptService().boost(
+        request.original_prompt,
+        request.context,
+        template_name=request.template_name,
+        regenerate=request.regenerate
+    )
+
+@router.post("/boost/batch")
+async def boost_prompts(
+    request: BatchBoostRequest,
+    application_id: str = Depends(get_api_key_required)
+) -> Dict[str, Any]:
+    """Enhance the current version of one page of the application's prompts concurrently"""
+    if request.prompt_ids and not all(ObjectId.is_valid(prompt_id) for prompt_id in request.prompt_ids):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid prompt id")
+    if request.cursor and not ObjectId.is_valid(request.cursor):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return await MetapromptService().boost_application(
+        application_id,
+        request.context,
+        template_name=request.template_name,
+        regenerate=request.regenerate,
+        prompt_ids=request.prompt_ids,
+        cursor=request.cursor,
+        limit=request.limit
+    )
+
+@router.get("/{prompt_id}")
+async def get_prompt(
+    request: Request,
+    prompt_id: str = Depends(validate_prompt_id),
+    application_id: str = Depends(get_api_key_required)
+):
+    info = await PromptService().get_prompt_info(application_id, prompt_id)
+    if info is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prompt not found")
+    return conditional_response(request, info)
+
+@router.get("/{prompt_id}/versions/history", response_model=List[PromptVersionHistory])
+async def get_version_history(
+    request: Request,
+    prompt_id: str = Depends(validate_prompt_id),
+    limit: int = Query(50, ge=1, le=500),
+    application_id: str = Depends(get_api_key_required)
+):
+    """Version history without content bodies; use /diff to compare versions"""
+    history = await PromptService().get_version_history(application_id, prompt_id, limit=limit)
+    if history is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prompt not found")
+    return conditional_response(request, history)
+
+@router.get("/{prompt_id}/versions/diff")
+async def diff_versions(
+    request: Request,
+    from_version: str,
+    to_version: str,
+    prompt_id: str = Depends(validate_prompt_id),
+    application_id: str = Depends(get_api_key_required)
+):
+    """Unified diffs of content, system prompt and metaprompt between two versions"""
+    try:
+        diff = await version_store.diff(application_id, prompt_id, from_version, to_version)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return conditional_response(request, diff)
+
+@router.get("/{prompt_id}/versions/{version}", response_model=PromptVersionServing)
+async def get_version(
+    request: Request,
+    version: str,
+    prompt_id: str = Depends(validate_prompt_id),
+    application_id: str = Depends(get_api_key_required)
+):
+    service = PromptService()
+    if not await service.owns_prompt(application_id, prompt_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prompt not found")
+    serving = await service.get_serving_version(prompt_id, version)
+    if serving is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Version not found")
+    return conditional_response(request, serving, last_modified=serving.updated_at or serving.created_at)
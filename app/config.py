@@ -7,10 +7,21 @@ class Settings(BaseSettings):
     app_name: str = "PromptHub"
     version: str = "1.0.0"
     debug: bool = False
+    warmup_on_startup: bool = True
+    warmup_max_attempts: int = 3
+    warmup_retry_seconds: float = 2.0  # Doubles after each failed attempt
     
     # MongoDB
     mongodb_url: str = "mongodb://localhost:27017"
     mongodb_db_name: str = "prompthub"
+    mongodb_max_pool_size: int = 50
+    mongodb_min_pool_size: int = 5
+    mongodb_max_idle_time_ms: int = 300000
+    mongodb_wait_queue_timeout_ms: int = 2000
+    mongodb_analytics_url: Optional[str] = None  # Defaults to mongodb_url
+    mongodb_analytics_max_pool_size: int = 10
+    mongodb_analytics_min_pool_size: int = 1
+    mongodb_analytics_read_preference: str = "secondaryPreferred"
     
     # Redis
     redis_url: str = "redis://localhost:6379"
@@ -24,17 +35,81 @@ class Settings(BaseSettings):
     # LLM Providers
     openai_api_key: Optional[str] = None
     anthropic_api_key: Optional[str] = None
+    openai_base_url: Optional[str] = None  # e.g. a proxy or the benchmark fake provider
+    anthropic_base_url: Optional[str] = None
+    context_overflow: str = "reject"  # or "trim": cut the prompt to fit the context window
+    llm_provider_concurrency: int = 16  # in-flight requests per provider, per process
     
     # Embeddings
     embedding_model: str = "all-MiniLM-L6-v2"
     embedding_dimension: int = 768
     
+    # Validation
+    critique_cache_ttl_hours: int = 24
+    
+    # Metaprompt Boosting
+    metaprompt_cache_ttl_hours: int = 720
+    metaprompt_batch_concurrency: int = 32
+    metaprompt_batch_page_size: int = 50  # Prompts boosted per /boost/batch request
+    
+    # Version History
+    version_snapshot_interval: int = 20
+    version_delta_max_ratio: float = 0.5
+    version_body_cache_ttl_hours: int = 24
+    
+    # Prompt Dependencies
+    dependency_cache_ttl_hours: int = 24
+    
+    # Near-duplicate Detection
+    dedup_num_perm: int = 128
+    dedup_bands: int = 32
+    dedup_threshold: float = 0.6
+    dedup_refresh_seconds: float = 30.0
+    dedup_sync_overlap_seconds: float = 120.0  # Covers clock skew and late commits between writers
+    
     # Rate Limiting
     rate_limit_per_minute: int = 60
     
     # File Upload
     max_upload_size_mb: int = 10
     allowed_file_types: list = [".pdf", ".txt", ".md"]
+    max_pdf_pages: int = 500
+    pdf_pages_per_batch: int = 10
+    pdf_worker_processes: int = 2
+    
+    # Extraction
+    extraction_chunk_size: int = 4000
+    extraction_chunk_overlap: int = 400
+    extraction_concurrency: int = 4
+    extraction_cache_ttl_hours: int = 168
+    extraction_worker_concurrency: int = 4
+    extraction_worker_poll_seconds: float = 2.0
+    extraction_job_lease_seconds: int = 120
+    extraction_job_max_attempts: int = 3
+    
+    # URL Fetching
+    fetch_timeout_seconds: float = 15.0
+    fetch_max_size_mb: int = 5
+    fetch_max_connections: int = 20
+    fetch_cache_ttl_hours: int = 24
+    
+    # Execution Logs
+    log_page_size_max: int = 200
+    log_export_batch_size: int = 500
+    
+    # Webhooks
+    webhook_max_attempts: int = 8
+    webhook_backoff_base_seconds: float = 5.0
+    webhook_max_backoff_seconds: float = 3600.0
+    webhook_per_endpoint_concurrency: int = 4
+    webhook_dispatch_batch_size: int = 100
+    webhook_poll_interval_seconds: float = 1.0
+    webhook_lease_seconds: int = 60
+    webhook_max_in_flight: int = 200
+    webhook_secret_cache_seconds: int = 60
+    
+    # Metrics
+    metrics_enabled: bool = True
     
     class Config:
         env_file = ".env"
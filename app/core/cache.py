@@ -1,9 +1,10 @@
 # app/core/cache.py
 from redis import asyncio as aioredis
-from typing import Optional, Any
+from typing import Optional, Any, List, Iterable
 import json
 from datetime import timedelta
 from app.config import settings
+from app.core.metrics import timed
 
 class CacheManager:
     def __init__(self):
@@ -16,6 +17,7 @@ class CacheManager:
             decode_responses=True
         )
     
+    @timed("cache")
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
         if not self.redis:
@@ -26,6 +28,7 @@ class CacheManager:
             return json.loads(value)
         return None
     
+    @timed("cache")
     async def set(
         self,
         key: str,
@@ -42,6 +45,7 @@ class CacheManager:
         else:
             await self.redis.set(key, serialized)
     
+    @timed("cache")
     async def delete(self, key: str):
         """Delete key from cache"""
         if not self.redis:
@@ -49,6 +53,48 @@ class CacheManager:
         
         await self.redis.delete(key)
     
+    @timed("cache")
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several values in one round trip"""
+        if not self.redis:
+            await self.init()
+        
+        if not keys:
+            return []
+        values = await self.redis.mget(keys)
+        return [json.loads(value) if value else None for value in values]
+    
+    @timed("cache")
+    async def add_to_sets(
+        self,
+        keys: Iterable[str],
+        member: str,
+        expire: Optional[timedelta] = None
+    ):
+        """Add member to every set in keys"""
+        if not self.redis:
+            await self.init()
+        
+        pipe = self.redis.pipeline()
+        for key in keys:
+            pipe.sadd(key, member)
+            if expire:
+                pipe.expire(key, int(expire.total_seconds()))
+        await pipe.execute()
+    
+    @timed("cache")
+    async def pop_set(self, key: str) -> List[str]:
+        """Return all members of a set and delete it"""
+        if not self.redis:
+            await self.init()
+        
+        pipe = self.redis.pipeline()
+        pipe.smembers(key)
+        pipe.delete(key)
+        members, _ = await pipe.execute()
+        return list(members)
+    
+    @timed("cache")
     async def invalidate_pattern(self, pattern: str):
         """Invalidate all keys matching pattern"""
         if not self.redis:
@@ -4,6 +4,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from bson import ObjectId
 from app.models.application import Application
+from app.core.metrics import span
 from app.services.auth_service import AuthService
 
 security = HTTPBearer()
@@ -13,7 +14,8 @@ async def get_api_key(
 ) -> Optional[str]:
     if credentials:
         auth_service = AuthService()
-        app = await auth_service.verify_api_key(credentials.credentials)
+        with span("auth"):
+            app = await auth_service.verify_api_key(credentials.credentials)
         if not app:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
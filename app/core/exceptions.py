@@ -0,0 +1,24 @@
+# app/core/exceptions.py
+
+class ContextWindowExceededError(ValueError):
+    """Input plus requested output tokens do not fit the model's context window"""
+
+    def __init__(self, provider: str, model: str, input_tokens: int, max_output_tokens: int, context_window: int):
+        self.provider = provider
+        self.model = model
+        self.input_tokens = input_tokens
+        self.max_output_tokens = max_output_tokens
+        self.context_window = context_window
+        super().__init__(
+            f"{provider}/{model}: {input_tokens} input tokens + {max_output_tokens} output tokens "
+            f"exceeds the {context_window}-token context window"
+        )
+
+class ExtractionFailedError(RuntimeError):
+    """Every chunk of a document failed to extract, so there is no partial result to return"""
+
+    def __init__(self, failed_chunks: list):
+        self.failed_chunks = failed_chunks
+        super().__init__(
+            f"Extraction failed for all {len(failed_chunks)} chunks: {failed_chunks[0]['error']}"
+        )
@@ -0,0 +1,59 @@
+# app/core/http_cache.py
+from typing import Any, Optional
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+import hashlib
+import json
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+# Clients may keep responses but must revalidate them with If-None-Match
+CACHE_CONTROL = "private, no-cache"
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    candidates = (tag.strip().removeprefix("W/") for tag in header.split(","))
+    return etag in candidates
+
+def _not_modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+def conditional_response(
+    request: Request,
+    payload: Any,
+    last_modified: Optional[datetime] = None
+) -> Response:
+    """
+    JSON response carrying an ETag (and Last-Modified when known), or an
+    empty 304 when the client's If-None-Match / If-Modified-Since still holds
+    """
+    body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode()
+    headers = {"ETag": make_etag(body), "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, headers["ETag"])
+    elif if_modified_since and last_modified is not None:
+        not_modified = _not_modified_since(if_modified_since, last_modified)
+    else:
+        not_modified = False
+
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
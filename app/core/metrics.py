@@ -0,0 +1,125 @@
+# app/core/metrics.py
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, Iterator, Optional
+import time
+from pymongo import monitoring
+from app.config import settings
+
+# Stage timings for the request being handled. The dict is shared by every
+# task spawned from the request, so concurrent stages can sum past wall time.
+_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("stages", default=None)
+
+if settings.metrics_enabled:
+    from prometheus_client import Histogram
+
+    STAGE_SECONDS = Histogram(
+        "prompthub_stage_duration_seconds",
+        "Time spent in each hot-path stage",
+        ["stage"],
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+    )
+    MONGO_COMMAND_SECONDS = Histogram(
+        "prompthub_mongo_command_duration_seconds",
+        "MongoDB command round trips by command name",
+        ["command"],
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+    )
+
+def record(stage: str, seconds: float):
+    """Observe a stage duration and add it to the current request's breakdown"""
+    if not settings.metrics_enabled:
+        return
+    STAGE_SECONDS.labels(stage).observe(seconds)
+    stages = _stages.get()
+    if stages is not None:
+        stages[stage] = stages.get(stage, 0.0) + seconds * 1000
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.stage, time.perf_counter() - self.start)
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+def span(stage: str):
+    """Time a block: `with span("template"): ...`"""
+    return _Span(stage) if settings.metrics_enabled else _NOOP_SPAN
+
+def timed(stage: str):
+    """Time every call of an async function; returns it unwrapped when metrics are off"""
+    def decorator(func):
+        if not settings.metrics_enabled:
+            return func
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+@contextmanager
+def collect_stages() -> Iterator[Dict[str, float]]:
+    """Collect stage timings recorded until the block exits"""
+    stages: Dict[str, float] = {}
+    token = _stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _stages.reset(token)
+
+def stage_breakdown() -> Optional[Dict[str, float]]:
+    """Milliseconds per stage recorded so far in the current request"""
+    stages = _stages.get()
+    if not stages:
+        return None
+    return {stage: round(ms, 2) for stage, ms in stages.items()}
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Times every command on the serving client. Motor runs PyMongo with the
+    caller's context copied, so commands land in the request's breakdown.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._observe(event)
+
+    def failed(self, event):
+        self._observe(event)
+
+    def _observe(self, event):
+        seconds = event.duration_micros / 1_000_000
+        MONGO_COMMAND_SECONDS.labels(event.command_name).observe(seconds)
+        record("mongo", seconds)
+
+mongo_command_metrics = MongoCommandMetrics()
+
+def render_metrics():
+    """Prometheus text exposition of the default registry"""
+    from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
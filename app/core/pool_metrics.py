@@ -0,0 +1,80 @@
+# app/core/pool_metrics.py
+from typing import Dict, Any
+from pymongo import monitoring
+import threading
+import time
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool checkout and wait-time counters for one MongoClient.
+    PyMongo emits check-out started/finished on the same thread, so the
+    wait is timed with a thread-local start mark.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.open_connections = 0
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pool": self.name,
+                "open_connections": self.open_connections,
+                "checked_out": self.checked_out,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "wait_ms_avg": round(self.wait_ms_total / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(self.wait_ms_max, 3)
+            }
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        waited = (time.perf_counter() - getattr(self._local, "started", time.perf_counter())) * 1000
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.wait_ms_total += waited
+            self.wait_ms_max = max(self.wait_ms_max, waited)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections -= 1
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+serving_pool_metrics = PoolMetrics("serving")
+analytics_pool_metrics = PoolMetrics("analytics")
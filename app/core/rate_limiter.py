@@ -3,6 +3,7 @@ from fastapi import HTTPException, Request
 from redis import asyncio as aioredis
 from datetime import datetime, timedelta
 from app.config import settings
+from app.core.metrics import timed
 
 class RateLimiter:
     def __init__(self):
@@ -15,6 +16,7 @@ class RateLimiter:
             decode_responses=True
         )
     
+    @timed("rate_limit")
     async def check_rate_limit(self, key: str, limit: int = None) -> bool:
         """Check if request is within rate limit"""
         if not self.redis:
@@ -0,0 +1,96 @@
+# app/core/warmup.py
+from typing import Awaitable, Callable, Dict, Any, List, Optional
+import asyncio
+import logging
+import time
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+class WarmupManager:
+    """
+    Loads heavy dependencies and models in the background after startup so
+    the app starts serving immediately; /ready reports when everything is warm.
+
+    Failed steps are retried with backoff. Once an optional step has used up
+    its attempts it is reported as degraded instead of holding readiness
+    back, since the dependency still loads lazily on first use. When warm-up
+    is disabled nothing is preloaded and the app is ready at once.
+    """
+
+    def __init__(self):
+        self._steps: Dict[str, Callable[[], Awaitable[Any]]] = {}
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._required: Dict[str, bool] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._started = False
+
+    def register(self, name: str, step: Callable[[], Awaitable[Any]], required: bool = True):
+        self._steps[name] = step
+        self._required[name] = required
+        self._state[name] = {"status": "pending", "attempts": 0, "duration_ms": None, "error": None}
+
+    def start(self):
+        if not self._task:
+            self._started = True
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def degraded(self) -> List[str]:
+        return [
+            name for name, state in self._state.items()
+            if state["status"] == "failed" and not self._required[name]
+        ]
+
+    @property
+    def is_ready(self) -> bool:
+        if not self._started:
+            return True
+        return all(
+            state["status"] == "ready" or name in self.degraded
+            for name, state in self._state.items()
+        )
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.is_ready,
+            "warmup": "running" if self._started else "disabled",
+            "degraded": self.degraded,
+            "components": self._state
+        }
+
+    async def _run(self):
+        await asyncio.gather(*(self._run_step(name, step) for name, step in self._steps.items()))
+
+    async def _run_step(self, name: str, step: Callable[[], Awaitable[Any]]):
+        state = self._state[name]
+        for attempt in range(1, settings.warmup_max_attempts + 1):
+            start = time.perf_counter()
+            state.update(status="loading", attempts=attempt)
+            try:
+                await step()
+            except Exception as e:
+                logger.exception("Warm-up step %s failed (attempt %d)", name, attempt)
+                # Failed only once retries are exhausted, so /ready can't flap on a retry
+                state["error"] = str(e)
+                if attempt == settings.warmup_max_attempts:
+                    state["status"] = "failed"
+            else:
+                state.update(status="ready", error=None)
+            finally:
+                state["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+            if state["status"] != "loading":
+                return
+            await asyncio.sleep(settings.warmup_retry_seconds * 2 ** (attempt - 1))
+
+warmup_manager = WarmupManager()
@@ -1,8 +1,12 @@
 # app/database.py
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from beanie import init_beanie
-from typing import Optional
-import os
+from typing import Optional, Dict, Any, List
+import asyncio
+
+from app.config import settings
+from app.core.metrics import mongo_command_metrics
+from app.core.pool_metrics import serving_pool_metrics, analytics_pool_metrics
 
 from app.models.user import User
 from app.models.prompt import Prompt, PromptVersion
@@ -10,23 +14,50 @@ from app.models.execution import ExecutionLog
 from app.models.feedback import Feedback
 from app.models.application import Application
 from app.models.prompt_source import PromptSource
+from app.models.webhook import Webhook, WebhookDelivery
+from app.models.extraction_job import ExtractionJob
+from app.models.prompt_dependency import PromptDependency
+from app.models.version_tombstone import VersionTombstone
+from app.services.version_store import version_store
 
 class MongoDB:
     client: Optional[AsyncIOMotorClient] = None
+    # Separate pool for heavy aggregations, routed to secondaries when available
+    analytics_client: Optional[AsyncIOMotorClient] = None
 
 db = MongoDB()
 
 async def connect_to_mongodb():
-    """Create database connection"""
+    """Create database connections"""
     db.client = AsyncIOMotorClient(
-        os.getenv("MONGODB_URL", "mongodb://localhost:27017"),
-        maxPoolSize=10,
-        minPoolSize=1
+        settings.mongodb_url,
+        maxPoolSize=settings.mongodb_max_pool_size,
+        minPoolSize=settings.mongodb_min_pool_size,
+        maxIdleTimeMS=settings.mongodb_max_idle_time_ms,
+        waitQueueTimeoutMS=settings.mongodb_wait_queue_timeout_ms,
+        appname=f"{settings.app_name}-serving",
+        event_listeners=(
+            [serving_pool_metrics, mongo_command_metrics]
+            if settings.metrics_enabled else [serving_pool_metrics]
+        )
+    )
+    db.analytics_client = AsyncIOMotorClient(
+        settings.mongodb_analytics_url or settings.mongodb_url,
+        maxPoolSize=settings.mongodb_analytics_max_pool_size,
+        minPoolSize=settings.mongodb_analytics_min_pool_size,
+        maxIdleTimeMS=settings.mongodb_max_idle_time_ms,
+        readPreference=settings.mongodb_analytics_read_preference,
+        appname=f"{settings.app_name}-analytics",
+        event_listeners=[analytics_pool_metrics]
     )
     
+    database = db.client[settings.mongodb_db_name]
+    # The unique sequence index can only be built once every version is numbered
+    await version_store.backfill_sequences(database[PromptVersion.Settings.name])
+
     # Initialize Beanie with document models
     await init_beanie(
-        database=db.client[os.getenv("MONGODB_DB_NAME", "prompthub")],
+        database=database,
         document_models=[
             User,
             Application,
@@ -34,11 +65,34 @@ async def connect_to_mongodb():
             PromptVersion,
             ExecutionLog,
             Feedback,
-            PromptSource
+            PromptSource,
+            Webhook,
+            WebhookDelivery,
+            ExtractionJob,
+            PromptDependency,
+            VersionTombstone
         ]
     )
 
+    await asyncio.gather(
+        prewarm_pool(db.client, settings.mongodb_min_pool_size),
+        prewarm_pool(db.analytics_client, settings.mongodb_analytics_min_pool_size)
+    )
+
+async def prewarm_pool(client: AsyncIOMotorClient, connections: int):
+    """Open connections up front so the first requests don't pay for handshakes"""
+    if connections > 0:
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(connections)))
+
+def get_analytics_database() -> AsyncIOMotorDatabase:
+    return db.analytics_client[settings.mongodb_db_name]
+
+def get_pool_stats() -> List[Dict[str, Any]]:
+    return [serving_pool_metrics.snapshot(), analytics_pool_metrics.snapshot()]
+
 async def close_mongodb_connection():
-    """Close database connection"""
+    """Close database connections"""
     if db.client:
         db.client.close()
+    if db.analytics_client:
+        db.analytics_client.close()
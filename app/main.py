@@ -0,0 +1,67 @@
+# app/main.py
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from app.config import settings
+from app.core.dependencies import get_api_key_required
+from app.database import connect_to_mongodb, close_mongodb_connection, get_pool_stats
+from app.core.metrics import collect_stages, render_metrics
+from app.core.warmup import warmup_manager
+from app.services.extraction_service import warm_html_parser
+from app.services.llm_service import warm_llm_clients
+from app.services.validation_service import get_embedder
+from app.services.webhook_service import webhook_dispatcher
+from app.utils.fetcher import document_fetcher
+from app.utils.pdf import shutdown_pdf_executor, warm_pdf_pool
+from app.utils.tokens import warm_tokenizers
+from app.api import execution, extraction, prompts
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await connect_to_mongodb()
+    webhook_dispatcher.start()
+    if settings.warmup_on_startup:
+        warmup_manager.start()
+    yield
+    await warmup_manager.stop()
+    await webhook_dispatcher.stop()
+    shutdown_pdf_executor()
+    await document_fetcher.close()
+    await close_mongodb_connection()
+
+# Every execution needs the clients and tokenizers; the rest only serve
+# validation and extraction, which load them lazily if warm-up failed
+warmup_manager.register("llm_clients", warm_llm_clients)
+warmup_manager.register("tokenizers", warm_tokenizers)
+warmup_manager.register("embedder", get_embedder, required=False)
+warmup_manager.register("html_parser", warm_html_parser, required=False)
+warmup_manager.register("pdf_workers", warm_pdf_pool, required=False)
+
+app = FastAPI(title=settings.app_name, version=settings.version, lifespan=lifespan)
+
+if settings.metrics_enabled:
+    @app.middleware("http")
+    async def stage_timings(request: Request, call_next):
+        # Gives every request its own stage breakdown for ExecutionLog.metadata
+        with collect_stages():
+            return await call_next(request)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        body, content_type = render_metrics()
+        return Response(body, media_type=content_type)
+
+app.include_router(execution.router, prefix="/api/v1")
+app.include_router(extraction.router, prefix="/api/v1")
+app.include_router(prompts.router, prefix="/api/v1")
+
+@app.get("/ready")
+async def readiness():
+    """200 once warm-up has loaded every required dependency, or when warm-up is disabled"""
+    status = warmup_manager.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+@app.get("/internal/db/pools", dependencies=[Depends(get_api_key_required)])
+async def db_pool_stats():
+    """Connection pool checkout counts and wait times"""
+    return get_pool_stats()
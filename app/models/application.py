@@ -0,0 +1,17 @@
+# app/models/application.py
+from beanie import Document, Indexed, PydanticObjectId
+from pydantic import Field
+from typing import Optional
+from datetime import datetime
+
+class Application(Document):
+    name: str
+    description: Optional[str] = None
+    api_key_hash: Indexed(str, unique=True)  # sha256 of the API key; the key itself is never stored
+    owner_id: Optional[PydanticObjectId] = None  # Reference to User
+    is_active: bool = True
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None
+
+    class Settings:
+        name = "applications"
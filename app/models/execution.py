@@ -0,0 +1,32 @@
+# app/models/execution.py
+from beanie import Document, PydanticObjectId
+from pydantic import ConfigDict, Field
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+class ExecutionLog(Document):
+    # model_name is a log field, not pydantic's model_ namespace
+    model_config = ConfigDict(protected_namespaces=())
+
+    prompt_version_id: Optional[PydanticObjectId] = None  # Reference to PromptVersion
+    application_id: Optional[PydanticObjectId] = None  # Reference to Application
+    model_provider: str
+    model_name: str
+    input_data: Dict[str, Any] = Field(default_factory=dict)
+    output_data: Dict[str, Any] = Field(default_factory=dict)
+    latency_ms: int = 0
+    token_count: int = 0
+    cost_usd: float = 0.0
+    status: str  # 'success', 'failed', 'timeout', 'aborted'
+    error_message: Optional[str] = None
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "execution_logs"
+        indexes = [
+            "created_at",
+            "prompt_version_id",
+            # Keyset pagination: newest first, _id breaks ties
+            [("application_id", 1), ("created_at", -1), ("_id", -1)]
+        ]
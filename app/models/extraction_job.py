@@ -0,0 +1,30 @@
+# app/models/extraction_job.py
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from typing import List, Optional, Dict, Any
+from datetime import datetime
+
+class ExtractionJob(Document):
+    application_id: PydanticObjectId  # Reference to Application
+    # One entry per source: {"source_url", "status", "prompt_count", "error"};
+    # item status is 'pending', 'processing', 'completed' or 'failed'
+    items: List[Dict[str, Any]] = []
+    status: str = "queued"  # 'queued', 'running', 'completed', 'failed'
+    error: Optional[str] = None  # Why the job failed, when status is 'failed'
+    total: int = 0
+    processed: int = 0
+    failed: int = 0
+    prompt_count: int = 0
+    worker_id: Optional[str] = None
+    attempts: int = 0  # Times a worker has claimed the job, including takeovers
+    locked_until: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        name = "extraction_jobs"
+        indexes = [
+            [("status", 1), ("created_at", 1)],  # Worker claim query
+            "application_id"
+        ]
@@ -0,0 +1,19 @@
+# app/models/feedback.py
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from typing import Optional
+from datetime import datetime
+
+class Feedback(Document):
+    prompt_version_id: PydanticObjectId  # Reference to PromptVersion
+    user_id: Optional[PydanticObjectId] = None  # Reference to User
+    rating: int = Field(..., ge=1, le=5)
+    comment: Optional[str] = None
+    improvement_suggestion: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "feedback"
+        indexes = [
+            "prompt_version_id"
+        ]
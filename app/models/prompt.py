@@ -0,0 +1,5 @@
+# app/models/prompt.py
+# The prompt documents live with their read models in app.schemas.prompt
+from app.schemas.prompt import Prompt, PromptVersion
+
+__all__ = ["Prompt", "PromptVersion"]
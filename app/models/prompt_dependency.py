@@ -0,0 +1,24 @@
+# app/models/prompt_dependency.py
+from beanie import Document, Insert, Replace, Delete, after_event, PydanticObjectId
+from pydantic import Field
+from typing import Dict, Any
+from datetime import datetime
+
+class PromptDependency(Document):
+    prompt_version_id: PydanticObjectId  # Reference to PromptVersion
+    dependency_type: str  # 'system_prompt', 'metaprompt', 'guardrail', etc.
+    dependency_id: PydanticObjectId  # Reference to another PromptVersion
+    config: Dict[str, Any] = Field(default_factory=dict)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "prompt_dependencies"
+        indexes = [
+            [("prompt_version_id", 1), ("dependency_type", 1)],
+            "dependency_id"
+        ]
+
+    @after_event(Insert, Replace, Delete)
+    async def invalidate_resolved_graphs(self):
+        from app.services.dependency_resolver import dependency_resolver
+        await dependency_resolver.invalidate(self.prompt_version_id)
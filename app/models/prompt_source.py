@@ -0,0 +1,31 @@
+# app/models/prompt_source.py
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from typing import Optional, Dict, Any
+from datetime import datetime
+from pymongo import IndexModel
+
+class PromptSource(Document):
+    prompt_id: Optional[PydanticObjectId] = None  # Set once the extracted prompt is imported
+    application_id: Optional[PydanticObjectId] = None
+    source_type: str  # 'web', 'pdf', 'manual'
+    source_url: Optional[str] = None
+    source_content: Optional[str] = None
+    extracted_by: Optional[str] = None
+    extraction_metadata: Dict[str, Any] = Field(default_factory=dict)
+    job_id: Optional[PydanticObjectId] = None  # Reference to ExtractionJob
+    item_index: Optional[int] = None  # Position of the source in the job's items
+    position: Optional[int] = None  # Position of the prompt within that source
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "prompt_sources"
+        indexes = [
+            "prompt_id",
+            # Also the upsert key that makes retried job items idempotent
+            IndexModel(
+                [("job_id", 1), ("item_index", 1), ("position", 1)],
+                unique=True,
+                partialFilterExpression={"job_id": {"$type": "objectId"}}
+            )
+        ]
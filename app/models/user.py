@@ -0,0 +1,17 @@
+# app/models/user.py
+from beanie import Document, Indexed
+from pydantic import Field
+from typing import Optional
+from datetime import datetime
+
+class User(Document):
+    email: Indexed(str, unique=True)
+    password_hash: str
+    full_name: Optional[str] = None
+    is_active: bool = True
+    is_superuser: bool = False
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None
+
+    class Settings:
+        name = "users"
@@ -0,0 +1,18 @@
+# app/models/version_tombstone.py
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from datetime import datetime
+from pymongo import IndexModel
+
+class VersionTombstone(Document):
+    """Records a deleted PromptVersion so other processes drop it from their dedup indexes"""
+    version_id: PydanticObjectId  # Reference to the deleted PromptVersion
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "prompt_version_tombstones"
+        indexes = [
+            # Dedup syncs read tombstones newer than their last sync; a process
+            # that has been away for longer than this reloads from scratch anyway
+            IndexModel([("deleted_at", 1)], expireAfterSeconds=7 * 24 * 3600)
+        ]
@@ -0,0 +1,47 @@
+# app/models/webhook.py
+from beanie import Document, Replace, Save, SaveChanges, Update, Delete, after_event, PydanticObjectId
+from pydantic import Field
+from typing import List, Optional, Dict, Any
+from datetime import datetime
+
+class Webhook(Document):
+    application_id: PydanticObjectId  # Reference to Application
+    url: str
+    secret: str
+    events: List[str] = []
+    is_active: bool = True
+    last_triggered: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "webhooks"
+        indexes = [
+            [("application_id", 1), ("events", 1)]
+        ]
+
+    @after_event(Replace, Save, SaveChanges, Update, Delete)
+    def forget_cached_secret(self):
+        # Other processes pick up a rotated secret when their cache entry expires
+        from app.services.webhook_service import webhook_dispatcher
+        webhook_dispatcher.forget_secret(self.id)
+
+class WebhookDelivery(Document):
+    """Outbox entry for a single webhook event"""
+    webhook_id: PydanticObjectId  # Reference to Webhook
+    url: str
+    event: str
+    payload: Dict[str, Any]
+    status: str = "pending"  # 'pending', 'in_flight', 'delivered', 'dead'
+    attempts: int = 0
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow)
+    locked_until: Optional[datetime] = None
+    last_error: Optional[str] = None
+    delivered_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "webhook_deliveries"
+        indexes = [
+            [("status", 1), ("next_attempt_at", 1)],  # Dispatcher claim query
+            "webhook_id"
+        ]
@@ -0,0 +1,12 @@
+# app/schemas/execution.py
+from pydantic import BaseModel, Field
+from typing import Dict, Any, Optional
+
+class ExecuteRequest(BaseModel):
+    """Run a prompt version; provider, model and parameters default to the version's model_params"""
+    input_data: Dict[str, Any] = Field(default_factory=dict)
+    provider: Optional[str] = None
+    model: Optional[str] = None
+    temperature: Optional[float] = Field(None, ge=0, le=2)
+    max_tokens: Optional[int] = Field(None, ge=1)
+    overflow: Optional[str] = Field(None, pattern="^(reject|trim)$")
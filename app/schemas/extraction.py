@@ -0,0 +1,9 @@
+# app/schemas/extraction.py
+from pydantic import BaseModel, Field
+from typing import List
+
+class UrlExtractionRequest(BaseModel):
+    url: str
+
+class BulkExtractionRequest(BaseModel):
+    urls: List[str] = Field(..., min_length=1, max_length=500)
@@ -1,15 +1,18 @@
-from beanie import Document, Indexed, Link
-from pydantic import Field
-from typing import List, Optional, Dict, Any
+from beanie import Document, Indexed, Link, Insert, Replace, Save, SaveChanges, Update, Delete, before_event, after_event
+from beanie import PydanticObjectId
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+from typing import ClassVar, List, Optional, Dict, Any, Set, Tuple
 from datetime import datetime
-from bson import ObjectId
+from pymongo import IndexModel
+
+SEQUENCE_INDEX_NAME = "prompt_id_1_sequence_1_partial"
 
 class Prompt(Document):
     prompt_id: Indexed(str)  # Human-readable ID
     name: str
     description: Optional[str] = None
-    application_id: Optional[ObjectId] = None
-    created_by: Optional[ObjectId] = None
+    application_id: Optional[PydanticObjectId] = None
+    created_by: Optional[PydanticObjectId] = None
     is_active: bool = True
     created_at: datetime = Field(default_factory=datetime.utcnow)
     current_version: Optional[str] = None
@@ -22,7 +25,8 @@ class Prompt(Document):
         ]
 
 class PromptVersion(Document):
-    prompt_id: ObjectId  # Reference to Prompt
+    model_config = ConfigDict(protected_namespaces=())  # model_params
+    prompt_id: PydanticObjectId  # Reference to Prompt
     version: str  # Semantic versioning
     content: str
     system_prompt: Optional[str] = None
@@ -31,14 +35,191 @@ class PromptVersion(Document):
     model_params: Dict[str, Any] = Field(default_factory=dict)
     guardrail_config: Dict[str, Any] = Field(default_factory=dict)
     embedding: Optional[List[float]] = None  # Vector embedding
+    content_signature: Optional[List[int]] = None  # MinHash for near-duplicate detection
+    signature_updated_at: Optional[datetime] = None  # Dedup indexes sync on this
     is_published: bool = False
-    created_by: Optional[ObjectId] = None
+    created_by: Optional[PydanticObjectId] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None  # Set on document saves; Last-Modified for reads
     metadata: Dict[str, Any] = Field(default_factory=dict)
+    # History storage: 'full' snapshots, or 'delta' against base_version_id
+    sequence: int = 0
+    storage: str = "full"
+    base_version_id: Optional[PydanticObjectId] = None
+    deltas: Dict[str, Any] = Field(default_factory=dict)
+    _stored_bodies: Optional[Dict[str, Optional[str]]] = PrivateAttr(default=None)
+    # A delta version loaded from the database has blank bodies; these track
+    # which ones the caller has since assigned (including to None) and whether
+    # all of them hold real text, so saves never mistake a blank for an edit
+    _assigned_bodies: Set[str] = PrivateAttr(default_factory=set)
+    _materialized: bool = PrivateAttr(default=False)
+    
+    BODY_FIELDS: ClassVar[Tuple[str, ...]] = ("content", "system_prompt", "metaprompt")
     
     class Settings:
         name = "prompt_versions"
         indexes = [
             [("prompt_id", 1), ("version", 1)],  # Compound unique index
-            "embedding"  # Vector search index
-        ]
\ No newline at end of file
+            "embedding",  # Vector search index
+            # Covers PromptVersionListItem reads without touching documents
+            [("prompt_id", 1), ("created_at", -1), ("version", 1),
+             ("is_published", 1), ("created_by", 1), ("_id", 1)],
+            # Latest published version lookup for serving
+            [("prompt_id", 1), ("is_published", 1), ("created_at", -1)],
+            # Two concurrent inserts cannot take the same sequence number; also
+            # serves the latest-sequence lookup, walked backwards. Partial, so
+            # versions written before sequences existed don't block the build;
+            # version_store.backfill_sequences numbers them at startup
+            IndexModel(
+                [("prompt_id", 1), ("sequence", 1)],
+                name=SEQUENCE_INDEX_NAME,
+                unique=True,
+                partialFilterExpression={"sequence": {"$type": "int"}}
+            ),
+            "base_version_id",
+            "signature_updated_at"
+        ]
+    
+    def __setattr__(self, name: str, value: Any):
+        if name in self.BODY_FIELDS:
+            self._assigned_bodies.add(name)
+        super().__setattr__(name, value)
+    
+    async def insert(self, **kwargs):
+        """Insert, taking the next sequence number again if a concurrent insert claimed it"""
+        from app.services.version_store import version_store
+        return await version_store.insert_with_retry(self, super().insert, **kwargs)
+    
+    @before_event(Insert)
+    async def prepare_insert(self):
+        from app.services.dedup_service import duplicate_detector
+        from app.services.version_store import version_store
+        # Duplicate detection needs the full content, so it runs before compression
+        await duplicate_detector.annotate(self)
+        await version_store.prepare_insert(self)
+    
+    @after_event(Insert)
+    def finish_insert(self):
+        from app.services.dedup_service import duplicate_detector
+        from app.services.version_store import version_store
+        duplicate_detector.register(self)
+        version_store.restore(self)
+    
+    @before_event(Replace, Save, SaveChanges)
+    async def prepare_update(self):
+        from app.services.dedup_service import duplicate_detector
+        from app.services.version_store import version_store
+        self.updated_at = datetime.utcnow()
+        await version_store.prepare_update(self)
+        # Re-sign edited content; an unedited delta version has no body loaded
+        if self.storage == "full" or self._stored_bodies:
+            content = self._stored_bodies["content"] if self._stored_bodies else self.content
+            duplicate_detector.sign(self, content or "")
+    
+    @after_event(Replace, Save, SaveChanges, Update)
+    async def finish_update(self):
+        from app.services.dedup_service import duplicate_detector
+        from app.services.dependency_resolver import dependency_resolver
+        from app.services.version_store import version_store
+        version_store.restore(self)
+        duplicate_detector.register(self)
+        await version_store.invalidate(self.id)
+        await dependency_resolver.invalidate(self.id)
+    
+    @before_event(Delete)
+    async def prepare_delete(self):
+        from app.services.version_store import version_store
+        # Deltas based on this snapshot would otherwise be unreadable
+        await version_store.prepare_delete(self)
+    
+    @after_event(Delete)
+    async def finish_delete(self):
+        from app.services.dedup_service import duplicate_detector
+        await duplicate_detector.forget(self.id)
+
+# Projection read models: hot paths load only the fields they use, never
+# the embedding vector. Only search reads PromptVersion.embedding.
+
+class PromptVersionListItem(BaseModel):
+    """Version listings; fully covered by a prompt_versions index"""
+    id: PydanticObjectId = Field(alias="_id")
+    prompt_id: PydanticObjectId
+    version: str
+    is_published: bool = False
+    created_by: Optional[PydanticObjectId] = None
+    created_at: datetime
+    
+    class Settings:
+        projection = {
+            "_id": 1,
+            "prompt_id": 1,
+            "version": 1,
+            "is_published": 1,
+            "created_by": 1,
+            "created_at": 1
+        }
+
+class PromptVersionHistory(PromptVersionListItem):
+    """History tab rows: listing fields plus the small configuration fields"""
+    model_config = ConfigDict(protected_namespaces=())  # model_params
+    required_fields: List[Dict[str, Any]] = []
+    model_params: Dict[str, Any] = Field(default_factory=dict)
+    
+    class Settings:
+        projection = {
+            **PromptVersionListItem.Settings.projection,
+            "required_fields": 1,
+            "model_params": 1
+        }
+
+class PromptVersionServing(BaseModel):
+    """Everything execution needs to render and run a version"""
+    model_config = ConfigDict(protected_namespaces=())  # model_params
+    id: PydanticObjectId = Field(alias="_id")
+    prompt_id: PydanticObjectId
+    version: str
+    content: str
+    system_prompt: Optional[str] = None
+    metaprompt: Optional[str] = None
+    required_fields: List[Dict[str, Any]] = []
+    model_params: Dict[str, Any] = Field(default_factory=dict)
+    guardrail_config: Dict[str, Any] = Field(default_factory=dict)
+    is_published: bool = False
+    storage: str = "full"
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    
+    class Settings:
+        projection = {
+            "_id": 1,
+            "prompt_id": 1,
+            "version": 1,
+            "content": 1,
+            "system_prompt": 1,
+            "metaprompt": 1,
+            "required_fields": 1,
+            "model_params": 1,
+            "guardrail_config": 1,
+            "is_published": 1,
+            "storage": 1,
+            "created_at": 1,
+            "updated_at": 1
+        }
+
+class BoostRequest(BaseModel):
+    original_prompt: str = Field(..., min_length=1)
+    context: Dict[str, Any] = Field(default_factory=dict)
+    template_name: Optional[str] = None
+    regenerate: bool = False
+
+class BatchBoostRequest(BaseModel):
+    """
+    Boost the current version of the caller's prompts, or of prompt_ids, one
+    page at a time; send the previous response's next_cursor as cursor
+    """
+    prompt_ids: Optional[List[str]] = Field(None, max_length=1000)
+    cursor: Optional[str] = None
+    limit: Optional[int] = Field(None, ge=1)
+    context: Dict[str, Any] = Field(default_factory=dict)
+    template_name: Optional[str] = None
+    regenerate: bool = False
@@ -1,11 +1,19 @@
 # app/services/analytics_service.py
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from bson import ObjectId
+from app.database import get_analytics_database
 from app.models.execution import ExecutionLog
 from app.models.feedback import Feedback
+from app.models.prompt import PromptVersion
+from app.schemas.prompt import PromptVersionListItem
 
 class AnalyticsService:
+    async def _aggregate(self, collection: str, pipeline: List[Dict]) -> List[Dict]:
+        """Run on the analytics pool so aggregations never hold serving connections"""
+        cursor = get_analytics_database()[collection].aggregate(pipeline, allowDiskUse=True)
+        return await cursor.to_list(length=None)
+    
     async def get_usage_analytics(
         self,
         application_id: str,
@@ -50,7 +58,7 @@ class AnalyticsService:
             {"$sort": {"_id": 1}}
         ]
         
-        results = await ExecutionLog.aggregate(pipeline).to_list()
+        results = await self._aggregate(ExecutionLog.get_collection_name(), pipeline)
         
         # Calculate success rate
         for result in results:
@@ -61,7 +69,24 @@ class AnalyticsService:
         
         return {
             "daily_usage": results,
-            "summary": await self._calculate_summary(application_id, start_date, end_date)
+            "summary": self._calculate_summary(results)
+        }
+    
+    def _calculate_summary(self, daily_usage: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Totals for the whole range, folded from the daily rows instead of a second aggregation"""
+        total_requests = sum(day["total_requests"] for day in daily_usage)
+        success_count = sum(day["success_count"] for day in daily_usage)
+        return {
+            "total_requests": total_requests,
+            "success_count": success_count,
+            "success_rate": success_count / total_requests * 100 if total_requests else 0,
+            # Daily averages weighted by each day's request count
+            "avg_latency": (
+                sum((day["avg_latency"] or 0) * day["total_requests"] for day in daily_usage) / total_requests
+                if total_requests else 0
+            ),
+            "total_tokens": sum(day["total_tokens"] for day in daily_usage),
+            "total_cost": sum(day["total_cost"] for day in daily_usage)
         }
     
     async def get_prompt_performance(
@@ -74,8 +99,8 @@ class AnalyticsService:
         if version:
             match_criteria["version"] = version
         
-        # Get prompt versions
-        prompt_versions = await PromptVersion.find(match_criteria).to_list()
+        # Get prompt version ids; the covering index answers this without documents
+        prompt_versions = await PromptVersion.find(match_criteria).project(PromptVersionListItem).to_list()
         version_ids = [pv.id for pv in prompt_versions]
         
         # Aggregation for performance metrics
@@ -115,7 +140,7 @@ class AnalyticsService:
                         {"$unwind": "$feedback"},
                         {
                             "$group": {
-                                "_id": null,
+                                "_id": None,
                                 "avg_rating": {"$avg": "$feedback.rating"},
                                 "total_feedback": {"$sum": 1}
                             }
@@ -125,7 +150,7 @@ class AnalyticsService:
             }
         ]
         
-        results = await ExecutionLog.aggregate(pipeline).to_list()
+        results = await self._aggregate(ExecutionLog.get_collection_name(), pipeline)
         
         return {
             "execution_metrics": results[0]["execution_stats"] if results else [],
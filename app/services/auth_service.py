@@ -0,0 +1,15 @@
+# app/services/auth_service.py
+from typing import Optional
+import hashlib
+from app.models.application import Application
+
+class AuthService:
+    def hash_api_key(self, api_key: str) -> str:
+        return hashlib.sha256(api_key.encode()).hexdigest()
+
+    async def verify_api_key(self, api_key: str) -> Optional[Application]:
+        """The active application an API key belongs to, looked up by its hash"""
+        return await Application.find_one(
+            Application.api_key_hash == self.hash_api_key(api_key),
+            Application.is_active == True
+        )
@@ -0,0 +1,176 @@
+# app/services/dedup_service.py
+from typing import List, Dict, Any, Optional, Iterable
+from datetime import datetime, timedelta
+from bson import ObjectId
+import asyncio
+import time
+import numpy as np
+from app.config import settings
+from app.models.prompt import Prompt, PromptVersion
+from app.models.version_tombstone import VersionTombstone
+from app.utils.minhash import MinHasher, LSHIndex
+
+class DuplicateDetector:
+    """
+    In-process LSH indexes over PromptVersion.content_signature, one per
+    application so matches never cross tenants. Loaded once, then kept
+    current by pulling versions whose signature changed, and tombstones of
+    versions deleted, since the last sync. Lookups never touch the database
+    beyond that periodic sync, so a version deleted by another process can
+    still be reported until the next one.
+    """
+
+    def __init__(self):
+        self.hasher = MinHasher(num_perm=settings.dedup_num_perm)
+        self.threshold = settings.dedup_threshold
+        self.indexes: Dict[Optional[ObjectId], LSHIndex] = {}
+        # version_id -> (application_id, prompt_id)
+        self._owners: Dict[ObjectId, tuple] = {}
+        # prompt_id -> application_id; a prompt never changes application
+        self._applications: Dict[ObjectId, Optional[ObjectId]] = {}
+        self._synced_to: Optional[datetime] = None
+        self._last_sync = 0.0
+        self._lock = asyncio.Lock()
+
+    def signature(self, content: str) -> List[int]:
+        return self.hasher.signature(content).tolist()
+
+    async def find_duplicates(
+        self,
+        content: str,
+        application_id,
+        exclude_prompt_id: Optional[ObjectId] = None
+    ) -> List[Dict[str, Any]]:
+        """The application's existing versions whose content is a near-duplicate of `content`"""
+        if not content.strip():
+            return []
+
+        await self._sync()
+        index = self.indexes.get(self._object_id(application_id))
+        if not index:
+            return []
+
+        return [
+            {
+                "version_id": str(version_id),
+                "prompt_id": str(self._owners[version_id][1]),
+                "similarity": round(similarity, 3)
+            }
+            for version_id, similarity in index.query(self.hasher.signature(content), self.threshold)
+            if self._owners[version_id][1] != exclude_prompt_id
+        ]
+
+    async def annotate(self, version: PromptVersion):
+        """Compute the version's signature and flag near-duplicates in its application"""
+        self.sign(version, version.content)
+        application_id = await self._application_of(version.prompt_id)
+        duplicates = await self.find_duplicates(
+            version.content, application_id, exclude_prompt_id=version.prompt_id
+        )
+        if duplicates:
+            version.metadata["near_duplicates"] = duplicates
+
+    def sign(self, version: PromptVersion, content: str):
+        """Set the signature of the version's full content, stamping it for other processes' syncs when it changed"""
+        signature = self.signature(content)
+        if signature != version.content_signature:
+            version.content_signature = signature
+            version.signature_updated_at = datetime.utcnow()
+
+    def register(self, version: PromptVersion):
+        """Index a version this process just wrote, ahead of the next sync"""
+        if not (version.id and version.content_signature):
+            return
+        if version.prompt_id in self._applications:
+            self._add(
+                version.id,
+                self._applications[version.prompt_id],
+                version.prompt_id,
+                version.content_signature
+            )
+
+    async def forget(self, version_id: ObjectId):
+        """Drop a deleted version here and leave a tombstone for other processes' syncs"""
+        self.remove(version_id)
+        await VersionTombstone(version_id=version_id).insert()
+
+    def remove(self, version_id: ObjectId):
+        owner = self._owners.pop(version_id, None)
+        if owner and owner[0] in self.indexes:
+            self.indexes[owner[0]].remove(version_id)
+
+    async def _sync(self):
+        """Pull signatures changed since the last sync, at most every dedup_refresh_seconds"""
+        if time.monotonic() - self._last_sync < settings.dedup_refresh_seconds:
+            return
+
+        async with self._lock:
+            if time.monotonic() - self._last_sync < settings.dedup_refresh_seconds:
+                return
+
+            # Writers stamp signature_updated_at with their own clocks and commit
+            # in any order, so each sync re-reads a trailing window; re-adding a
+            # version that is already indexed just replaces it
+            started = datetime.utcnow()
+            overlap = timedelta(seconds=settings.dedup_sync_overlap_seconds)
+            query: Dict[str, Any] = {"content_signature": {"$ne": None}}
+            if self._synced_to:
+                query["signature_updated_at"] = {"$gte": self._synced_to - overlap}
+
+            docs = [
+                doc async for doc in PromptVersion.get_motor_collection().find(
+                    query,
+                    {"_id": 1, "prompt_id": 1, "content_signature": 1}
+                ).batch_size(1000)
+            ]
+            await self._load_applications(doc["prompt_id"] for doc in docs)
+            for doc in docs:
+                self._add(
+                    doc["_id"],
+                    self._applications.get(doc["prompt_id"]),
+                    doc["prompt_id"],
+                    doc["content_signature"]
+                )
+
+            # Applied after the adds so a version deleted mid-sync stays out;
+            # the first load only needs the deletes that could have raced it
+            deleted_since = (self._synced_to or started) - overlap
+            async for doc in VersionTombstone.get_motor_collection().find(
+                {"deleted_at": {"$gte": deleted_since}}, {"version_id": 1}
+            ):
+                self.remove(doc["version_id"])
+
+            self._synced_to = started
+            self._last_sync = time.monotonic()
+
+    async def _application_of(self, prompt_id: ObjectId) -> Optional[ObjectId]:
+        await self._load_applications([prompt_id])
+        return self._applications.get(prompt_id)
+
+    async def _load_applications(self, prompt_ids: Iterable[ObjectId]):
+        missing = list({prompt_id for prompt_id in prompt_ids if prompt_id not in self._applications})
+        if not missing:
+            return
+        async for doc in Prompt.get_motor_collection().find(
+            {"_id": {"$in": missing}}, {"_id": 1, "application_id": 1}
+        ):
+            self._applications[doc["_id"]] = doc.get("application_id")
+
+    def _add(self, version_id: ObjectId, application_id, prompt_id: ObjectId, signature: List[int]):
+        previous = self._owners.get(version_id)
+        if previous and previous[0] != application_id:
+            self.remove(version_id)
+        self._owners[version_id] = (application_id, prompt_id)
+        index = self.indexes.get(application_id)
+        if index is None:
+            index = self.indexes[application_id] = LSHIndex(
+                num_perm=settings.dedup_num_perm, bands=settings.dedup_bands
+            )
+        index.add(version_id, np.asarray(signature, dtype=np.uint64))
+
+    def _object_id(self, value) -> Optional[ObjectId]:
+        if value is None or isinstance(value, ObjectId):
+            return value
+        return ObjectId(value)
+
+duplicate_detector = DuplicateDetector()
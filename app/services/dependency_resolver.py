@@ -0,0 +1,165 @@
+# app/services/dependency_resolver.py
+from typing import Dict, List, Any, Set
+from datetime import timedelta
+from bson import ObjectId
+from app.config import settings
+from app.core.cache import cache_manager
+from app.models.prompt import PromptVersion
+from app.models.prompt_dependency import PromptDependency
+from app.schemas.prompt import PromptVersionServing
+from app.services.version_store import version_store
+
+# Fields a dependency node needs at execution time; never the embedding.
+# The serving projection minus its timestamps: nodes are cached as JSON
+NODE_PROJECTION = {
+    field: include for field, include in PromptVersionServing.Settings.projection.items()
+    if field not in ("created_at", "updated_at")
+}
+
+class DependencyCycleError(ValueError):
+    pass
+
+class DependencyResolver:
+    """
+    Resolves the prompt_dependencies DAG below a version one level at a time
+    (one $in query per level for edges and one for nodes). Resolved graphs
+    are memoized per root in Redis; every node keeps a set of the roots
+    whose graph contains it, so republishing a node drops exactly those.
+    """
+
+    def __init__(self):
+        self.ttl = timedelta(hours=settings.dependency_cache_ttl_hours)
+
+    async def resolve(self, version_id: str) -> Dict[str, Any]:
+        root = str(version_id)
+        cached = await cache_manager.get(self._graph_key(root))
+        if cached:
+            return cached
+
+        nodes: Dict[str, Dict[str, Any]] = {}
+        edges: List[Dict[str, Any]] = []
+        visited: Set[str] = set()
+        frontier = [root]
+
+        while frontier:
+            visited.update(frontier)
+
+            # Subgraphs already resolved for another root are merged, not re-walked
+            subgraphs = await cache_manager.get_many([self._graph_key(node) for node in frontier])
+            to_expand = []
+            for node_id, subgraph in zip(frontier, subgraphs):
+                if subgraph:
+                    nodes.update(subgraph["nodes"])
+                    edges.extend(subgraph["edges"])
+                    visited.update(subgraph["nodes"])
+                else:
+                    to_expand.append(node_id)
+
+            if not to_expand:
+                break
+
+            level_nodes, level_edges = await self._fetch_level(to_expand)
+            nodes.update(level_nodes)
+            edges.extend(level_edges)
+            frontier = sorted({edge["to"] for edge in level_edges} - visited)
+
+        missing = visited - nodes.keys()
+        if missing:
+            raise ValueError(f"Unknown prompt versions in dependency graph: {sorted(missing)}")
+        self._check_acyclic(root, edges)
+
+        graph = {"root": root, "nodes": nodes, "edges": self._unique_edges(edges)}
+        # Register the root with its nodes before caching the graph, so an
+        # invalidate() that lands in between still finds and drops it
+        await cache_manager.add_to_sets(
+            (self._members_key(node_id) for node_id in nodes),
+            root,
+            expire=self.ttl
+        )
+        await cache_manager.set(self._graph_key(root), graph, expire=self.ttl)
+        return graph
+
+    async def invalidate(self, version_id):
+        """Drop every memoized graph that contains this version"""
+        roots = await cache_manager.pop_set(self._members_key(str(version_id)))
+        for root in set(roots) | {str(version_id)}:
+            await cache_manager.delete(self._graph_key(root))
+
+    async def _fetch_level(self, version_ids: List[str]):
+        object_ids = [ObjectId(version_id) for version_id in version_ids]
+
+        nodes = {}
+        async for doc in PromptVersion.get_motor_collection().find(
+            {"_id": {"$in": object_ids}}, NODE_PROJECTION
+        ):
+            nodes[str(doc["_id"])] = self._serialize(doc)
+
+        delta_ids = [node_id for node_id, node in nodes.items() if node.get("storage") == "delta"]
+        if delta_ids:
+            for node_id, bodies in (await version_store.get_bodies_many(delta_ids)).items():
+                nodes[node_id].update(bodies)
+
+        edges = []
+        async for doc in PromptDependency.get_motor_collection().find(
+            {"prompt_version_id": {"$in": object_ids}},
+            {"prompt_version_id": 1, "dependency_id": 1, "dependency_type": 1, "config": 1}
+        ):
+            edges.append({
+                "from": str(doc["prompt_version_id"]),
+                "to": str(doc["dependency_id"]),
+                "type": doc["dependency_type"],
+                "config": doc.get("config", {})
+            })
+
+        return nodes, edges
+
+    def _check_acyclic(self, root: str, edges: List[Dict[str, Any]]):
+        """Iterative DFS; a back edge to a node on the current path is a cycle"""
+        children: Dict[str, List[str]] = {}
+        for edge in edges:
+            children.setdefault(edge["from"], []).append(edge["to"])
+
+        on_path: Set[str] = set()
+        done: Set[str] = set()
+        stack = [(root, iter(children.get(root, [])))]
+        path = [root]
+        on_path.add(root)
+
+        while stack:
+            node, remaining = stack[-1]
+            child = next(remaining, None)
+            if child is None:
+                stack.pop()
+                path.pop()
+                on_path.discard(node)
+                done.add(node)
+            elif child in on_path:
+                cycle = path[path.index(child):] + [child]
+                raise DependencyCycleError(f"Dependency cycle: {' -> '.join(cycle)}")
+            elif child not in done:
+                stack.append((child, iter(children.get(child, []))))
+                path.append(child)
+                on_path.add(child)
+
+    def _unique_edges(self, edges: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        seen = set()
+        unique = []
+        for edge in edges:
+            key = (edge["from"], edge["to"], edge["type"])
+            if key not in seen:
+                seen.add(key)
+                unique.append(edge)
+        return unique
+
+    def _serialize(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        doc["_id"] = str(doc["_id"])
+        doc["prompt_id"] = str(doc["prompt_id"])
+        return doc
+
+    def _graph_key(self, version_id: str) -> str:
+        return f"depgraph:{version_id}"
+
+    def _members_key(self, version_id: str) -> str:
+        return f"depgraph:roots:{version_id}"
+
+dependency_resolver = DependencyResolver()
@@ -0,0 +1,204 @@
+# app/services/execution_log_service.py
+from typing import Dict, Any, Optional, AsyncIterator, Tuple
+from datetime import datetime
+from bson import ObjectId
+import base64
+import csv
+import io
+import json
+from app.config import settings
+from app.core.metrics import stage_breakdown
+from app.models.execution import ExecutionLog
+
+# Fields returned by the log listing; input/output payloads are only
+# fetched by exports that explicitly ask for them
+LIST_PROJECTION = {
+    "_id": 1,
+    "prompt_version_id": 1,
+    "application_id": 1,
+    "model_provider": 1,
+    "model_name": 1,
+    "latency_ms": 1,
+    "token_count": 1,
+    "cost_usd": 1,
+    "status": 1,
+    "error_message": 1,
+    "created_at": 1
+}
+
+EXPORT_COLUMNS = [
+    "_id", "created_at", "prompt_version_id", "application_id",
+    "model_provider", "model_name", "status", "latency_ms",
+    "token_count", "cost_usd", "error_message"
+]
+
+# Newest first; _id breaks ties between logs written in the same millisecond
+SORT_ORDER = [("created_at", -1), ("_id", -1)]
+
+class ExecutionLogService:
+    def __init__(self):
+        self.batch_size = settings.log_export_batch_size
+
+    async def record_execution(
+        self,
+        result: Dict[str, Any],
+        provider: str,
+        model: str,
+        input_data: Dict[str, Any],
+        prompt_version_id: Optional[str] = None,
+        application_id: Optional[str] = None
+    ) -> ExecutionLog:
+        """Persist an LLMService execution result, including guardrail aborts"""
+        metadata = dict(result.get("metadata", {}))
+        if stages := stage_breakdown():
+            metadata["stages_ms"] = stages
+        log = ExecutionLog(
+            prompt_version_id=ObjectId(prompt_version_id) if prompt_version_id else None,
+            application_id=ObjectId(application_id) if application_id else None,
+            model_provider=provider,
+            model_name=model,
+            input_data=input_data,
+            output_data={"output": result.get("output")},
+            latency_ms=result.get("latency_ms", 0),
+            token_count=result.get("token_count", 0),
+            cost_usd=result.get("cost_usd", 0.0),
+            status=result["status"],
+            error_message=result.get("error"),
+            metadata=metadata
+        )
+        await log.insert()
+        return log
+
+    async def list_logs(
+        self,
+        application_id: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Dict[str, Any]:
+        """List execution logs one keyset page at a time"""
+        limit = max(1, min(limit, settings.log_page_size_max))
+        query = self._build_query(application_id, start_date, end_date, status)
+        if cursor:
+            query = {"$and": [query, self._after_cursor(cursor)]}
+
+        # Fetch one extra document to know whether another page exists
+        motor_cursor = (
+            ExecutionLog.get_motor_collection()
+            .find(query, LIST_PROJECTION)
+            .sort(SORT_ORDER)
+            .limit(limit + 1)
+        )
+        items = [self._serialize(doc) async for doc in motor_cursor]
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            next_cursor = self._encode_cursor(last["created_at"], last["_id"])
+
+        return {"items": items, "next_cursor": next_cursor}
+
+    async def iter_logs(
+        self,
+        application_id: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        status: Optional[str] = None,
+        include_payloads: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate every matching log without materializing the result set"""
+        query = self._build_query(application_id, start_date, end_date, status)
+        projection = dict(LIST_PROJECTION)
+        if include_payloads:
+            projection.update({"input_data": 1, "output_data": 1})
+
+        motor_cursor = (
+            ExecutionLog.get_motor_collection()
+            .find(query, projection)
+            .sort(SORT_ORDER)
+            .batch_size(self.batch_size)
+        )
+        try:
+            async for doc in motor_cursor:
+                yield self._serialize(doc)
+        finally:
+            await motor_cursor.close()
+
+    async def export_ndjson(self, application_id: str, **filters) -> AsyncIterator[str]:
+        """Stream logs as newline-delimited JSON"""
+        async for doc in self.iter_logs(application_id, **filters):
+            yield json.dumps(doc) + "\n"
+
+    async def export_csv(self, application_id: str, **filters) -> AsyncIterator[str]:
+        """Stream logs as CSV, flushing one buffered batch of rows at a time"""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+
+        rows = 0
+        async for doc in self.iter_logs(application_id, include_payloads=False, **filters):
+            writer.writerow(doc)
+            rows += 1
+            if rows % self.batch_size == 0:
+                yield self._drain(buffer)
+
+        yield self._drain(buffer)
+
+    def _build_query(
+        self,
+        application_id: str,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        status: Optional[str]
+    ) -> Dict[str, Any]:
+        query: Dict[str, Any] = {"application_id": ObjectId(application_id)}
+
+        created_at = {}
+        if start_date:
+            created_at["$gte"] = start_date
+        if end_date:
+            created_at["$lte"] = end_date
+        if created_at:
+            query["created_at"] = created_at
+        if status:
+            query["status"] = status
+
+        return query
+
+    def _after_cursor(self, cursor: str) -> Dict[str, Any]:
+        created_at, log_id = self._decode_cursor(cursor)
+        return {
+            "$or": [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": log_id}}
+            ]
+        }
+
+    def _encode_cursor(self, created_at: str, log_id: str) -> str:
+        raw = json.dumps({"t": created_at, "id": log_id})
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def _decode_cursor(self, cursor: str) -> Tuple[datetime, ObjectId]:
+        try:
+            raw = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return datetime.fromisoformat(raw["t"]), ObjectId(raw["id"])
+        except Exception as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    def _serialize(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert BSON types to JSON-safe values"""
+        for key, value in doc.items():
+            if isinstance(value, ObjectId):
+                doc[key] = str(value)
+            elif isinstance(value, datetime):
+                doc[key] = value.isoformat()
+        return doc
+
+    def _drain(self, buffer: io.StringIO) -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return chunk
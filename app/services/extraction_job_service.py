@@ -0,0 +1,79 @@
+# app/services/extraction_job_service.py
+from typing import List, Dict, Any, Optional, AsyncIterator
+from bson import ObjectId
+import asyncio
+import json
+from app.models.extraction_job import ExtractionJob
+from app.models.prompt_source import PromptSource
+
+TERMINAL_STATUSES = {"completed", "failed"}
+
+class ExtractionJobService:
+    async def create_job(self, application_id: str, urls: List[str]) -> ExtractionJob:
+        """Queue a bulk extraction; workers pick it up from the extraction_jobs collection"""
+        job = ExtractionJob(
+            application_id=ObjectId(application_id),
+            items=[
+                {"source_url": url, "status": "pending", "prompt_count": 0, "error": None}
+                for url in urls
+            ],
+            total=len(urls)
+        )
+        await job.insert()
+        return job
+
+    async def get_job(self, job_id: str, application_id: str) -> Optional[ExtractionJob]:
+        return await ExtractionJob.find_one(
+            ExtractionJob.id == ObjectId(job_id),
+            ExtractionJob.application_id == ObjectId(application_id)
+        )
+
+    async def get_results(self, job_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Prompts persisted so far, available while the job is still running"""
+        sources = await PromptSource.find(
+            PromptSource.job_id == ObjectId(job_id)
+        ).sort("item_index", "position").limit(limit).to_list()
+        return [
+            {
+                "id": str(source.id),
+                "source_url": source.source_url,
+                "content": source.source_content,
+                "name": source.extraction_metadata.get("name"),
+                "description": source.extraction_metadata.get("description")
+            }
+            for source in sources
+        ]
+
+    async def watch_job(
+        self,
+        job_id: str,
+        application_id: str,
+        poll_interval: float = 1.0
+    ) -> AsyncIterator[str]:
+        """Yield an NDJSON progress line whenever the job advances, until it finishes"""
+        last_snapshot = None
+        while True:
+            job = await self.get_job(job_id, application_id)
+            if not job:
+                return
+
+            snapshot = self.progress(job)
+            if snapshot != last_snapshot:
+                yield json.dumps(snapshot) + "\n"
+                last_snapshot = snapshot
+
+            if job.status in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(poll_interval)
+
+    def progress(self, job: ExtractionJob) -> Dict[str, Any]:
+        return {
+            "job_id": str(job.id),
+            "status": job.status,
+            "total": job.total,
+            "processed": job.processed,
+            "failed": job.failed,
+            "prompt_count": job.prompt_count,
+            "attempts": job.attempts,
+            "error": job.error
+        }
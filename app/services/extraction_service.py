@@ -1,77 +1,229 @@
 # app/services/extraction_service.py
-import PyPDF2
-from bs4 import BeautifulSoup
-import requests
-from typing import List, Dict
+import asyncio
+import hashlib
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, AsyncIterator
+from app.config import settings
+from app.core.cache import cache_manager
+from app.core.exceptions import ExtractionFailedError
+from app.services.dedup_service import duplicate_detector
+from app.services.llm_service import LLMService
+from app.utils.fetcher import document_fetcher
+from app.utils.pdf import iter_pdf_pages
+from app.utils.text_chunker import chunk_text
 
-class ExtractionService:
-    def __init__(self):
-        self.llm_service = LLMService()
-    
-    async def extract_from_url(self, url: str) -> List[Dict]:
-        """Extract prompts from a web page"""
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        text = soup.get_text()
-        
-        return await self._extract_prompts_from_text(text, source_type='web', source_url=url)
-    
-    async def extract_from_pdf(self, pdf_content: bytes) -> List[Dict]:
-        """Extract prompts from PDF content"""
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        
-        return await self._extract_prompts_from_text(text, source_type='pdf')
-    
-    async def _extract_prompts_from_text(
-        self,
-        text: str,
-        source_type: str,
-        source_url: Optional[str] = None
-    ) -> List[Dict]:
-        """Use LLM to identify and extract prompts from text"""
-        extraction_prompt = """
+# Must support JSON mode, which every chunk call requests
+EXTRACTION_MODEL = "gpt-4-turbo"
+# Room for a chunk's worth of prompts; a truncated reply is not valid JSON
+EXTRACTION_MAX_TOKENS = 4096
+
+EXTRACTION_PROMPT = """
         Analyze the following text and extract any prompts or prompt templates.
-        
+
         Text: {text}
-        
+
         For each prompt found, extract:
         1. The prompt content
         2. A suggested name
         3. A description of its purpose
         4. Any mentioned required fields or parameters
         5. The context in which it's used
-        
-        Return as JSON array: [
-            {{
-                "content": "prompt text",
-                "name": "suggested name",
-                "description": "what it does",
-                "required_fields": ["field1", "field2"],
-                "context": "usage context"
-            }}
+
+        Return a JSON object (use an empty list when none are found): {{
+            "prompts": [
+                {{
+                    "content": "prompt text",
+                    "name": "suggested name",
+                    "description": "what it does",
+                    "required_fields": ["field1", "field2"],
+                    "context": "usage context"
+                }}
+            ]
+        }}
+        """
+
+# Bump when EXTRACTION_PROMPT changes so cached chunk results are not reused
+EXTRACTION_CACHE_VERSION = "v2"
+
+logger = logging.getLogger(__name__)
+
+async def warm_html_parser():
+    def load():
+        import bs4  # noqa: F401
+        import lxml.etree  # noqa: F401
+    await asyncio.to_thread(load)
+
+class ExtractionService:
+    def __init__(self):
+        self.llm_service = LLMService()
+        self._semaphore = asyncio.Semaphore(settings.extraction_concurrency)
+
+    async def extract_from_url(self, url: str, application_id: Optional[str] = None) -> List[Dict]:
+        """Extract prompts from a web page; near-duplicates are looked up in application_id's prompts"""
+        text = await self.fetch_url_text(url)
+        return await self._extract_prompts_from_text(
+            text, source_type='web', source_url=url, application_id=application_id
+        )
+
+    async def fetch_url_text(self, url: str) -> str:
+        html = await document_fetcher.fetch(url)
+        return await asyncio.to_thread(self._html_to_text, html)
+
+    def _html_to_text(self, html: str) -> str:
+        """Parse with lxml; runs in a worker thread"""
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, 'lxml')
+        for tag in soup(['script', 'style', 'noscript']):
+            tag.decompose()
+        return soup.get_text(separator='\n')
+
+    async def extract_from_pdf(self, pdf_path: str, application_id: Optional[str] = None) -> List[Dict]:
+        """Extract prompts from a PDF file on disk, parsed off the event loop"""
+        text = await self.read_pdf_text(pdf_path)
+        return await self._extract_prompts_from_text(
+            text, source_type='pdf', application_id=application_id
+        )
+
+    async def read_pdf_text(self, pdf_path: str) -> str:
+        pages = [page async for page in iter_pdf_pages(pdf_path)]
+        # Blank line between pages so the chunker treats them as paragraph breaks
+        return "\n\n".join(pages)
+
+    async def _extract_prompts_from_text(
+        self,
+        text: str,
+        source_type: str,
+        source_url: Optional[str] = None,
+        application_id: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Use LLM to identify and extract prompts from the whole text. Chunks
+        that failed are listed in each prompt's extraction_metadata; raises
+        ExtractionFailedError when every chunk failed.
+        """
+        failed_chunks: List[Dict[str, Any]] = []
+        prompts = [
+            prompt async for prompt in self.stream_prompts_from_text(
+                text,
+                source_type=source_type,
+                source_url=source_url,
+                application_id=application_id,
+                failed_chunks=failed_chunks
+            )
         ]
+        if failed_chunks:
+            if not prompts and len(failed_chunks) == len(self._chunks(text)):
+                raise ExtractionFailedError(failed_chunks)
+            for prompt in prompts:
+                prompt['extraction_metadata']['failed_chunks'] = [
+                    failure['chunk'] for failure in failed_chunks
+                ]
+        return prompts
+
+    async def stream_prompts_from_text(
+        self,
+        text: str,
+        source_type: str,
+        source_url: Optional[str] = None,
+        application_id: Optional[str] = None,
+        failed_chunks: Optional[List[Dict[str, Any]]] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Map-reduce extraction: chunks are extracted concurrently and each
+        new (deduplicated) prompt is yielded as soon as its chunk finishes.
+        A chunk that fails is logged and appended to failed_chunks as
+        {"chunk": index, "error": message}; the other chunks carry on.
+        Near-duplicates are only reported from application_id's own prompts.
         """
-        
-        result = await self.llm_service.generate(
-            extraction_prompt.format(text=text[:4000]),  # Limit text length
-            model="gpt-4",
-            response_format={"type": "json_object"}
+        chunks = self._chunks(text)
+        tasks = [
+            asyncio.create_task(self._extract_chunk_or_error(index, chunk))
+            for index, chunk in enumerate(chunks)
+        ]
+
+        seen = set()
+        try:
+            for completed in asyncio.as_completed(tasks):
+                index, prompts, error = await completed
+                if error is not None:
+                    if failed_chunks is not None:
+                        failed_chunks.append({'chunk': index, 'error': error})
+                    continue
+
+                for extracted in prompts:
+                    key = self._dedup_key(extracted.get('content', ''))
+                    if not key or key in seen:
+                        continue
+                    seen.add(key)
+
+                    yield {
+                        **extracted,
+                        'near_duplicates': await duplicate_detector.find_duplicates(
+                            extracted['content'], application_id
+                        ) if application_id else [],
+                        'source_type': source_type,
+                        'source_url': source_url,
+                        'extracted_by': EXTRACTION_MODEL,
+                        'extraction_metadata': {
+                            'text_length': len(text),
+                            'chunk_count': len(chunks),
+                            'extraction_date': datetime.utcnow().isoformat()
+                        }
+                    }
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _chunks(self, text: str) -> List[str]:
+        return chunk_text(
+            text,
+            chunk_size=settings.extraction_chunk_size,
+            overlap=settings.extraction_chunk_overlap
         )
-        
-        prompts = []
-        for extracted in result:
-            prompts.append({
-                **extracted,
-                'source_type': source_type,
-                'source_url': source_url,
-                'extracted_by': 'gpt-4',
-                'extraction_metadata': {
-                    'text_length': len(text),
-                    'extraction_date': datetime.utcnow().isoformat()
-                }
-            })
-        
-        return prompts
\ No newline at end of file
+
+    async def _extract_chunk_or_error(self, index: int, chunk: str):
+        """(index, prompts, None) on success, (index, [], message) when the chunk failed"""
+        try:
+            return index, await self._extract_chunk(chunk), None
+        except Exception as e:
+            logger.warning("Extraction of chunk %d failed: %s", index, e)
+            return index, [], str(e)
+
+    async def _extract_chunk(self, chunk: str) -> List[Dict]:
+        """Extract prompts from one chunk, reusing cached results by content hash"""
+        digest = hashlib.sha256(chunk.encode()).hexdigest()
+        cache_key = f"extraction:{EXTRACTION_CACHE_VERSION}:{EXTRACTION_MODEL}:{digest}"
+
+        cached = await cache_manager.get(cache_key)
+        if cached is not None:
+            return cached
+
+        async with self._semaphore:
+            result = await self.llm_service.generate(
+                EXTRACTION_PROMPT.format(text=chunk),
+                model=EXTRACTION_MODEL,
+                max_tokens=EXTRACTION_MAX_TOKENS,
+                response_format={"type": "json_object"}
+            )
+
+        # JSON mode only returns objects, so the list comes wrapped
+        prompts = result.get('prompts', []) if isinstance(result, dict) else []
+        extracted = [
+            prompt for prompt in prompts
+            if isinstance(prompt, dict) and isinstance(prompt.get('content'), str)
+        ]
+        await cache_manager.set(
+            cache_key,
+            extracted,
+            expire=timedelta(hours=settings.extraction_cache_ttl_hours)
+        )
+        return extracted
+
+    def _dedup_key(self, content: str) -> str:
+        """Prompts found in overlapping chunks differ only in whitespace or case"""
+        normalized = re.sub(r"\s+", " ", content).strip().lower()
+        if not normalized:
+            return ""
+        return hashlib.sha1(normalized.encode()).hexdigest()
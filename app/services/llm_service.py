@@ -1,25 +1,144 @@
 # app/services/llm_service.py
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, AsyncIterator
+from functools import lru_cache
 import asyncio
+import json
 import time
-from openai import AsyncOpenAI
-from anthropic import AsyncAnthropic
+from app.config import settings
+from app.core.exceptions import ContextWindowExceededError
+from app.core.metrics import span
+from app.utils.guardrails import StreamingGuardrail
+from app.utils.tokens import count_tokens, count_tokens_batch, count_prompt_tokens, trim_to_tokens, TOKENS_PER_MESSAGE
+
+# Provider SDKs are imported on first use (or by warm-up), not at app import
+
+@lru_cache(maxsize=None)
+def get_openai_client():
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url)
+
+@lru_cache(maxsize=None)
+def get_anthropic_client():
+    from anthropic import AsyncAnthropic
+    return AsyncAnthropic(api_key=settings.anthropic_api_key, base_url=settings.anthropic_base_url)
+
+async def warm_llm_clients():
+    """Build the clients of providers that have an API key; the SDKs refuse to without one"""
+    await asyncio.gather(*(
+        asyncio.to_thread(factory)
+        for factory, api_key in (
+            (get_openai_client, settings.openai_api_key),
+            (get_anthropic_client, settings.anthropic_api_key)
+        )
+        if api_key
+    ))
+
+# Caps in-flight requests to each provider across every LLMService instance
+_provider_slots: Dict[str, asyncio.Semaphore] = {}
+
+def provider_slot(provider: str) -> asyncio.Semaphore:
+    if provider not in _provider_slots:
+        _provider_slots[provider] = asyncio.Semaphore(settings.llm_provider_concurrency)
+    return _provider_slots[provider]
+
+# USD per 1k tokens for models missing from model_configs
+DEFAULT_COST_PER_1K = 0.01
 
 class LLMService:
     def __init__(self):
-        self.openai_client = AsyncOpenAI()
-        self.anthropic_client = AsyncAnthropic()
         self.model_configs = {
             'openai': {
-                'gpt-4': {'max_tokens': 4096, 'default_temp': 0.7},
-                'gpt-3.5-turbo': {'max_tokens': 4096, 'default_temp': 0.7}
+                'gpt-4': {
+                    'max_tokens': 4096, 'default_temp': 0.7, 'context_window': 8192,
+                    'input_cost_per_1k': 0.03, 'output_cost_per_1k': 0.06
+                },
+                'gpt-4-turbo': {
+                    'max_tokens': 4096, 'default_temp': 0.7, 'context_window': 128000,
+                    'input_cost_per_1k': 0.01, 'output_cost_per_1k': 0.03
+                },
+                'gpt-3.5-turbo': {
+                    'max_tokens': 4096, 'default_temp': 0.7, 'context_window': 16385,
+                    'input_cost_per_1k': 0.0005, 'output_cost_per_1k': 0.0015
+                }
             },
             'anthropic': {
-                'claude-3-opus': {'max_tokens': 4096, 'default_temp': 0.7},
-                'claude-3-sonnet': {'max_tokens': 4096, 'default_temp': 0.7}
+                'claude-3-opus': {
+                    'max_tokens': 4096, 'default_temp': 0.7, 'context_window': 200000,
+                    'input_cost_per_1k': 0.015, 'output_cost_per_1k': 0.075
+                },
+                'claude-3-sonnet': {
+                    'max_tokens': 4096, 'default_temp': 0.7, 'context_window': 200000,
+                    'input_cost_per_1k': 0.003, 'output_cost_per_1k': 0.015
+                }
             }
         }
     
+    @property
+    def openai_client(self):
+        return get_openai_client()
+    
+    @property
+    def anthropic_client(self):
+        return get_anthropic_client()
+    
+    def preflight(
+        self,
+        prompt: str,
+        provider: str,
+        model: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 1000,
+        overflow: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Count input tokens locally before dispatch and estimate the worst-case
+        cost. Inputs that don't fit the context window raise
+        ContextWindowExceededError, or with overflow='trim' are cut to fit.
+        """
+        window = self._model_config(provider, model).get('context_window')
+        input_tokens = count_prompt_tokens(prompt, provider, model, system_prompt)
+        trimmed = False
+        
+        if window and input_tokens + max_tokens > window:
+            if (overflow or settings.context_overflow) != 'trim':
+                raise ContextWindowExceededError(provider, model, input_tokens, max_tokens, window)
+            framing = input_tokens - count_tokens(prompt, provider, model)
+            prompt = trim_to_tokens(prompt, window - max_tokens - framing, provider, model)
+            input_tokens = count_prompt_tokens(prompt, provider, model, system_prompt)
+            trimmed = True
+            if input_tokens + max_tokens > window:
+                raise ContextWindowExceededError(provider, model, input_tokens, max_tokens, window)
+        
+        return {
+            'prompt': prompt,
+            'input_tokens': input_tokens,
+            'max_output_tokens': max_tokens,
+            'trimmed': trimmed,
+            'estimated_cost_usd': self._calculate_cost(provider, model, input_tokens, max_tokens)
+        }
+    
+    def preflight_batch(
+        self,
+        prompts: List[str],
+        provider: str,
+        model: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """Token counts, fit and cost estimates for many prompts in one tokenizer pass"""
+        window = self._model_config(provider, model).get('context_window')
+        framing = count_prompt_tokens("", provider, model, system_prompt)
+        
+        estimates = []
+        for count in count_tokens_batch(prompts, provider, model):
+            input_tokens = framing + count + (TOKENS_PER_MESSAGE if count else 0)
+            estimates.append({
+                'input_tokens': input_tokens,
+                'fits': not window or input_tokens + max_tokens <= window,
+                'estimated_cost_usd': self._calculate_cost(provider, model, input_tokens, max_tokens)
+            })
+        return estimates
+    
     async def compare_models(
         self,
         prompt: str,
@@ -64,14 +183,19 @@ class LLMService:
         start_time = time.time()
         
         try:
-            formatted_prompt = prompt.format(**input_data)
+            with span("template"):
+                formatted_prompt = prompt.format(**input_data)
             
-            if provider == 'openai':
-                response = await self._execute_openai(formatted_prompt, model, **kwargs)
-            elif provider == 'anthropic':
-                response = await self._execute_anthropic(formatted_prompt, model, **kwargs)
-            else:
-                raise ValueError(f"Unknown provider: {provider}")
+            with span("preflight"):
+                preflight = self.preflight(
+                    formatted_prompt, provider, model,
+                    system_prompt=kwargs.get('system_prompt'),
+                    max_tokens=kwargs.get('max_tokens', 1000),
+                    overflow=kwargs.pop('overflow', None)
+                )
+            formatted_prompt = preflight['prompt']
+            
+            response = await self._dispatch(formatted_prompt, provider, model, **kwargs)
             
             latency = int((time.time() - start_time) * 1000)
             
@@ -79,9 +203,13 @@ class LLMService:
                 'output': response['content'],
                 'latency_ms': latency,
                 'token_count': response.get('token_count', 0),
-                'cost_usd': self._calculate_cost(provider, model, response.get('token_count', 0)),
+                'cost_usd': self._calculate_cost(
+                    provider, model,
+                    response.get('input_tokens', preflight['input_tokens']),
+                    response.get('output_tokens', 0)
+                ),
                 'status': 'success',
-                'metadata': response.get('metadata', {})
+                'metadata': {**response.get('metadata', {}), 'preflight': self._preflight_summary(preflight)}
             }
             
         except Exception as e:
@@ -91,6 +219,180 @@ class LLMService:
                 'status': 'failed'
             }
     
+    async def execute_streaming(
+        self,
+        prompt: str,
+        provider: str,
+        model: str,
+        input_data: Dict,
+        guardrail: Optional[StreamingGuardrail] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Execute prompt with a streamed completion, checking each delta against
+        the guardrail and closing the upstream request as soon as it trips
+        """
+        start_time = time.time()
+        usage = {'input_tokens': 0, 'output_tokens': 0, 'output_chunks': 0}
+        chunks: List[str] = []
+        abort_reason = None
+        stream = None
+        
+        try:
+            with span("template"):
+                formatted_prompt = prompt.format(**input_data)
+            
+            with span("preflight"):
+                preflight = self.preflight(
+                    formatted_prompt, provider, model,
+                    system_prompt=kwargs.get('system_prompt'),
+                    max_tokens=kwargs.get('max_tokens', 1000),
+                    overflow=kwargs.pop('overflow', None)
+                )
+            formatted_prompt = preflight['prompt']
+            
+            if provider == 'openai':
+                stream = self._stream_openai(formatted_prompt, model, usage, **kwargs)
+            elif provider == 'anthropic':
+                stream = self._stream_anthropic(formatted_prompt, model, usage, **kwargs)
+            else:
+                raise ValueError(f"Unknown provider: {provider}")
+            
+            # The request is only sent on the first iteration, inside the slot
+            async with provider_slot(provider):
+                with span("provider"):
+                    async for delta in stream:
+                        chunks.append(delta)
+                        if guardrail and (abort_reason := guardrail.feed(delta)):
+                            break
+            
+            if guardrail and not abort_reason:
+                abort_reason = guardrail.finish()
+        
+        except Exception as e:
+            return {
+                'error': str(e),
+                'latency_ms': int((time.time() - start_time) * 1000),
+                'status': 'failed'
+            }
+        finally:
+            # Closing the generator closes the provider's HTTP response
+            if stream is not None:
+                await stream.aclose()
+        
+        # Aborted streams never report usage; one delta is roughly one token
+        input_tokens = usage['input_tokens'] or preflight['input_tokens']
+        output_tokens = usage['output_tokens'] or usage['output_chunks']
+        result = {
+            'output': "".join(chunks),
+            'latency_ms': int((time.time() - start_time) * 1000),
+            'token_count': input_tokens + output_tokens,
+            'cost_usd': self._calculate_cost(provider, model, input_tokens, output_tokens),
+            'status': 'success',
+            'metadata': {'streamed': True, 'preflight': self._preflight_summary(preflight)}
+        }
+        if abort_reason:
+            result['status'] = 'aborted'
+            result['error'] = abort_reason
+            result['metadata']['guardrail_abort'] = {
+                'reason': abort_reason,
+                'chars_generated': guardrail.chars_seen
+            }
+        return result
+    
+    async def generate(
+        self,
+        prompt: str,
+        model: str = "gpt-4",
+        provider: str = "openai",
+        **kwargs
+    ) -> Any:
+        """
+        Single completion of an already-rendered prompt. Returns the text, or
+        the parsed object when response_format asks for JSON. Raises on failure.
+        """
+        preflight = self.preflight(
+            prompt, provider, model,
+            system_prompt=kwargs.get('system_prompt'),
+            max_tokens=kwargs.get('max_tokens', 1000),
+            overflow=kwargs.pop('overflow', None)
+        )
+        response = await self._dispatch(preflight['prompt'], provider, model, **kwargs)
+        
+        if kwargs.get('response_format', {}).get('type') == 'json_object':
+            return json.loads(response['content'])
+        return response['content']
+    
+    async def _dispatch(self, prompt: str, provider: str, model: str, **kwargs) -> Dict:
+        async with provider_slot(provider):
+            with span("provider"):
+                if provider == 'openai':
+                    return await self._execute_openai(prompt, model, **kwargs)
+                if provider == 'anthropic':
+                    return await self._execute_anthropic(prompt, model, **kwargs)
+                raise ValueError(f"Unknown provider: {provider}")
+    
+    async def _stream_openai(
+        self,
+        prompt: str,
+        model: str,
+        usage: Dict[str, int],
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream content deltas from OpenAI models"""
+        messages = []
+        if system_prompt := kwargs.get('system_prompt'):
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        
+        stream = await self.openai_client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=kwargs.get('temperature', 0.7),
+            max_tokens=kwargs.get('max_tokens', 1000),
+            top_p=kwargs.get('top_p', 1.0),
+            frequency_penalty=kwargs.get('frequency_penalty', 0),
+            presence_penalty=kwargs.get('presence_penalty', 0),
+            stream=True
+        )
+        
+        try:
+            async for event in stream:
+                if event.choices and (delta := event.choices[0].delta.content):
+                    usage['output_chunks'] += 1
+                    yield delta
+        finally:
+            await stream.response.aclose()
+    
+    async def _stream_anthropic(
+        self,
+        prompt: str,
+        model: str,
+        usage: Dict[str, int],
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream content deltas from Anthropic models"""
+        stream = await self.anthropic_client.messages.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            system=kwargs.get('system_prompt', ''),
+            temperature=kwargs.get('temperature', 0.7),
+            max_tokens=kwargs.get('max_tokens', 1000),
+            stream=True
+        )
+        
+        try:
+            async for event in stream:
+                if event.type == 'message_start':
+                    usage['input_tokens'] = event.message.usage.input_tokens
+                elif event.type == 'content_block_delta':
+                    usage['output_chunks'] += 1
+                    yield event.delta.text
+                elif event.type == 'message_delta':
+                    usage['output_tokens'] = event.usage.output_tokens
+        finally:
+            await stream.response.aclose()
+    
     async def _execute_openai(self, prompt: str, model: str, **kwargs) -> Dict:
         """Execute on OpenAI models"""
         messages = []
@@ -105,12 +407,15 @@ class LLMService:
             max_tokens=kwargs.get('max_tokens', 1000),
             top_p=kwargs.get('top_p', 1.0),
             frequency_penalty=kwargs.get('frequency_penalty', 0),
-            presence_penalty=kwargs.get('presence_penalty', 0)
+            presence_penalty=kwargs.get('presence_penalty', 0),
+            **({'response_format': kwargs['response_format']} if 'response_format' in kwargs else {})
         )
         
         return {
             'content': response.choices[0].message.content,
             'token_count': response.usage.total_tokens,
+            'input_tokens': response.usage.prompt_tokens,
+            'output_tokens': response.usage.completion_tokens,
             'metadata': {
                 'finish_reason': response.choices[0].finish_reason,
                 'model': response.model
@@ -132,25 +437,27 @@ class LLMService:
         return {
             'content': response.content[0].text,
             'token_count': response.usage.input_tokens + response.usage.output_tokens,
+            'input_tokens': response.usage.input_tokens,
+            'output_tokens': response.usage.output_tokens,
             'metadata': {
                 'stop_reason': response.stop_reason,
                 'model': response.model
             }
         }
     
-    def _calculate_cost(self, provider: str, model: str, tokens: int) -> float:
-        """Calculate cost based on token usage"""
-        # Simplified cost calculation - should be updated with actual pricing
-        cost_per_1k = {
-            'openai': {
-                'gpt-4': 0.03,
-                'gpt-3.5-turbo': 0.002
-            },
-            'anthropic': {
-                'claude-3-opus': 0.015,
-                'claude-3-sonnet': 0.003
-            }
+    def _model_config(self, provider: str, model: str) -> Dict[str, Any]:
+        return self.model_configs.get(provider, {}).get(model, {})
+    
+    def _preflight_summary(self, preflight: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'input_tokens': preflight['input_tokens'],
+            'estimated_cost_usd': preflight['estimated_cost_usd'],
+            'trimmed': preflight['trimmed']
         }
-        
-        rate = cost_per_1k.get(provider, {}).get(model, 0.01)
-        return (tokens / 1000) * rate
\ No newline at end of file
+    
+    def _calculate_cost(self, provider: str, model: str, input_tokens: int, output_tokens: int) -> float:
+        """Cost from input and output token counts at the model's per-1k rates"""
+        config = self._model_config(provider, model)
+        input_rate = config.get('input_cost_per_1k', DEFAULT_COST_PER_1K)
+        output_rate = config.get('output_cost_per_1k', DEFAULT_COST_PER_1K)
+        return (input_tokens / 1000) * input_rate + (output_tokens / 1000) * output_rate
@@ -1,32 +1,135 @@
 # app/services/metaprompt_service.py
+from typing import Dict, List, Any, Optional
+from datetime import timedelta
+import asyncio
+import hashlib
+import json
+from app.config import settings
+from app.core.cache import cache_manager
+from app.services.llm_service import LLMService
+from app.services.prompt_service import PromptService
+
+METAPROMPT_MODEL = "gpt-4"
+METAPROMPT_CACHE_VERSION = "v1"
+
 class MetapromptService:
     def __init__(self):
         self.llm_service = LLMService()
         self.templates = self._load_metaprompt_templates()
+        self.ttl = timedelta(hours=settings.metaprompt_cache_ttl_hours)
     
     async def enhance_prompt(
         self,
         original_prompt: str,
         context: Dict,
-        template_name: Optional[str] = None
+        template_name: Optional[str] = None,
+        regenerate: bool = False
     ) -> str:
         """
         Enhances a prompt using metaprompting techniques
         """
-        template = self.templates.get(template_name, self.templates['default'])
+        result = await self.boost(original_prompt, context, template_name, regenerate)
+        return result['enhanced_prompt']
+    
+    async def boost(
+        self,
+        original_prompt: str,
+        context: Dict,
+        template_name: Optional[str] = None,
+        regenerate: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Enhanced prompt, reused from cache for the same prompt, template and
+        context unless regenerate is set
+        """
+        template_name = self._resolve_template(template_name)
+        rendered_context = self._render_context(context)
+        cache_key = self._cache_key(original_prompt, template_name, rendered_context)
         
-        metaprompt = template.format(
-            original_prompt=original_prompt,
-            context=json.dumps(context, indent=2)
+        if not regenerate:
+            cached = await cache_manager.get(cache_key)
+            if cached is not None:
+                return {'enhanced_prompt': cached, 'template': template_name, 'cached': True}
+        
+        return await self._generate(original_prompt, template_name, rendered_context, cache_key)
+    
+    async def boost_application(
+        self,
+        application_id: str,
+        context: Dict,
+        template_name: Optional[str] = None,
+        regenerate: bool = False,
+        prompt_ids: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Boost the current version of one page of an application's prompts;
+        pass next_cursor back for the next page. Pages are capped at
+        metaprompt_batch_page_size so one request never outlives client and
+        proxy timeouts. Cache hits come back from one MGET; misses run
+        concurrently, and LLMService caps how many reach the provider at once.
+        """
+        limit = max(1, min(limit or settings.metaprompt_batch_page_size, settings.metaprompt_batch_page_size))
+        versions, next_cursor = await PromptService().get_current_versions(
+            application_id, prompt_ids, after=cursor, limit=limit
         )
+        template_name = self._resolve_template(template_name)
+        rendered_context = self._render_context(context)
+        cache_keys = [
+            self._cache_key(version.content, template_name, rendered_context)
+            for version in versions
+        ]
+        cached = [None] * len(versions) if regenerate else await cache_manager.get_many(cache_keys)
+        semaphore = asyncio.Semaphore(settings.metaprompt_batch_concurrency)
+        
+        async def boost_one(version, cache_key, hit) -> Dict[str, Any]:
+            entry = {'prompt_id': str(version.prompt_id), 'version': version.version}
+            if hit is not None:
+                return {**entry, 'status': 'success', 'enhanced_prompt': hit, 'template': template_name, 'cached': True}
+            async with semaphore:
+                try:
+                    result = await self._generate(version.content, template_name, rendered_context, cache_key)
+                except Exception as e:
+                    return {**entry, 'status': 'failed', 'error': str(e)}
+            return {**entry, 'status': 'success', **result}
         
+        items = await asyncio.gather(*(
+            boost_one(version, cache_key, hit)
+            for version, cache_key, hit in zip(versions, cache_keys, cached)
+        ))
+        return {'items': items, 'next_cursor': next_cursor}
+    
+    async def _generate(
+        self,
+        original_prompt: str,
+        template_name: str,
+        rendered_context: str,
+        cache_key: str
+    ) -> Dict[str, Any]:
+        metaprompt = self.templates[template_name].format(
+            original_prompt=original_prompt,
+            context=rendered_context
+        )
         enhanced = await self.llm_service.generate(
             metaprompt,
-            model="gpt-4",
+            model=METAPROMPT_MODEL,
             temperature=0.7
         )
-        
-        return enhanced
+        await cache_manager.set(cache_key, enhanced, expire=self.ttl)
+        return {'enhanced_prompt': enhanced, 'template': template_name, 'cached': False}
+    
+    def _resolve_template(self, template_name: Optional[str]) -> str:
+        return template_name if template_name in self.templates else 'default'
+    
+    def _render_context(self, context: Dict) -> str:
+        # Compact and key-ordered: fewer tokens, and equal contexts hash equally
+        return json.dumps(context or {}, sort_keys=True, separators=(",", ":"), default=str)
+    
+    def _cache_key(self, original_prompt: str, template_name: str, rendered_context: str) -> str:
+        prompt_hash = hashlib.sha256(original_prompt.encode()).hexdigest()
+        context_hash = hashlib.sha256(rendered_context.encode()).hexdigest()
+        return f"metaprompt:{METAPROMPT_CACHE_VERSION}:{template_name}:{prompt_hash}:{context_hash}"
     
     def _load_metaprompt_templates(self) -> Dict[str, str]:
         return {
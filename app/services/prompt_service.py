@@ -0,0 +1,180 @@
+# app/services/prompt_service.py
+from typing import List, Optional, Dict, Any, Tuple
+from bson import ObjectId
+import asyncio
+from app.models.prompt import Prompt, PromptVersion
+from app.services.version_store import version_store
+from app.schemas.prompt import (
+    PromptVersionListItem,
+    PromptVersionHistory,
+    PromptVersionServing
+)
+
+PROMPT_INFO_PROJECTION = {
+    "_id": 1,
+    "prompt_id": 1,
+    "name": 1,
+    "description": 1,
+    "current_version": 1,
+    "tags": 1,
+    "is_active": 1,
+    "created_at": 1
+}
+
+class PromptService:
+    async def list_prompts(self, application_id: str) -> List[Dict[str, Any]]:
+        """Selector rows for an application's active prompts"""
+        cursor = Prompt.get_motor_collection().find(
+            {"application_id": ObjectId(application_id), "is_active": True},
+            {"_id": 1, "prompt_id": 1, "name": 1, "current_version": 1}
+        ).sort("name", 1)
+        return [self._prompt_row(doc) async for doc in cursor]
+    
+    async def get_prompt_info(self, application_id: str, prompt_id: str) -> Optional[Dict[str, Any]]:
+        doc = await Prompt.get_motor_collection().find_one(
+            {"_id": ObjectId(prompt_id), "application_id": ObjectId(application_id)},
+            PROMPT_INFO_PROJECTION
+        )
+        return self._prompt_row(doc) if doc else None
+    
+    async def get_editor_version(
+        self,
+        prompt_id: str,
+        current_version: Optional[str] = None
+    ) -> Optional[PromptVersionServing]:
+        """The version the editor opens: the prompt's current version, else the newest"""
+        if current_version:
+            serving = await self.get_serving_version(prompt_id, current_version)
+            if serving:
+                return serving
+        serving = await PromptVersion.find(
+            PromptVersion.prompt_id == ObjectId(prompt_id)
+        ).sort(-PromptVersion.created_at).limit(1).project(PromptVersionServing).first_or_none()
+        return await self._with_bodies(serving)
+    
+    async def get_editor_bootstrap(
+        self,
+        application_id: str,
+        prompt_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Everything the prompt editor renders; defaults to the first prompt"""
+        if prompt_id:
+            prompts, info = await asyncio.gather(
+                self.list_prompts(application_id),
+                self.get_prompt_info(application_id, prompt_id)
+            )
+        else:
+            prompts = await self.list_prompts(application_id)
+            info = await self.get_prompt_info(application_id, prompts[0]["id"]) if prompts else None
+        
+        version = await self.get_editor_version(info["id"], info.get("current_version")) if info else None
+        return {"prompts": prompts, "prompt": info, "version": version}
+    
+    async def list_versions(self, prompt_id: str) -> List[PromptVersionListItem]:
+        """Version listing, newest first, answered from the covering index"""
+        return await PromptVersion.find(
+            PromptVersion.prompt_id == ObjectId(prompt_id)
+        ).sort(-PromptVersion.created_at).project(PromptVersionListItem).to_list()
+    
+    async def owns_prompt(self, application_id: str, prompt_id: str) -> bool:
+        return bool(await Prompt.get_motor_collection().count_documents(
+            {"_id": ObjectId(prompt_id), "application_id": ObjectId(application_id)}, limit=1
+        ))
+    
+    async def get_version_history(
+        self,
+        application_id: str,
+        prompt_id: str,
+        limit: int = 50
+    ) -> Optional[List[PromptVersionHistory]]:
+        """History tab rows without content bodies or embeddings; None unless the application owns the prompt"""
+        if not await self.owns_prompt(application_id, prompt_id):
+            return None
+        return await PromptVersion.find(
+            PromptVersion.prompt_id == ObjectId(prompt_id)
+        ).sort(-PromptVersion.created_at).limit(limit).project(PromptVersionHistory).to_list()
+    
+    async def get_serving_version(
+        self,
+        prompt_id: str,
+        version: str
+    ) -> Optional[PromptVersionServing]:
+        """The fields needed to execute a specific version"""
+        serving = await PromptVersion.find_one(
+            PromptVersion.prompt_id == ObjectId(prompt_id),
+            PromptVersion.version == version
+        ).project(PromptVersionServing)
+        return await self._with_bodies(serving)
+    
+    async def get_latest_published(self, prompt_id: str) -> Optional[PromptVersionServing]:
+        """The most recently published version, for /execute/{prompt_id}/latest"""
+        serving = await PromptVersion.find(
+            PromptVersion.prompt_id == ObjectId(prompt_id),
+            PromptVersion.is_published == True
+        ).sort(-PromptVersion.created_at).limit(1).project(PromptVersionServing).first_or_none()
+        return await self._with_bodies(serving)
+    
+    async def get_current_versions(
+        self,
+        application_id: str,
+        prompt_ids: Optional[List[str]] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[PromptVersionServing], Optional[str]]:
+        """
+        Current version of each active prompt in an application, in two
+        queries. With limit, only the next `limit` prompts in _id order after
+        `after`; the second value is the last prompt id read when more remain.
+        """
+        query: Dict[str, Any] = {"application_id": ObjectId(application_id), "is_active": True}
+        id_filter: Dict[str, Any] = {}
+        if prompt_ids:
+            id_filter["$in"] = [ObjectId(prompt_id) for prompt_id in prompt_ids]
+        if after:
+            id_filter["$gt"] = ObjectId(after)
+        if id_filter:
+            query["_id"] = id_filter
+        
+        cursor = Prompt.get_motor_collection().find(query, {"_id": 1, "current_version": 1}).sort("_id", 1)
+        if limit:
+            # One extra document tells whether another page exists
+            cursor = cursor.limit(limit + 1)
+        docs = [doc async for doc in cursor]
+        
+        next_cursor = None
+        if limit and len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = str(docs[-1]["_id"])
+        
+        current = [
+            {"prompt_id": doc["_id"], "version": doc["current_version"]}
+            for doc in docs
+            if doc.get("current_version")
+        ]
+        if not current:
+            return [], next_cursor
+        
+        versions = await PromptVersion.find({"$or": current}).project(PromptVersionServing).to_list()
+        delta_ids = [version.id for version in versions if version.storage == "delta"]
+        if delta_ids:
+            bodies = await version_store.get_bodies_many(delta_ids)
+            versions = [
+                version.model_copy(update=bodies[str(version.id)]) if version.storage == "delta" else version
+                for version in versions
+            ]
+        return versions, next_cursor
+    
+    def _prompt_row(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        row = dict(doc)
+        row["id"] = str(row.pop("_id"))
+        return row
+    
+    async def _with_bodies(
+        self,
+        serving: Optional[PromptVersionServing]
+    ) -> Optional[PromptVersionServing]:
+        """Delta-stored versions are rebuilt from their snapshot (cached)"""
+        if serving is None or serving.storage != "delta":
+            return serving
+        bodies = await version_store.get_bodies(serving.id)
+        return serving.model_copy(update=bodies)
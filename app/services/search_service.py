@@ -1,7 +1,8 @@
 # app/services/search_service.py
-from typing import List, Dict, Any, Optional
+from typing import List, Optional
 from bson import ObjectId
 from app.models.prompt import PromptVersion
+from app.services.version_store import version_store
 from app.utils.embeddings import EmbeddingService
 
 class SearchService:
@@ -39,7 +40,8 @@ class SearchService:
                     "version": 1,
                     "prompt_id": 1,
                     "system_prompt": 1,
-                    "required_fields": 1
+                    "required_fields": 1,
+                    "storage": 1
                 }
             }
         ]
@@ -52,4 +54,14 @@ class SearchService:
         
         results = await PromptVersion.aggregate(pipeline).to_list()
         
+        # Delta-stored versions keep their bodies against a snapshot
+        delta_ids = [result["_id"] for result in results if result.get("storage") == "delta"]
+        if delta_ids:
+            bodies = await version_store.get_bodies_many(delta_ids)
+            for result in results:
+                if str(result["_id"]) in bodies:
+                    body = bodies[str(result["_id"])]
+                    result["content"] = body["content"]
+                    result["system_prompt"] = body["system_prompt"]
+        
         return results
\ No newline at end of file
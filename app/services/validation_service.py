@@ -1,12 +1,39 @@
 # app/services/validation_service.py
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Any, Awaitable
+from datetime import timedelta
+import asyncio
+import hashlib
+import time
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from app.config import settings
+from app.core.cache import cache_manager
+from app.core.metrics import record, timed
 from app.services.llm_service import LLMService
+from app.utils.guardrails import compile_guardrails, StreamingGuardrail
+
+EMBEDDING_WEIGHT = 0.4
+# Must support JSON mode, which the critique call requests
+CRITIQUE_MODEL = "gpt-4-turbo"
+CRITIQUE_WEIGHT = 0.6
+
+_embedder = None
+_embedder_lock = asyncio.Lock()
+
+async def get_embedder():
+    """Shared SentenceTransformer, loaded once off the event loop"""
+    global _embedder
+    if _embedder is None:
+        async with _embedder_lock:
+            if _embedder is None:
+                _embedder = await asyncio.to_thread(_load_embedder)
+    return _embedder
+
+def _load_embedder():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(settings.embedding_model)
 
 class ValidationService:
     def __init__(self):
-        self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
         self.llm_service = LLMService()
     
     async def validate_pre_invocation(
@@ -18,23 +45,79 @@ class ValidationService:
     ) -> Tuple[bool, float, str]:
         """
         Validates prompt before execution using both embedding distance
-        and LLM critique
+        and LLM critique. Per-stage timings are not part of the tuple; they
+        are recorded as validation.* stage metrics by the pipeline.
         """
-        # Design 1: Embedding-based validation
-        embedding_score = await self._validate_by_embeddings(
-            user_prompt, system_prompt, metaprompt_output
+        result = await self.run_pre_invocation_pipeline(
+            user_prompt, system_prompt, metaprompt_output, validation_config
         )
-        
-        # Design 2: LLM-based critique
-        llm_score, critique = await self._validate_by_llm_critique(
-            user_prompt, system_prompt, metaprompt_output
+        return result['is_valid'], result['score'], result['critique']
+    
+    @timed("validation.pre_invocation")
+    async def run_pre_invocation_pipeline(
+        self,
+        user_prompt: str,
+        system_prompt: str,
+        metaprompt_output: str,
+        validation_config: Dict
+    ) -> Dict[str, Any]:
+        """
+        Cheap stages first: the embedding score and the critique cache lookup
+        run concurrently, and the LLM critique is only requested when the
+        embedding score leaves the outcome undecided. When the critique is
+        skipped, `score` is the bound on the combined score that decided it.
+        """
+        threshold = validation_config.get('threshold', 0.7)
+        timings: Dict[str, float] = {}
+        cache_key = self._critique_cache_key(user_prompt, system_prompt, metaprompt_output)
+        
+        embedding_score, cached = await asyncio.gather(
+            self._timed('embeddings', timings, self._validate_by_embeddings(
+                user_prompt, system_prompt, metaprompt_output
+            )),
+            self._timed('critique_cache', timings, cache_manager.get(cache_key))
         )
         
-        # Combined validation
-        final_score = (embedding_score * 0.4 + llm_score * 0.6)
-        is_valid = final_score >= validation_config.get('threshold', 0.7)
+        critique_source = 'cache'
+        if cached:
+            llm_score, critique = cached['score'], cached['critique']
+        else:
+            # Bounds of the combined score over every possible critique score
+            lower = embedding_score * EMBEDDING_WEIGHT
+            upper = lower + CRITIQUE_WEIGHT
+            if lower >= threshold or upper < threshold:
+                is_valid = lower >= threshold
+                return {
+                    'is_valid': is_valid,
+                    'score': lower if is_valid else upper,
+                    'embedding_score': embedding_score,
+                    'critique': "Critique skipped: embedding score alone decided the outcome",
+                    'critique_source': 'skipped',
+                    'timings_ms': timings
+                }
+            
+            llm_score, critique = await self._timed(
+                'llm_critique', timings, self._validate_by_llm_critique(
+                    user_prompt, system_prompt, metaprompt_output
+                )
+            )
+            critique_source = 'llm'
+            await cache_manager.set(
+                cache_key,
+                {'score': llm_score, 'critique': critique},
+                expire=timedelta(hours=settings.critique_cache_ttl_hours)
+            )
         
-        return is_valid, final_score, critique
+        # Combined validation
+        final_score = (embedding_score * EMBEDDING_WEIGHT + llm_score * CRITIQUE_WEIGHT)
+        return {
+            'is_valid': final_score >= threshold,
+            'score': final_score,
+            'embedding_score': embedding_score,
+            'critique': critique,
+            'critique_source': critique_source,
+            'timings_ms': timings
+        }
     
     async def _validate_by_embeddings(
         self,
@@ -42,17 +125,34 @@ class ValidationService:
         system_prompt: str,
         metaprompt_output: str
     ) -> float:
-        # Compute embeddings
+        # Compute both embeddings in one batch, off the event loop
         combined_input = f"{system_prompt}\n{user_prompt}"
-        input_embedding = self.embedder.encode(combined_input)
-        output_embedding = self.embedder.encode(metaprompt_output)
+        embedder = await get_embedder()
+        input_embedding, output_embedding = await asyncio.to_thread(
+            embedder.encode, [combined_input, metaprompt_output]
+        )
         
         # Calculate cosine similarity
         similarity = np.dot(input_embedding, output_embedding) / (
             np.linalg.norm(input_embedding) * np.linalg.norm(output_embedding)
         )
         
-        return similarity
+        return float(similarity)
+    
+    async def _timed(self, name: str, timings: Dict[str, float], awaitable: Awaitable):
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            elapsed = time.perf_counter() - start
+            timings[name] = round(elapsed * 1000, 2)
+            record(f"validation.{name}", elapsed)
+    
+    def _critique_cache_key(self, user_prompt: str, system_prompt: str, metaprompt_output: str) -> str:
+        digest = hashlib.sha256()
+        for part in (user_prompt, system_prompt, metaprompt_output):
+            digest.update(hashlib.sha256((part or "").encode()).digest())
+        return f"critique:{CRITIQUE_MODEL}:{digest.hexdigest()}"
     
     async def _validate_by_llm_critique(
         self,
@@ -78,7 +178,7 @@ class ValidationService:
         
         result = await self.llm_service.generate(
             critique_prompt,
-            model="gpt-4",
+            model=CRITIQUE_MODEL,
             response_format={"type": "json_object"}
         )
         
@@ -86,6 +186,7 @@ class ValidationService:
     
     
     # app/services/validation_service.py (continued)
+    @timed("validation.post_invocation")
     async def validate_post_invocation(
         self,
         prompt: str,
@@ -102,31 +203,25 @@ class ValidationService:
         if not self._validate_format(output, expected_format):
             issues.append("Output format does not match expected structure")
         
-        # Content validation
-        content_issues = await self._validate_content(output, guardrail_config)
+        # Content and safety validation are independent of each other
+        content_issues, safety_issues = await asyncio.gather(
+            self._validate_content(output, guardrail_config),
+            self._validate_safety(output)
+        )
         issues.extend(content_issues)
-        
-        # Safety validation
-        safety_issues = await self._validate_safety(output)
         issues.extend(safety_issues)
         
         is_valid = len(issues) == 0
         return is_valid, issues
 
+    def streaming_guardrail(
+        self,
+        expected_format: Dict,
+        guardrail_config: Dict
+    ) -> StreamingGuardrail:
+        """Guardrail for LLMService.execute_streaming, checked as tokens arrive"""
+        return StreamingGuardrail(compile_guardrails(guardrail_config), expected_format)
+
     async def _validate_content(self, output: str, config: Dict) -> List[str]:
         """Check for prohibited content, required elements, etc."""
-        issues = []
-        
-        # Check prohibited terms
-        if prohibited := config.get('prohibited_terms'):
-            for term in prohibited:
-                if term.lower() in output.lower():
-                    issues.append(f"Prohibited term found: {term}")
-        
-        # Check required elements
-        if required := config.get('required_elements'):
-            for element in required:
-                if element not in output:
-                    issues.append(f"Required element missing: {element}")
-        
-        return issues
\ No newline at end of file
+        return compile_guardrails(config).check(output)
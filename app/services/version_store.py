@@ -0,0 +1,355 @@
+# app/services/version_store.py
+from typing import Dict, Any, Optional, Iterable
+import logging
+from datetime import timedelta
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from app.config import settings
+from app.core.cache import cache_manager
+from app.models.prompt import Prompt, PromptVersion
+from app.schemas.prompt import SEQUENCE_INDEX_NAME
+from app.utils.text_delta import make_delta, apply_delta, delta_size, text_diff
+
+BODY_FIELDS = PromptVersion.BODY_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Concurrent inserts into one prompt rarely collide more than once or twice
+SEQUENCE_INSERT_ATTEMPTS = 5
+
+STORAGE_PROJECTION = {
+    "_id": 1,
+    "version": 1,
+    "storage": 1,
+    "base_version_id": 1,
+    "deltas": 1,
+    **{field: 1 for field in BODY_FIELDS}
+}
+
+class VersionStore:
+    """
+    Stores prompt version bodies as periodic full snapshots plus line deltas.
+    Every delta applies to its nearest snapshot (never to another delta), so
+    any version is rebuilt from at most two documents.
+    """
+
+    def __init__(self):
+        self.snapshot_interval = settings.version_snapshot_interval
+        self.ttl = timedelta(hours=settings.version_body_cache_ttl_hours)
+
+    async def insert_with_retry(self, version: PromptVersion, insert, **kwargs):
+        """
+        Run a PromptVersion insert. The unique (prompt_id, sequence) index
+        rejects a sequence number taken by a concurrent insert; the version
+        is then reset to its full bodies and inserted again, which re-runs
+        prepare_insert against the new latest version.
+        """
+        for attempt in range(SEQUENCE_INSERT_ATTEMPTS):
+            try:
+                return await insert(**kwargs)
+            except DuplicateKeyError as e:
+                if "sequence" not in str(e.details or e) or attempt == SEQUENCE_INSERT_ATTEMPTS - 1:
+                    raise
+                self._reset_storage(version)
+
+    async def backfill_sequences(self, collection: AsyncIOMotorCollection):
+        """
+        Number the versions of every prompt that has versions without a
+        sequence, or with a duplicated one, in (created_at, _id) order.
+        Runs before the indexes are built; a no-op once every prompt is
+        numbered, so each process can run it at startup.
+        """
+        indexes = await collection.index_information()
+        for name, index in indexes.items():
+            # The first release built this index without a filter
+            keys = [(field, int(direction)) for field, direction in index["key"]]
+            if keys == [("prompt_id", 1), ("sequence", 1)] and name != SEQUENCE_INDEX_NAME:
+                await collection.drop_index(name)
+
+        prompt_ids = [
+            doc["_id"] async for doc in collection.aggregate([
+                {"$group": {
+                    "_id": {"prompt_id": "$prompt_id", "sequence": "$sequence"},
+                    "count": {"$sum": 1}
+                }},
+                {"$match": {"$or": [
+                    {"count": {"$gt": 1}},
+                    {"_id.sequence": {"$not": {"$type": "int"}}}
+                ]}},
+                {"$group": {"_id": "$_id.prompt_id"}}
+            ])
+        ]
+
+        for prompt_id in prompt_ids:
+            ids = [
+                doc["_id"] async for doc in collection.find(
+                    {"prompt_id": prompt_id}, {"_id": 1}
+                ).sort([("created_at", 1), ("_id", 1)])
+            ]
+            # Unset first: renumbering in place could collide with the unique index
+            await collection.update_many({"prompt_id": prompt_id}, {"$unset": {"sequence": ""}})
+            await collection.bulk_write([
+                UpdateOne({"_id": version_id}, {"$set": {"sequence": sequence}})
+                for sequence, version_id in enumerate(ids)
+            ], ordered=False)
+
+        if prompt_ids:
+            logger.info("Backfilled version sequences for %d prompts", len(prompt_ids))
+
+    async def prepare_insert(self, version: PromptVersion):
+        """Assign a sequence number and, between snapshots, replace bodies with deltas"""
+        previous = await PromptVersion.get_motor_collection().find_one(
+            {"prompt_id": version.prompt_id},
+            {"_id": 1, "sequence": 1, "storage": 1, "base_version_id": 1},
+            sort=[("sequence", -1)]
+        )
+        if not previous:
+            version.sequence = 0
+            return
+
+        version.sequence = previous.get("sequence", 0) + 1
+        if version.sequence % self.snapshot_interval == 0:
+            return
+
+        base_id = previous["_id"] if previous.get("storage", "full") == "full" else previous["base_version_id"]
+        base = await self.get_bodies(base_id)
+        bodies = self._bodies_of(version)
+        deltas = {field: make_delta(base[field], bodies[field]) for field in BODY_FIELDS}
+
+        # A rewrite can produce a delta as large as the text itself
+        full_size = sum(len(body or "") for body in bodies.values())
+        if sum(delta_size(delta) for delta in deltas.values()) >= full_size * settings.version_delta_max_ratio:
+            return
+
+        self._compress(version, base_id, deltas, bodies)
+
+    async def prepare_update(self, version: PromptVersion):
+        """Keep deltas consistent when an existing version is saved"""
+        if version.storage == "delta":
+            bodies = version._stored_bodies or await self._edited_bodies(version)
+            if bodies is None:
+                return
+            base = await self.get_bodies(version.base_version_id)
+            deltas = {field: make_delta(base[field], bodies[field]) for field in BODY_FIELDS}
+            self._compress(version, version.base_version_id, deltas, bodies)
+            return
+
+        # Snapshot edited: re-encode the deltas that were taken against its old bodies
+        old = await PromptVersion.get_motor_collection().find_one({"_id": version.id}, STORAGE_PROJECTION)
+        if not old:
+            return
+        old_bodies = {field: old.get(field) for field in BODY_FIELDS}
+        new_bodies = self._bodies_of(version)
+        if old_bodies != new_bodies:
+            await self._rebase_dependents(version.id, old_bodies, new_bodies)
+
+    async def prepare_delete(self, version: PromptVersion):
+        """
+        Before a snapshot is deleted, promote its earliest delta to a full
+        snapshot and re-encode the remaining deltas against that one
+        """
+        if version.storage == "delta":
+            return
+        collection = PromptVersion.get_motor_collection()
+        dependents = [
+            doc async for doc in collection.find(
+                {"base_version_id": version.id}, {"_id": 1, "deltas": 1}
+            ).sort([("sequence", 1), ("_id", 1)])
+        ]
+        if not dependents:
+            return
+
+        old_base = await self.get_bodies(version.id)
+        new_base, rest = dependents[0], dependents[1:]
+        new_bodies = {
+            field: apply_delta(old_base[field], new_base["deltas"].get(field))
+            for field in BODY_FIELDS
+        }
+
+        updates = [UpdateOne(
+            {"_id": new_base["_id"]},
+            {"$set": {**new_bodies, "storage": "full", "base_version_id": None, "deltas": {}}}
+        )]
+        for doc in rest:
+            deltas = {
+                field: make_delta(new_bodies[field], apply_delta(old_base[field], doc["deltas"].get(field)))
+                for field in BODY_FIELDS
+            }
+            updates.append(UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": {"base_version_id": new_base["_id"], "deltas": deltas}}
+            ))
+        await collection.bulk_write(updates, ordered=False)
+
+    def restore(self, version: PromptVersion):
+        """Put full bodies back on the in-memory instance after a write"""
+        if version._stored_bodies:
+            for field, body in version._stored_bodies.items():
+                setattr(version, field, body)
+            version._stored_bodies = None
+            # The instance now holds every body as written
+            version._materialized = True
+            version._assigned_bodies.clear()
+
+    async def materialize(self, version: PromptVersion) -> PromptVersion:
+        """
+        Fill in the bodies of a PromptVersion document loaded from the
+        database; delta versions are stored with blank bodies. Code that
+        reads PromptVersion documents directly must go through this.
+        """
+        if version.storage != "delta" or version._materialized:
+            return version
+        bodies = await self.get_bodies(version.id)
+        for field in BODY_FIELDS:
+            if field not in version._assigned_bodies:
+                setattr(version, field, bodies[field])
+                version._assigned_bodies.discard(field)
+        version._materialized = True
+        return version
+
+    async def invalidate(self, version_id):
+        await cache_manager.delete(self._cache_key(version_id))
+
+    async def get_bodies(self, version_id) -> Dict[str, Optional[str]]:
+        return (await self.get_bodies_many([version_id]))[str(version_id)]
+
+    async def get_bodies_many(self, version_ids: Iterable) -> Dict[str, Dict[str, Optional[str]]]:
+        """Reconstructed bodies keyed by version id; at most two Mongo queries"""
+        ids = list(dict.fromkeys(str(version_id) for version_id in version_ids))
+        cached = await cache_manager.get_many([self._cache_key(version_id) for version_id in ids])
+        bodies = {version_id: body for version_id, body in zip(ids, cached) if body}
+
+        missing = [ObjectId(version_id) for version_id in ids if version_id not in bodies]
+        if not missing:
+            return bodies
+
+        docs = {
+            str(doc["_id"]): doc
+            async for doc in PromptVersion.get_motor_collection().find(
+                {"_id": {"$in": missing}}, STORAGE_PROJECTION
+            )
+        }
+        base_ids = {
+            doc["base_version_id"] for doc in docs.values()
+            if doc.get("storage") == "delta" and str(doc["base_version_id"]) not in docs
+        }
+        if base_ids:
+            async for doc in PromptVersion.get_motor_collection().find(
+                {"_id": {"$in": list(base_ids)}}, STORAGE_PROJECTION
+            ):
+                docs[str(doc["_id"])] = doc
+
+        for version_id in map(str, missing):
+            doc = docs.get(version_id)
+            if not doc:
+                raise ValueError(f"Prompt version {version_id} not found")
+            body = self._reconstruct(doc, docs)
+            bodies[version_id] = body
+            await cache_manager.set(self._cache_key(version_id), body, expire=self.ttl)
+
+        return bodies
+
+    async def diff(
+        self,
+        application_id: str,
+        prompt_id: str,
+        from_version: str,
+        to_version: str
+    ) -> Dict[str, Any]:
+        """Unified diffs of every body field between two versions of one of the application's prompts"""
+        if not await Prompt.get_motor_collection().count_documents(
+            {"_id": ObjectId(prompt_id), "application_id": ObjectId(application_id)}, limit=1
+        ):
+            raise ValueError("Prompt not found")
+
+        ids = {}
+        async for doc in PromptVersion.get_motor_collection().find(
+            {"prompt_id": ObjectId(prompt_id), "version": {"$in": [from_version, to_version]}},
+            {"_id": 1, "version": 1}
+        ):
+            ids[doc["version"]] = doc["_id"]
+
+        for version in (from_version, to_version):
+            if version not in ids:
+                raise ValueError(f"Version {version} not found")
+
+        bodies = await self.get_bodies_many([ids[from_version], ids[to_version]])
+        before, after = bodies[str(ids[from_version])], bodies[str(ids[to_version])]
+
+        return {
+            "from_version": from_version,
+            "to_version": to_version,
+            "diffs": {
+                field: text_diff(before[field], after[field], from_version, to_version)
+                for field in BODY_FIELDS
+                if before[field] != after[field]
+            }
+        }
+
+    def _reconstruct(self, doc: Dict[str, Any], docs: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[str]]:
+        if doc.get("storage", "full") == "full":
+            return {field: doc.get(field) for field in BODY_FIELDS}
+
+        base = docs.get(str(doc["base_version_id"]))
+        if base is None:
+            raise ValueError(f"Snapshot {doc['base_version_id']} of prompt version {doc['_id']} is missing")
+        return {
+            field: apply_delta(base.get(field), doc["deltas"].get(field))
+            for field in BODY_FIELDS
+        }
+
+    async def _rebase_dependents(self, snapshot_id, old_bodies: Dict, new_bodies: Dict):
+        updates = []
+        async for doc in PromptVersion.get_motor_collection().find(
+            {"base_version_id": snapshot_id}, {"_id": 1, "deltas": 1}
+        ):
+            deltas = {
+                field: make_delta(new_bodies[field], apply_delta(old_bodies[field], doc["deltas"].get(field)))
+                for field in BODY_FIELDS
+            }
+            updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"deltas": deltas}}))
+
+        if updates:
+            await PromptVersion.get_motor_collection().bulk_write(updates, ordered=False)
+
+    def _compress(self, version: PromptVersion, base_id, deltas: Dict, bodies: Dict):
+        version.storage = "delta"
+        version.base_version_id = base_id
+        version.deltas = deltas
+        version._stored_bodies = bodies
+        version.content = ""
+        version.system_prompt = None
+        version.metaprompt = None
+
+    def _reset_storage(self, version: PromptVersion):
+        """Undo prepare_insert after a failed insert"""
+        self.restore(version)
+        version.storage = "full"
+        version.base_version_id = None
+        version.deltas = {}
+
+    def _bodies_of(self, version: PromptVersion) -> Dict[str, Optional[str]]:
+        return {field: getattr(version, field) for field in BODY_FIELDS}
+
+    async def _edited_bodies(self, version: PromptVersion) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Bodies of a delta version being saved. A materialized instance holds
+        all of them; one loaded from the database holds blanks, and only the
+        fields the caller assigned (None included) replace stored bodies.
+        """
+        if version._materialized:
+            return self._bodies_of(version)
+        if not version._assigned_bodies:
+            return None
+        current = await self.get_bodies(version.id)
+        return {
+            field: getattr(version, field) if field in version._assigned_bodies else current[field]
+            for field in BODY_FIELDS
+        }
+
+    def _cache_key(self, version_id) -> str:
+        return f"version_body:{version_id}"
+
+version_store = VersionStore()
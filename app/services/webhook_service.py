@@ -1,82 +1,293 @@
 # app/services/webhook_service.py
-from typing import List, Dict, Any
+from typing import Dict, Any, Optional, Tuple
 import httpx
-from app.models.webhook import Webhook
-from app.models.prompt import PromptVersion
+from pymongo import ReturnDocument, UpdateOne
+from app.config import settings
+from app.models.webhook import Webhook, WebhookDelivery
+from app.models.prompt import Prompt, PromptVersion
+from app.services.version_store import version_store
 import asyncio
-from datetime import datetime
+import logging
+import random
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
 
 class WebhookService:
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=10.0)
-    
     async def trigger_prompt_update(
         self,
         prompt_version: PromptVersion,
         event_type: str = "prompt.updated"
     ):
-        """Trigger webhooks for prompt update"""
+        """Queue webhooks for prompt update; delivery happens in WebhookDispatcher"""
+        # Versions don't carry the application; it is the prompt's
+        prompt = await Prompt.get_motor_collection().find_one(
+            {"_id": prompt_version.prompt_id}, {"application_id": 1}
+        )
+        if not prompt or not prompt.get("application_id"):
+            return
+
         # Get all webhooks for the application
         webhooks = await Webhook.find(
-            Webhook.application_id == prompt_version.application_id,
+            Webhook.application_id == prompt["application_id"],
             Webhook.is_active == True,
             Webhook.events == event_type
         ).to_list()
-        
-        tasks = []
-        for webhook in webhooks:
-            task = self._send_webhook(webhook, {
-                "event": event_type,
-                "timestamp": datetime.utcnow().isoformat(),
-                "data": {
-                    "prompt_id": str(prompt_version.prompt_id),
-                    "version": prompt_version.version,
-                    "content": prompt_version.content,
-                    "is_published": prompt_version.is_published
-                }
-            })
-            tasks.append(task)
-        
-        # Send all webhooks concurrently
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Log results
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                await self._log_webhook_failure(webhooks[i], str(result))
-    
-    async def _send_webhook(self, webhook: Webhook, payload: Dict[str, Any]):
+
+        if not webhooks:
+            return
+
+        # Delta-stored versions load with blank bodies
+        await version_store.materialize(prompt_version)
+        payload = {
+            "event": event_type,
+            "timestamp": datetime.utcnow().isoformat(),
+            "data": {
+                "prompt_id": str(prompt_version.prompt_id),
+                "version": prompt_version.version,
+                "content": prompt_version.content,
+                "is_published": prompt_version.is_published
+            }
+        }
+
+        # One outbox write per publish, however many subscribers there are
+        await WebhookDelivery.insert_many([
+            WebhookDelivery(
+                webhook_id=webhook.id,
+                url=webhook.url,
+                event=event_type,
+                payload=payload
+            )
+            for webhook in webhooks
+        ])
+
+class WebhookDispatcher:
+    """Background worker that drains the webhook outbox"""
+
+    def __init__(self):
+        self.client = httpx.AsyncClient(timeout=10.0)
+        self.max_attempts = settings.webhook_max_attempts
+        self.lease = timedelta(seconds=settings.webhook_lease_seconds)
+        self._endpoint_limits: Dict[str, asyncio.Semaphore] = {}
+        # Claims stop once this many deliveries are queued or sending
+        self._capacity = asyncio.Semaphore(settings.webhook_max_in_flight)
+        self._secrets: Dict[str, Tuple[str, datetime]] = {}
+        self._secret_ttl = timedelta(seconds=settings.webhook_secret_cache_seconds)
+        self._triggered: Dict[Any, datetime] = {}
+        self._in_flight: set = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        await self._flush_last_triggered()
+        await self.client.aclose()
+
+    async def _run(self):
+        while True:
+            try:
+                claimed = await self._dispatch_batch()
+                await self._flush_last_triggered()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Webhook dispatch loop failed")
+                claimed = 0
+
+            # Keep draining while there is a backlog, otherwise poll
+            if claimed < settings.webhook_dispatch_batch_size:
+                await asyncio.sleep(settings.webhook_poll_interval_seconds)
+
+    async def _dispatch_batch(self) -> int:
+        """
+        Claim due deliveries and send them without waiting for completion.
+        A slot is taken before each claim, so a backlog never leases more
+        rows than the dispatcher can work on.
+        """
+        claimed = 0
+        while claimed < settings.webhook_dispatch_batch_size:
+            await self._capacity.acquire()
+            try:
+                delivery = await self._claim_next()
+            except BaseException:
+                self._capacity.release()
+                raise
+            if not delivery:
+                self._capacity.release()
+                break
+
+            claimed += 1
+            task = asyncio.create_task(self._deliver(delivery))
+            self._in_flight.add(task)
+            task.add_done_callback(self._finish_task)
+
+        return claimed
+
+    def _finish_task(self, task: asyncio.Task):
+        self._in_flight.discard(task)
+        self._capacity.release()
+
+    async def _claim_next(self) -> Optional[Dict[str, Any]]:
+        """Atomically lease one due delivery so replicas never double-send"""
+        now = datetime.utcnow()
+        return await WebhookDelivery.get_motor_collection().find_one_and_update(
+            {
+                "$or": [
+                    {"status": "pending", "next_attempt_at": {"$lte": now}},
+                    # Leases left behind by a crashed dispatcher
+                    {"status": "in_flight", "locked_until": {"$lt": now}}
+                ]
+            },
+            {"$set": {"status": "in_flight", "locked_until": now + self.lease}},
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _deliver(self, delivery: Dict[str, Any]):
+        url = delivery["url"]
+        limit = self._endpoint_limits.setdefault(
+            url, asyncio.Semaphore(settings.webhook_per_endpoint_concurrency)
+        )
+
+        async with limit:
+            # Waiting on a busy endpoint can outlast the claim's lease; renew
+            # it now, and give up if another dispatcher has taken the row over
+            if not await self._renew_lease(delivery):
+                return
+            try:
+                await self._send_webhook(delivery)
+            except Exception as e:
+                await self._record_failure(delivery, str(e))
+                return
+
+        await WebhookDelivery.get_motor_collection().update_one(
+            self._lease_filter(delivery),
+            {"$set": {
+                "status": "delivered",
+                "delivered_at": datetime.utcnow(),
+                "locked_until": None,
+                "last_error": None
+            }}
+        )
+        self._triggered[delivery["webhook_id"]] = datetime.utcnow()
+
+    async def _renew_lease(self, delivery: Dict[str, Any]) -> bool:
+        locked_until = datetime.utcnow() + self.lease
+        result = await WebhookDelivery.get_motor_collection().update_one(
+            self._lease_filter(delivery),
+            {"$set": {"locked_until": locked_until}}
+        )
+        if result.modified_count:
+            delivery["locked_until"] = locked_until
+        return bool(result.modified_count)
+
+    def _lease_filter(self, delivery: Dict[str, Any]) -> Dict[str, Any]:
+        """Matches the row only while this dispatcher still holds its lease"""
+        return {
+            "_id": delivery["_id"],
+            "status": "in_flight",
+            "locked_until": delivery["locked_until"]
+        }
+
+    async def _send_webhook(self, delivery: Dict[str, Any]):
         """Send individual webhook"""
+        secret = await self._get_secret(delivery["webhook_id"])
+        payload = delivery["payload"]
         headers = {
             "Content-Type": "application/json",
-            "X-PromptHub-Signature": self._generate_signature(
-                payload, webhook.secret
-            )
+            "X-PromptHub-Signature": self._generate_signature(payload, secret),
+            "X-PromptHub-Delivery": str(delivery["_id"])
         }
-        
+
         response = await self.client.post(
-            webhook.url,
+            delivery["url"],
             json=payload,
             headers=headers
         )
-        
+
         response.raise_for_status()
-        
-        # Update last triggered
-        webhook.last_triggered = datetime.utcnow()
-        await webhook.save()
-    
+
+    async def _get_secret(self, webhook_id) -> str:
+        """Secrets are cached briefly so a rotation takes effect within the TTL"""
+        key = str(webhook_id)
+        cached = self._secrets.get(key)
+        if cached and cached[1] > datetime.utcnow():
+            return cached[0]
+
+        webhook = await Webhook.get(webhook_id)
+        if not webhook:
+            self._secrets.pop(key, None)
+            raise ValueError(f"Webhook {webhook_id} no longer exists")
+        self._secrets[key] = (webhook.secret, datetime.utcnow() + self._secret_ttl)
+        return webhook.secret
+
+    def forget_secret(self, webhook_id):
+        self._secrets.pop(str(webhook_id), None)
+
+    async def _record_failure(self, delivery: Dict[str, Any], error: str):
+        """Reschedule with exponential backoff, or dead-letter the delivery"""
+        attempts = delivery["attempts"] + 1
+        update = {"attempts": attempts, "last_error": error, "locked_until": None}
+
+        if attempts >= self.max_attempts:
+            update["status"] = "dead"
+            logger.warning("Webhook delivery %s dead-lettered: %s", delivery["_id"], error)
+        else:
+            update["status"] = "pending"
+            update["next_attempt_at"] = datetime.utcnow() + self._backoff(attempts)
+
+        await WebhookDelivery.get_motor_collection().update_one(
+            self._lease_filter(delivery),
+            {"$set": update}
+        )
+
+    def _backoff(self, attempts: int) -> timedelta:
+        """Exponential backoff with full jitter"""
+        ceiling = min(
+            settings.webhook_max_backoff_seconds,
+            settings.webhook_backoff_base_seconds * (2 ** (attempts - 1))
+        )
+        return timedelta(seconds=random.uniform(0, ceiling))
+
+    async def _flush_last_triggered(self):
+        """Write accumulated last_triggered timestamps in one bulk write"""
+        if not self._triggered:
+            return
+
+        triggered, self._triggered = self._triggered, {}
+        await Webhook.get_motor_collection().bulk_write(
+            [
+                UpdateOne({"_id": webhook_id}, {"$max": {"last_triggered": when}})
+                for webhook_id, when in triggered.items()
+            ],
+            ordered=False
+        )
+
     def _generate_signature(self, payload: Dict, secret: str) -> str:
         """Generate HMAC signature for webhook"""
         import hmac
         import hashlib
         import json
-        
+
         message = json.dumps(payload, sort_keys=True)
         signature = hmac.new(
             secret.encode(),
             message.encode(),
             hashlib.sha256
         ).hexdigest()
-        
-        return f"sha256={signature}"
\ No newline at end of file
+
+        return f"sha256={signature}"
+
+webhook_dispatcher = WebhookDispatcher()
@@ -0,0 +1,109 @@
+# app/utils/fetcher.py
+from typing import Optional, Dict, Any
+from datetime import timedelta
+import asyncio
+import hashlib
+import httpx
+from app.config import settings
+from app.core.cache import cache_manager
+
+class DocumentTooLargeError(ValueError):
+    pass
+
+class DocumentFetcher:
+    """Pooled HTTP fetcher with conditional GET revalidation"""
+
+    def __init__(self):
+        self.client: Optional[httpx.AsyncClient] = None
+        self.max_bytes = settings.fetch_max_size_mb * 1024 * 1024
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.fetch_timeout_seconds, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=settings.fetch_max_connections,
+                    max_keepalive_connections=settings.fetch_max_connections
+                ),
+                follow_redirects=True,
+                headers={"User-Agent": f"{settings.app_name}/{settings.version}"}
+            )
+        return self.client
+
+    async def close(self):
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+
+    async def fetch(self, url: str) -> str:
+        """Fetch a document body, revalidating any cached copy with the origin"""
+        cache_key = f"fetch:{hashlib.sha256(url.encode()).hexdigest()}"
+        cached = await cache_manager.get(cache_key)
+
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        async with self._get_client().stream("GET", url, headers=headers) as response:
+            if response.status_code == 304 and cached:
+                return cached["content"]
+
+            response.raise_for_status()
+            content = await self._read_limited(response)
+
+        entry: Dict[str, Any] = {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "content": content
+        }
+        # Only documents the origin lets us revalidate are worth keeping
+        if entry["etag"] or entry["last_modified"]:
+            await cache_manager.set(
+                cache_key,
+                entry,
+                expire=timedelta(hours=settings.fetch_cache_ttl_hours)
+            )
+
+        return content
+
+    async def download(self, url: str, path: str, max_bytes: int):
+        """Stream a binary document straight to disk"""
+        written = 0
+        async with self._get_client().stream("GET", url) as response:
+            response.raise_for_status()
+            self._check_declared_size(response, max_bytes)
+            with open(path, "wb") as out:
+                async for chunk in response.aiter_bytes():
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise DocumentTooLargeError(
+                            f"Document exceeds the {max_bytes} byte limit"
+                        )
+                    # Disk writes run in a thread, as in spool_upload
+                    await asyncio.to_thread(out.write, chunk)
+
+    def _check_declared_size(self, response: httpx.Response, max_bytes: int):
+        """Reject before reading when the origin already says the body is too large"""
+        declared = response.headers.get("content-length")
+        if declared and declared.isdigit() and int(declared) > max_bytes:
+            raise DocumentTooLargeError(
+                f"Document is {declared} bytes; the limit is {max_bytes}"
+            )
+
+    async def _read_limited(self, response: httpx.Response) -> str:
+        self._check_declared_size(response, self.max_bytes)
+
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body.extend(chunk)
+            if len(body) > self.max_bytes:
+                raise DocumentTooLargeError(
+                    f"Document exceeds the {self.max_bytes} byte limit"
+                )
+
+        return body.decode(response.encoding or "utf-8", errors="replace")
+
+document_fetcher = DocumentFetcher()
@@ -0,0 +1,198 @@
+# app/utils/guardrails.py
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Set
+import json
+import re
+import ahocorasick
+
+PROHIBITED = 0
+REQUIRED = 1
+
+class CompiledGuardrails:
+    """
+    Post-invocation content guardrails compiled into one Aho-Corasick
+    automaton, so every prohibited term and required element is checked in
+    a single pass over the case-folded output.
+
+    Config keys:
+        prohibited_terms: literal terms, matched case-insensitively
+        prohibited_patterns: regular expressions, matched case-insensitively
+        required_elements: literals that must appear in the output
+        whole_word: only match prohibited terms on word boundaries
+        required_case_sensitive: match required elements exactly (default True)
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.prohibited_terms: List[str] = list(config.get('prohibited_terms') or [])
+        self.required_elements: List[str] = list(config.get('required_elements') or [])
+        self.whole_word = bool(config.get('whole_word', False))
+        self.required_case_sensitive = bool(config.get('required_case_sensitive', True))
+        self.patterns = [
+            (pattern, re.compile(pattern, re.IGNORECASE))
+            for pattern in config.get('prohibited_patterns') or []
+        ]
+
+        self.automaton = ahocorasick.Automaton()
+        keywords: Dict[str, List[tuple]] = {}
+        for kind, terms in ((PROHIBITED, self.prohibited_terms), (REQUIRED, self.required_elements)):
+            for index, term in enumerate(terms):
+                if term:
+                    keywords.setdefault(term.casefold(), []).append((kind, index))
+        for keyword, entries in keywords.items():
+            self.automaton.add_word(keyword, (len(keyword), entries))
+
+        self.is_empty = not keywords
+        if not self.is_empty:
+            self.automaton.make_automaton()
+        self.max_keyword_length = max((len(keyword) for keyword in keywords), default=0)
+
+    def check(self, output: str) -> List[str]:
+        """Return guardrail issues for a complete output"""
+        found_prohibited, found_required = self.scan(output)
+        issues = [
+            f"Prohibited term found: {self.prohibited_terms[index]}"
+            for index in sorted(found_prohibited)
+        ]
+        issues.extend(
+            f"Prohibited pattern found: {pattern}"
+            for pattern, compiled in self.patterns
+            if compiled.search(output)
+        )
+        issues.extend(
+            f"Required element missing: {element}"
+            for index, element in enumerate(self.required_elements)
+            if index not in found_required
+        )
+        return issues
+
+    def scan(self, text: str):
+        """Indices of prohibited terms and required elements present in text"""
+        found_prohibited: Set[int] = set()
+        found_required: Set[int] = set()
+        if self.is_empty:
+            return found_prohibited, found_required
+
+        folded = text.casefold()
+        # Folding can change length (e.g. "ß" -> "ss"); offsets only map back when it does not
+        aligned = len(folded) == len(text)
+
+        for end, (length, entries) in self.automaton.iter(folded):
+            start = end - length + 1
+            for kind, index in entries:
+                if kind == PROHIBITED:
+                    if not self.whole_word or self._on_word_boundary(folded, start, end):
+                        found_prohibited.add(index)
+                elif not self.required_case_sensitive:
+                    found_required.add(index)
+                elif aligned:
+                    if text[start:end + 1] == self.required_elements[index]:
+                        found_required.add(index)
+                elif self.required_elements[index] in text:
+                    found_required.add(index)
+
+        return found_prohibited, found_required
+
+    def _on_word_boundary(self, text: str, start: int, end: int) -> bool:
+        before = text[start - 1] if start > 0 else " "
+        after = text[end + 1] if end + 1 < len(text) else " "
+        return not _is_word_char(before) and not _is_word_char(after)
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+def compile_guardrails(config: Dict[str, Any]) -> CompiledGuardrails:
+    """Compiled guardrails for a config, shared by every version that uses it"""
+    return _compile(json.dumps(config or {}, sort_keys=True, default=str))
+
+@lru_cache(maxsize=1024)
+def _compile(config_json: str) -> CompiledGuardrails:
+    return CompiledGuardrails(json.loads(config_json))
+
+class StreamingGuardrail:
+    """
+    Incremental guardrail check over a generation as it streams in. Keeps
+    the tail of the folded text between chunks so terms split across chunk
+    boundaries are still caught; `feed` returns an abort reason as soon as a
+    prohibited term, pattern or format violation is seen.
+    """
+
+    def __init__(
+        self,
+        guardrails: CompiledGuardrails,
+        expected_format: Dict[str, Any] = None,
+        pattern_window: int = 256
+    ):
+        self.guardrails = guardrails
+        self.expected_format = expected_format or {}
+        self.pattern_window = pattern_window
+        self.chars_seen = 0
+        self._folded_tail = ""
+        self._raw_tail = ""
+        self._format_checked = False
+
+    def feed(self, chunk: str) -> Optional[str]:
+        if not chunk:
+            return None
+        self.chars_seen += len(chunk)
+
+        return self._check_format(chunk) or self._check_terms(chunk) or self._check_patterns(chunk)
+
+    def _check_format(self, chunk: str) -> Optional[str]:
+        max_chars = self.expected_format.get('max_chars')
+        if max_chars and self.chars_seen > max_chars:
+            return f"Output exceeded {max_chars} characters"
+
+        if self._format_checked or self.expected_format.get('type') != 'json':
+            return None
+        stripped = chunk.lstrip()
+        if not stripped:
+            return None
+        self._format_checked = True
+        if stripped[0] not in "{[":
+            return "Output format does not match expected structure: expected JSON"
+        return None
+
+    def _check_terms(self, chunk: str) -> Optional[str]:
+        guardrails = self.guardrails
+        if not guardrails.prohibited_terms:
+            return None
+
+        # The tail holds the longest keyword plus the character before it, so
+        # a match ending on the previous chunk's last character is re-checked
+        # now that the character after it is known
+        buffer = self._folded_tail + chunk.casefold()
+        self._folded_tail = buffer[-(guardrails.max_keyword_length + 1):]
+
+        for end, (length, entries) in guardrails.automaton.iter(buffer):
+            start = end - length + 1
+            if guardrails.whole_word and end == len(buffer) - 1:
+                continue
+            for kind, index in entries:
+                if kind != PROHIBITED:
+                    continue
+                if not guardrails.whole_word or guardrails._on_word_boundary(buffer, start, end):
+                    return f"Prohibited term found: {guardrails.prohibited_terms[index]}"
+        return None
+
+    def _check_patterns(self, chunk: str) -> Optional[str]:
+        if not self.guardrails.patterns:
+            return None
+
+        buffer = self._raw_tail + chunk
+        self._raw_tail = buffer[-self.pattern_window:]
+        for pattern, compiled in self.guardrails.patterns:
+            if compiled.search(buffer):
+                return f"Prohibited pattern found: {pattern}"
+        return None
+
+    def finish(self) -> Optional[str]:
+        """Check the deferred end-of-stream word boundary once generation completes"""
+        guardrails = self.guardrails
+        if not guardrails.whole_word or not self._folded_tail:
+            return None
+        for end, (length, entries) in guardrails.automaton.iter(self._folded_tail):
+            start = end - length + 1
+            for kind, index in entries:
+                if kind == PROHIBITED and guardrails._on_word_boundary(self._folded_tail, start, end):
+                    return f"Prohibited term found: {guardrails.prohibited_terms[index]}"
+        return None
@@ -0,0 +1,98 @@
+# app/utils/minhash.py
+from typing import Dict, Hashable, List, Set, Tuple
+import re
+import zlib
+import numpy as np
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+SHINGLE_SIZE = 3
+TOKEN = re.compile(r"\w+")
+
+class MinHasher:
+    """MinHash signatures over word shingles, vectorized with numpy"""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        generator = np.random.RandomState(seed)
+        # a, b < 2**32 and shingle hashes < 2**32 keep a * h + b inside uint64
+        self.a = generator.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = self._shingle_hashes(text)
+        if hashes.size == 0:
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint64)
+
+        permuted = (np.outer(hashes, self.a) + self.b) % MERSENNE_PRIME
+        return (permuted & MAX_HASH).min(axis=0)
+
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        tokens = TOKEN.findall(text.lower())
+        if len(tokens) < SHINGLE_SIZE:
+            shingles = {" ".join(tokens)} if tokens else set()
+        else:
+            shingles = {
+                " ".join(tokens[i:i + SHINGLE_SIZE])
+                for i in range(len(tokens) - SHINGLE_SIZE + 1)
+            }
+        return np.fromiter(
+            (zlib.crc32(shingle.encode()) for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+
+def jaccard(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures"""
+    return float(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
+
+class LSHIndex:
+    """Banded locality-sensitive hashing over MinHash signatures"""
+
+    def __init__(self, num_perm: int = 128, bands: int = 32):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.buckets: List[Dict[bytes, Set[Hashable]]] = [{} for _ in range(bands)]
+        self.signatures: Dict[Hashable, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def add(self, key: Hashable, signature: np.ndarray):
+        if key in self.signatures:
+            self.remove(key)
+        self.signatures[key] = signature
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self.buckets[band].setdefault(band_key, set()).add(key)
+
+    def remove(self, key: Hashable):
+        signature = self.signatures.pop(key, None)
+        if signature is None:
+            return
+        for band, band_key in enumerate(self._band_keys(signature)):
+            bucket = self.buckets[band].get(band_key)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self.buckets[band][band_key]
+
+    def query(self, signature: np.ndarray, threshold: float) -> List[Tuple[Hashable, float]]:
+        """Keys whose estimated similarity is at least threshold, most similar first"""
+        candidates: Set[Hashable] = set()
+        for band, band_key in enumerate(self._band_keys(signature)):
+            candidates.update(self.buckets[band].get(band_key, ()))
+
+        matches = []
+        for key in candidates:
+            similarity = jaccard(signature, self.signatures[key])
+            if similarity >= threshold:
+                matches.append((key, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
@@ -0,0 +1,96 @@
+# app/utils/pdf.py
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, List, Optional
+import asyncio
+from app.config import settings
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+def get_pdf_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.pdf_worker_processes)
+    return _executor
+
+def shutdown_pdf_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+async def warm_pdf_pool():
+    """Start the worker processes and import PyPDF2 in them ahead of the first upload"""
+    loop = asyncio.get_running_loop()
+    executor = get_pdf_executor()
+    await asyncio.gather(*(
+        loop.run_in_executor(executor, _import_parser)
+        for _ in range(settings.pdf_worker_processes)
+    ))
+
+def _import_parser():
+    import PyPDF2  # noqa: F401
+
+def _read_error(e: Exception) -> ValueError:
+    # PyPDF2's errors are not ValueErrors; callers treat ValueError as a bad upload
+    return ValueError(f"Could not read PDF: {e}")
+
+def _count_pages(path: str) -> int:
+    import PyPDF2
+    from PyPDF2.errors import PyPdfError
+    try:
+        return len(PyPDF2.PdfReader(path).pages)
+    except PyPdfError as e:
+        raise _read_error(e) from None
+
+def _extract_page_range(path: str, start: int, stop: int) -> List[str]:
+    """Runs in a worker process; returns the text of pages [start, stop)"""
+    import PyPDF2
+    from PyPDF2.errors import PyPdfError
+    try:
+        reader = PyPDF2.PdfReader(path)
+        return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+    except PyPdfError as e:
+        raise _read_error(e) from None
+
+async def iter_pdf_pages(
+    path: str,
+    max_pages: Optional[int] = None,
+    pages_per_batch: Optional[int] = None
+) -> AsyncIterator[str]:
+    """
+    Yield page text in order while parsing happens in the process pool.
+    The next batch is already being parsed while the current one is consumed.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_pdf_executor()
+    max_pages = max_pages or settings.max_pdf_pages
+    pages_per_batch = pages_per_batch or settings.pdf_pages_per_batch
+
+    page_count = await loop.run_in_executor(executor, _count_pages, path)
+    if page_count > max_pages:
+        raise ValueError(f"PDF has {page_count} pages; the limit is {max_pages}")
+
+    batches = [
+        (start, min(start + pages_per_batch, page_count))
+        for start in range(0, page_count, pages_per_batch)
+    ]
+    pending = [
+        loop.run_in_executor(executor, _extract_page_range, path, start, stop)
+        for start, stop in batches[:2]
+    ]
+    next_batch = 2
+
+    try:
+        while pending:
+            pages = await pending.pop(0)
+            if next_batch < len(batches):
+                start, stop = batches[next_batch]
+                pending.append(
+                    loop.run_in_executor(executor, _extract_page_range, path, start, stop)
+                )
+                next_batch += 1
+            for page in pages:
+                yield page
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,68 @@
+# app/utils/text_chunker.py
+from typing import List
+import re
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+
+def chunk_text(text: str, chunk_size: int = 4000, overlap: int = 400) -> List[str]:
+    """
+    Split text into chunks of at most chunk_size characters, breaking on
+    paragraph and then sentence boundaries. Consecutive chunks share up to
+    `overlap` characters so prompts that straddle a boundary are still seen
+    whole by at least one chunk.
+    """
+    if len(text) <= chunk_size:
+        return [text] if text.strip() else []
+
+    units = _split_units(text, chunk_size)
+
+    chunks = []
+    current: List[str] = []
+    current_len = 0
+    for unit in units:
+        if current and current_len + len(unit) > chunk_size:
+            chunks.append("\n".join(current))
+            current, current_len = _tail(current, overlap)
+            # Shrink the overlap rather than exceed the chunk size
+            while current and current_len + len(unit) > chunk_size:
+                current_len -= len(current.pop(0)) + 1
+        current.append(unit)
+        current_len += len(unit) + 1
+
+    if current:
+        chunks.append("\n".join(current))
+
+    return chunks
+
+def _split_units(text: str, chunk_size: int) -> List[str]:
+    """Break text into paragraphs, sentences or hard slices no larger than chunk_size"""
+    units = []
+    for paragraph in PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= chunk_size:
+            units.append(paragraph)
+            continue
+
+        for sentence in SENTENCE_BREAK.split(paragraph):
+            if len(sentence) <= chunk_size:
+                units.append(sentence)
+            else:
+                units.extend(
+                    sentence[i:i + chunk_size]
+                    for i in range(0, len(sentence), chunk_size)
+                )
+    return units
+
+def _tail(units: List[str], overlap: int):
+    """Trailing units of the previous chunk that fit in the overlap budget"""
+    tail: List[str] = []
+    length = 0
+    for unit in reversed(units):
+        if length + len(unit) + 1 > overlap:
+            break
+        tail.insert(0, unit)
+        length += len(unit) + 1
+    return tail, length
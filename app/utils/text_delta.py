@@ -0,0 +1,61 @@
+# app/utils/text_delta.py
+from difflib import SequenceMatcher, unified_diff
+from typing import List, Optional, Union
+
+# A delta is a list of line operations applied to the base text in order:
+#   n > 0  copy the next n base lines
+#   n < 0  skip the next -n base lines
+#   "..."  insert this text
+DeltaOp = Union[int, str]
+
+def make_delta(base: Optional[str], target: Optional[str]) -> Optional[List[DeltaOp]]:
+    """Line-level delta that turns base into target; None when target is None"""
+    if target is None:
+        return None
+
+    base_lines = (base or "").splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    matcher = SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+
+    delta: List[DeltaOp] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            delta.append(i2 - i1)
+            continue
+        if i2 > i1:
+            delta.append(-(i2 - i1))
+        if j2 > j1:
+            delta.append("".join(target_lines[j1:j2]))
+    return delta
+
+def apply_delta(base: Optional[str], delta: Optional[List[DeltaOp]]) -> Optional[str]:
+    if delta is None:
+        return None
+
+    base_lines = (base or "").splitlines(keepends=True)
+    position = 0
+    parts: List[str] = []
+    for op in delta:
+        if isinstance(op, str):
+            parts.append(op)
+        elif op > 0:
+            parts.extend(base_lines[position:position + op])
+            position += op
+        else:
+            position -= op
+    return "".join(parts)
+
+def delta_size(delta: Optional[List[DeltaOp]]) -> int:
+    """Approximate stored size of a delta in characters"""
+    if not delta:
+        return 0
+    return sum(len(op) if isinstance(op, str) else 4 for op in delta)
+
+def text_diff(before: Optional[str], after: Optional[str], from_label: str, to_label: str) -> str:
+    """Unified diff between two bodies"""
+    return "".join(unified_diff(
+        (before or "").splitlines(keepends=True),
+        (after or "").splitlines(keepends=True),
+        fromfile=from_label,
+        tofile=to_label
+    ))
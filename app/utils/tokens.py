@@ -0,0 +1,149 @@
+# app/utils/tokens.py
+from collections import OrderedDict
+from fractions import Fraction
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+import asyncio
+import hashlib
+import math
+import threading
+
+DEFAULT_ENCODING = "cl100k_base"
+
+# Claude 3 has no published local tokenizer. cl100k_base counts are padded
+# so context-window checks err towards rejecting rather than overflowing.
+# Exact arithmetic: with 1.1 as a float, ceil(floor(187 / 1.1) * 1.1) is 188.
+ANTHROPIC_PADDING = Fraction(11, 10)
+
+# Chat framing added per message and to prime the reply (OpenAI cookbook)
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+COUNT_CACHE_SIZE = 1024
+
+@lru_cache(maxsize=None)
+def get_encoding(provider: str, model: str):
+    """tiktoken encoder for a model, built once per process"""
+    import tiktoken
+
+    if provider == "openai":
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            pass
+    return tiktoken.get_encoding(DEFAULT_ENCODING)
+
+def _scale(provider: str, count: int) -> int:
+    return math.ceil(count * ANTHROPIC_PADDING) if provider == "anthropic" else count
+
+def _unscale(provider: str, max_tokens: int) -> int:
+    """Largest raw count whose padded count is at most max_tokens"""
+    return math.floor(max_tokens / ANTHROPIC_PADDING) if provider == "anthropic" else max_tokens
+
+class _CountCache:
+    """
+    LRU of token counts keyed by a digest of the text, so repeated texts
+    such as system prompts are counted once without the cache holding on
+    to the texts themselves
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._counts: "OrderedDict[Tuple[bytes, str, str], int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, text: str, provider: str, model: str) -> Tuple[bytes, str, str]:
+        return hashlib.blake2b(text.encode(), digest_size=16).digest(), provider, model
+
+    def get(self, key) -> Optional[int]:
+        with self._lock:
+            count = self._counts.get(key)
+            if count is not None:
+                self._counts.move_to_end(key)
+            return count
+
+    def put(self, key, count: int):
+        with self._lock:
+            self._counts[key] = count
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.maxsize:
+                self._counts.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+
+_count_cache = _CountCache(COUNT_CACHE_SIZE)
+
+def _count(text: str, provider: str, model: str) -> int:
+    if not text:
+        return 0
+    return _scale(provider, len(get_encoding(provider, model).encode_ordinary(text)))
+
+def count_tokens(text: str, provider: str, model: str) -> int:
+    """Token count of a single text; repeated texts such as system prompts hit the cache"""
+    if not text:
+        return 0
+    key = _count_cache.key(text, provider, model)
+    count = _count_cache.get(key)
+    if count is None:
+        count = _count(text, provider, model)
+        _count_cache.put(key, count)
+    return count
+
+def count_tokens_batch(
+    texts: Sequence[str],
+    provider: str,
+    model: str,
+    num_threads: int = 8
+) -> List[int]:
+    """
+    Token counts for many texts, equal to count_tokens for each. Cached texts
+    are reused; tiktoken encodes the rest in parallel outside the GIL.
+    """
+    keys = [_count_cache.key(text, provider, model) if text else None for text in texts]
+    counts = [_count_cache.get(key) if key else 0 for key in keys]
+    missing = [index for index, count in enumerate(counts) if count is None]
+    if missing:
+        encoded = get_encoding(provider, model).encode_ordinary_batch(
+            [texts[index] for index in missing], num_threads=num_threads
+        )
+        for index, tokens in zip(missing, encoded):
+            counts[index] = _scale(provider, len(tokens))
+            _count_cache.put(keys[index], counts[index])
+    return counts
+
+def count_prompt_tokens(
+    prompt: str,
+    provider: str,
+    model: str,
+    system_prompt: Optional[str] = None
+) -> int:
+    """Input tokens of a chat request made from a user prompt and optional system prompt"""
+    messages = [text for text in (system_prompt, prompt) if text]
+    return (
+        sum(count_tokens(text, provider, model) for text in messages)
+        + TOKENS_PER_MESSAGE * len(messages)
+        + TOKENS_PER_REPLY
+    )
+
+def trim_to_tokens(text: str, max_tokens: int, provider: str, model: str) -> str:
+    """Keep the beginning of text whose count_tokens is at most max_tokens"""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text, provider, model) <= max_tokens:
+        return text
+
+    encoding = get_encoding(provider, model)
+    tokens = encoding.encode_ordinary(text)
+    budget = _unscale(provider, max_tokens)
+    trimmed = encoding.decode(tokens[:budget])
+    # Decoding a cut sequence can re-encode to more tokens than were kept
+    while budget > 0 and _count(trimmed, provider, model) > max_tokens:
+        budget -= 1
+        trimmed = encoding.decode(tokens[:budget])
+    return trimmed
+
+async def warm_tokenizers():
+    """Load the BPE ranks (downloaded on first use) before the first request needs them"""
+    await asyncio.to_thread(get_encoding, "openai", "gpt-4")
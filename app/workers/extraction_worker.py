@@ -0,0 +1,249 @@
+# app/workers/extraction_worker.py
+from typing import Dict, Any, Optional
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument, UpdateOne
+import asyncio
+import logging
+import os
+import socket
+import tempfile
+from app.config import settings
+from app.database import connect_to_mongodb, close_mongodb_connection
+from app.models.extraction_job import ExtractionJob
+from app.models.prompt_source import PromptSource
+from app.services.extraction_service import ExtractionService
+from app.utils.fetcher import document_fetcher
+from app.utils.pdf import shutdown_pdf_executor
+
+logger = logging.getLogger(__name__)
+
+class ExtractionWorker:
+    """Runs bulk extraction jobs outside the API process"""
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.lease = timedelta(seconds=settings.extraction_job_lease_seconds)
+        self.extraction_service = ExtractionService()
+
+    async def run(self):
+        while True:
+            # A transient Mongo error must not take the worker down
+            try:
+                if not await self._run_once():
+                    await asyncio.sleep(settings.extraction_worker_poll_seconds)
+            except Exception:
+                logger.exception("Extraction worker iteration failed")
+                await asyncio.sleep(settings.extraction_worker_poll_seconds)
+
+    async def _run_once(self) -> bool:
+        """Claim and process one job; False when there was nothing to do"""
+        await self._fail_exhausted()
+        job = await self._claim_next()
+        if not job:
+            return False
+
+        try:
+            await self._process(job)
+        except Exception as e:
+            logger.exception("Extraction job %s failed", job["_id"])
+            await self._collection().update_one(
+                {"_id": job["_id"], "worker_id": self.worker_id},
+                {"$set": {
+                    "status": "failed",
+                    "finished_at": datetime.utcnow(),
+                    "locked_until": None,
+                    "error": str(e)
+                }}
+            )
+        return True
+
+    def _collection(self):
+        return ExtractionJob.get_motor_collection()
+
+    async def _claim_next(self) -> Optional[Dict[str, Any]]:
+        """Lease the oldest queued job, or one whose worker stopped heartbeating"""
+        now = datetime.utcnow()
+        return await self._collection().find_one_and_update(
+            {
+                "$or": [
+                    {"status": "queued"},
+                    {
+                        "status": "running",
+                        "locked_until": {"$lt": now},
+                        "attempts": {"$lt": settings.extraction_job_max_attempts}
+                    }
+                ]
+            },
+            # Pipeline update so a takeover keeps the original started_at
+            [{"$set": {
+                "status": "running",
+                "worker_id": self.worker_id,
+                "locked_until": now + self.lease,
+                "started_at": {"$ifNull": ["$started_at", now]},
+                "attempts": {"$add": [{"$ifNull": ["$attempts", 0]}, 1]}
+            }}],
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _fail_exhausted(self):
+        """
+        Fail jobs whose lease expired after their last allowed attempt; a job
+        that keeps killing its worker (e.g. out of memory) is not re-leased forever
+        """
+        max_attempts = settings.extraction_job_max_attempts
+        await self._collection().update_many(
+            {
+                "status": "running",
+                "locked_until": {"$lt": datetime.utcnow()},
+                "attempts": {"$gte": max_attempts}
+            },
+            {"$set": {
+                "status": "failed",
+                "finished_at": datetime.utcnow(),
+                "locked_until": None,
+                "error": f"Worker lost the job {max_attempts} times; giving up"
+            }}
+        )
+
+    async def _process(self, job: Dict[str, Any]):
+        limit = asyncio.Semaphore(settings.extraction_worker_concurrency)
+        heartbeat = asyncio.create_task(self._heartbeat(job["_id"]))
+
+        async def process_item(index: int, item: Dict[str, Any]):
+            async with limit:
+                await self._process_item(job, index, item)
+
+        try:
+            # Items finished before a takeover are not redone; ones the previous
+            # worker left in processing are, and their sources are upserted
+            await asyncio.gather(*(
+                process_item(index, item)
+                for index, item in enumerate(job["items"])
+                if item["status"] in ("pending", "processing")
+            ))
+        finally:
+            heartbeat.cancel()
+
+        await self._collection().update_one(
+            {"_id": job["_id"], "worker_id": self.worker_id},
+            {"$set": {"status": "completed", "finished_at": datetime.utcnow(), "locked_until": None}}
+        )
+
+    async def _process_item(self, job: Dict[str, Any], index: int, item: Dict[str, Any]):
+        # Every item write is fenced by worker_id, so a worker that lost its
+        # lease cannot update items or counters the new owner is handling
+        claimed = await self._collection().update_one(
+            {
+                "_id": job["_id"],
+                "worker_id": self.worker_id,
+                f"items.{index}.status": {"$in": ["pending", "processing"]}
+            },
+            {"$set": {f"items.{index}.status": "processing"}}
+        )
+        if not claimed.matched_count:
+            return
+
+        url = item["source_url"]
+        try:
+            prompts = await self._extract(url, job["application_id"])
+        except Exception as e:
+            await self._finish_item(job, index, {
+                f"items.{index}.status": "failed",
+                f"items.{index}.error": str(e)
+            }, {"processed": 1, "failed": 1})
+            return
+
+        if prompts:
+            await self._save_sources(job, index, url, prompts)
+
+        await self._finish_item(job, index, {
+            f"items.{index}.status": "completed",
+            f"items.{index}.prompt_count": len(prompts)
+        }, {"processed": 1, "prompt_count": len(prompts)})
+
+    async def _finish_item(
+        self,
+        job: Dict[str, Any],
+        index: int,
+        fields: Dict[str, Any],
+        counters: Dict[str, int]
+    ):
+        result = await self._collection().update_one(
+            {
+                "_id": job["_id"],
+                "worker_id": self.worker_id,
+                f"items.{index}.status": "processing"
+            },
+            {"$set": fields, "$inc": counters}
+        )
+        if not result.matched_count:
+            logger.warning("Lost the lease on job %s; item %s not recorded", job["_id"], index)
+
+    async def _save_sources(self, job: Dict[str, Any], index: int, url: str, prompts):
+        """Upsert keyed on (job, item, position) so a retried item doesn't duplicate sources"""
+        now = datetime.utcnow()
+        await PromptSource.get_motor_collection().bulk_write([
+            UpdateOne(
+                {"job_id": job["_id"], "item_index": index, "position": position},
+                {"$setOnInsert": {
+                    "prompt_id": None,
+                    "application_id": job["application_id"],
+                    "source_type": prompt["source_type"],
+                    "source_url": url,
+                    "source_content": prompt.get("content"),
+                    "extracted_by": prompt.get("extracted_by"),
+                    "extraction_metadata": {
+                        **prompt.get("extraction_metadata", {}),
+                        "name": prompt.get("name"),
+                        "description": prompt.get("description"),
+                        "required_fields": prompt.get("required_fields", []),
+                        "context": prompt.get("context"),
+                        "near_duplicates": prompt.get("near_duplicates", [])
+                    },
+                    "created_at": now
+                }},
+                upsert=True
+            )
+            for position, prompt in enumerate(prompts)
+        ], ordered=False)
+
+    async def _extract(self, url: str, application_id):
+        if not url.lower().split("?")[0].endswith(".pdf"):
+            return await self.extraction_service.extract_from_url(url, application_id)
+
+        fd, path = tempfile.mkstemp(suffix=".pdf")
+        os.close(fd)
+        try:
+            await document_fetcher.download(
+                url, path, max_bytes=settings.max_upload_size_mb * 1024 * 1024
+            )
+            prompts = await self.extraction_service.extract_from_pdf(path, application_id)
+        finally:
+            os.unlink(path)
+
+        for prompt in prompts:
+            prompt["source_url"] = url
+        return prompts
+
+    async def _heartbeat(self, job_id):
+        """Extend the lease while the job is being worked on"""
+        while True:
+            await asyncio.sleep(self.lease.total_seconds() / 3)
+            await self._collection().update_one(
+                {"_id": job_id, "worker_id": self.worker_id},
+                {"$set": {"locked_until": datetime.utcnow() + self.lease}}
+            )
+
+async def main():
+    logging.basicConfig(level=logging.INFO)
+    await connect_to_mongodb()
+    try:
+        await ExtractionWorker().run()
+    finally:
+        shutdown_pdf_executor()
+        await document_fetcher.close()
+        await close_mongodb_connection()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,246 @@
+# benchmarks/fake_provider.py
+"""
+Stand-in for the OpenAI and Anthropic chat APIs so benchmarks exercise the
+real SDK clients without network access or spend.
+
+    POST /v1/chat/completions   OpenAI chat completions (stream or not)
+    POST /v1/messages           Anthropic messages (stream or not)
+
+Latency, token rate, response length and the share of requests rejected
+with 429 are configurable. Run standalone with
+`python -m benchmarks.fake_provider --port 8900` or in-process through
+FakeProviderServer.
+"""
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Any, Optional
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+import uuid
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import uvicorn
+
+@dataclass
+class FakeProviderConfig:
+    latency_ms: float = 50.0            # time to first token
+    tokens_per_second: float = 200.0    # generation rate after the first token
+    output_tokens: int = 64
+    error_rate: float = 0.0             # share of requests answered with 429
+    retry_after_seconds: int = 1
+    seed: Optional[int] = None
+
+WORDS = ("lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit")
+
+def _tokens(count: int):
+    return [f"{WORDS[i % len(WORDS)]} " for i in range(count)]
+
+def _prompt_tokens(messages) -> int:
+    # Rough count; the SDKs only echo it back in usage
+    return sum(len(str(message.get("content", ""))) // 4 + 1 for message in messages)
+
+def _sse(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+def create_app(config: FakeProviderConfig) -> FastAPI:
+    app = FastAPI(title="Fake LLM provider")
+    rng = random.Random(config.seed)
+    stats = {"requests": 0, "rate_limited": 0}
+    app.state.stats = stats
+
+    def rate_limited() -> Optional[JSONResponse]:
+        stats["requests"] += 1
+        if config.error_rate and rng.random() < config.error_rate:
+            stats["rate_limited"] += 1
+            return JSONResponse(
+                {"error": {"type": "rate_limit_error", "message": "Rate limit exceeded (fake provider)"}},
+                status_code=429,
+                headers={"retry-after": str(config.retry_after_seconds)}
+            )
+        return None
+
+    async def generate(count: int) -> AsyncIterator[str]:
+        await asyncio.sleep(config.latency_ms / 1000)
+        interval = 1 / config.tokens_per_second if config.tokens_per_second else 0
+        for i, token in enumerate(_tokens(count)):
+            if i and interval:
+                await asyncio.sleep(interval)
+            yield token
+
+    async def complete(count: int) -> str:
+        generation = config.output_tokens / config.tokens_per_second if config.tokens_per_second else 0
+        await asyncio.sleep(config.latency_ms / 1000 + generation)
+        return "".join(_tokens(count))
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        if response := rate_limited():
+            return response
+        body = await request.json()
+        count = min(body.get("max_tokens") or config.output_tokens, config.output_tokens)
+        prompt_tokens = _prompt_tokens(body.get("messages", []))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = body.get("model", "gpt-3.5-turbo")
+
+        if not body.get("stream"):
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": await complete(count)},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": count,
+                    "total_tokens": prompt_tokens + count
+                }
+            }
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+            return _sse({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            })
+
+        async def events():
+            yield chunk({"role": "assistant", "content": ""})
+            async for token in generate(count):
+                yield chunk({"content": token})
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1/messages")
+    async def messages(request: Request):
+        if response := rate_limited():
+            return response
+        body = await request.json()
+        count = min(body.get("max_tokens") or config.output_tokens, config.output_tokens)
+        input_tokens = _prompt_tokens(body.get("messages", []))
+        message = {
+            "id": f"msg_{uuid.uuid4().hex}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "claude-3-sonnet"),
+            "stop_sequence": None
+        }
+
+        if not body.get("stream"):
+            return {
+                **message,
+                "content": [{"type": "text", "text": await complete(count)}],
+                "stop_reason": "end_turn",
+                "usage": {"input_tokens": input_tokens, "output_tokens": count}
+            }
+
+        async def events():
+            yield _sse({
+                "type": "message_start",
+                "message": {
+                    **message,
+                    "content": [],
+                    "stop_reason": None,
+                    "usage": {"input_tokens": input_tokens, "output_tokens": 1}
+                }
+            }, "message_start")
+            yield _sse({
+                "type": "content_block_start",
+                "index": 0,
+                "content_block": {"type": "text", "text": ""}
+            }, "content_block_start")
+            async for token in generate(count):
+                yield _sse({
+                    "type": "content_block_delta",
+                    "index": 0,
+                    "delta": {"type": "text_delta", "text": token}
+                }, "content_block_delta")
+            yield _sse({"type": "content_block_stop", "index": 0}, "content_block_stop")
+            yield _sse({
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                "usage": {"output_tokens": count}
+            }, "message_delta")
+            yield _sse({"type": "message_stop"}, "message_stop")
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+class FakeProviderServer:
+    """Runs the fake provider on a background thread with its own event loop"""
+
+    def __init__(self, config: FakeProviderConfig, host: str = "127.0.0.1", port: int = 8900):
+        self.app = create_app(config)
+        self.host = host
+        self.port = port
+        self._server = uvicorn.Server(
+            uvicorn.Config(self.app, host=host, port=port, log_level="warning", access_log=False)
+        )
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def openai_base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    @property
+    def anthropic_base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return dict(self.app.state.stats)
+
+    def start(self, timeout: float = 10.0):
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError(f"Fake provider did not start on {self.host}:{self.port}")
+            time.sleep(0.01)
+
+    def stop(self):
+        self._server.should_exit = True
+        if self._thread:
+            self._thread.join(timeout=10)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI/Anthropic chat API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--output-tokens", type=int, default=64)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = FakeProviderConfig(
+        latency_ms=args.latency_ms,
+        tokens_per_second=args.tokens_per_second,
+        output_tokens=args.output_tokens,
+        error_rate=args.error_rate
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
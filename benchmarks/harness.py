@@ -0,0 +1,143 @@
+# benchmarks/harness.py
+from dataclasses import dataclass, asdict
+from typing import Awaitable, Callable, Dict, List, Any, Optional
+import asyncio
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+Operation = Callable[[], Awaitable[Any]]
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    requests: int
+    concurrency: int
+    errors: int
+    duration_s: float
+    rps: float
+    mean_ms: float
+    p50_ms: float
+    p99_ms: float
+    alloc_kb_per_request: Optional[float] = None
+    peak_alloc_kb: Optional[float] = None
+    error_sample: Optional[str] = None
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+async def _drive(operation: Operation, requests: int, concurrency: int):
+    latencies: List[float] = []
+    errors: List[BaseException] = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                await operation()
+            except Exception as e:
+                errors.append(e)
+            else:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+async def run_benchmark(
+    name: str,
+    operation: Operation,
+    requests: int = 200,
+    concurrency: int = 10,
+    warmup: int = 10,
+    alloc_requests: int = 50
+) -> BenchmarkResult:
+    """
+    Throughput and latency from an untraced run, then allocations from a
+    separate smaller run under tracemalloc, which would skew the timings.
+    """
+    await _drive(operation, warmup, min(warmup, concurrency) or 1)
+
+    latencies, errors, duration = await _drive(operation, requests, concurrency)
+    result = BenchmarkResult(
+        name=name,
+        requests=requests,
+        concurrency=concurrency,
+        errors=len(errors),
+        duration_s=round(duration, 3),
+        rps=round(len(latencies) / duration, 2) if duration else 0.0,
+        mean_ms=round(statistics.fmean(latencies), 2) if latencies else 0.0,
+        p50_ms=round(percentile(latencies, 50), 2),
+        p99_ms=round(percentile(latencies, 99), 2),
+        error_sample=repr(errors[0]) if errors else None
+    )
+
+    if alloc_requests:
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            await _drive(operation, alloc_requests, concurrency)
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename") if stat.size_diff > 0)
+        result.alloc_kb_per_request = round(allocated / alloc_requests / 1024, 2)
+        result.peak_alloc_kb = round(peak / 1024, 1)
+
+    return result
+
+def save_baseline(results: List[BenchmarkResult], path: Path, parameters: Dict[str, Any]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "created_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "parameters": parameters,
+        "results": {result.name: asdict(result) for result in results}
+    }, indent=2))
+
+def compare_to_baseline(
+    results: List[BenchmarkResult],
+    path: Path,
+    tolerance: float = 0.1
+) -> List[str]:
+    """Descriptions of every metric that is worse than the baseline by more than tolerance"""
+    baseline = json.loads(path.read_text())["results"]
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if not previous:
+            continue
+        if previous["rps"] and result.rps < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{result.name}: rps {previous['rps']} -> {result.rps}")
+        for metric in ("p50_ms", "p99_ms", "alloc_kb_per_request"):
+            before, after = previous.get(metric), getattr(result, metric)
+            if before and after is not None and after > before * (1 + tolerance):
+                regressions.append(f"{result.name}: {metric} {before} -> {after}")
+        if result.errors > previous.get("errors", 0):
+            regressions.append(f"{result.name}: errors {previous.get('errors', 0)} -> {result.errors}")
+    return regressions
+
+def print_results(results: List[BenchmarkResult]):
+    header = f"{'benchmark':<24} {'rps':>9} {'p50 ms':>9} {'p99 ms':>9} {'KB/req':>9} {'peak KB':>9} {'errors':>7}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r.name:<24} {r.rps:>9.1f} {r.p50_ms:>9.2f} {r.p99_ms:>9.2f} "
+            f"{r.alloc_kb_per_request if r.alloc_kb_per_request is not None else '-':>9} "
+            f"{r.peak_alloc_kb if r.peak_alloc_kb is not None else '-':>9} {r.errors:>7}"
+        )
+        if r.error_sample:
+            print(f"    first error: {r.error_sample}")
@@ -0,0 +1,302 @@
+# benchmarks/run.py
+"""
+Throughput benchmarks against local MongoDB/Redis and the fake provider.
+
+    python -m benchmarks.run                               # all scenarios
+    python -m benchmarks.run --scenarios execute_api_openai logs_api
+    python -m benchmarks.run --save-baseline benchmarks/baselines/local.json
+    python -m benchmarks.run --compare benchmarks/baselines/local.json
+
+Data is written to a separate database (MONGODB_DB_NAME, default
+prompthub_bench) which is reseeded on every run. --compare exits with
+status 1 when a metric regresses by more than --tolerance.
+
+The execute_api_* scenarios go through POST /api/v1/execute with a seeded
+prompt, so they include version reads, guardrail setup and execution
+logging; execute_* and stream_* call LLMService directly for comparison.
+
+Token counting needs tiktoken's cl100k_base file, which tiktoken downloads
+on first use. It is cached in benchmarks/.tiktoken (TIKTOKEN_CACHE_DIR), so
+run the suite once with network access; later runs are offline.
+
+Semantic search is not benchmarked: SearchService depends on an embedding
+service that is not in the tree yet and on an Atlas vector index.
+"""
+import os
+
+# Must be set before app.config is imported
+os.environ.setdefault("MONGODB_DB_NAME", "prompthub_bench")
+os.environ.setdefault("JWT_SECRET", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("ANTHROPIC_API_KEY", "sk-ant-benchmark")
+os.environ.setdefault("TIKTOKEN_CACHE_DIR", os.path.join(os.path.dirname(__file__), ".tiktoken"))
+
+from typing import Awaitable, Callable, Dict
+from datetime import datetime, timedelta
+from pathlib import Path
+import argparse
+import asyncio
+import random
+import sys
+from bson import ObjectId
+import httpx
+
+from app.config import settings
+from benchmarks.fake_provider import FakeProviderConfig, FakeProviderServer
+from benchmarks.harness import run_benchmark, save_baseline, compare_to_baseline, print_results
+
+PROMPT = "Summarize the following support ticket in two sentences:\n{ticket}"
+INPUT = {"ticket": "The export button times out for workspaces with more than 10k rows. " * 8}
+BENCH_APPLICATION_ID = ObjectId("65f000000000000000000001")
+BENCH_PROMPT_ID = ObjectId("65f000000000000000000002")
+# Seeded versions of the bench prompt; the guarded one runs through the streaming guardrail
+BENCH_VERSIONS = {
+    "1.0.0": {"model_params": {"provider": "openai", "model": "gpt-3.5-turbo"}},
+    "1.1.0": {"model_params": {"provider": "anthropic", "model": "claude-3-sonnet"}},
+    "1.2.0": {
+        "model_params": {"provider": "openai", "model": "gpt-3.5-turbo"},
+        "guardrail_config": {"prohibited_terms": ["password", "ssn"]}
+    }
+}
+
+def _check(result: Dict):
+    if result.get("status") == "failed":
+        raise RuntimeError(result.get("error"))
+    return result
+
+async def seed_logs(count: int):
+    """Replace the bench application's execution logs with `count` synthetic ones"""
+    from app.models.execution import ExecutionLog
+
+    collection = ExecutionLog.get_motor_collection()
+    await collection.delete_many({"application_id": BENCH_APPLICATION_ID})
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    docs = [
+        {
+            "application_id": BENCH_APPLICATION_ID,
+            "prompt_version_id": None,
+            "model_provider": rng.choice(["openai", "anthropic"]),
+            "model_name": rng.choice(["gpt-3.5-turbo", "claude-3-sonnet"]),
+            "input_data": INPUT,
+            "output_data": {"output": "lorem ipsum " * 20},
+            "latency_ms": rng.randint(200, 3000),
+            "token_count": rng.randint(100, 1500),
+            "cost_usd": rng.random() / 100,
+            "status": rng.choices(["success", "failed", "aborted"], [90, 8, 2])[0],
+            "error_message": None,
+            "metadata": {},
+            "created_at": now - timedelta(minutes=i)
+        }
+        for i in range(count)
+    ]
+    for start in range(0, count, 1000):
+        await collection.insert_many(docs[start:start + 1000], ordered=False)
+
+async def seed_prompt():
+    """Replace the bench prompt and its versions"""
+    from app.models.prompt import Prompt, PromptVersion
+
+    versions = PromptVersion.get_motor_collection()
+    await versions.delete_many({"prompt_id": BENCH_PROMPT_ID})
+    await Prompt.get_motor_collection().delete_many({"_id": BENCH_PROMPT_ID})
+
+    now = datetime.utcnow()
+    await Prompt.get_motor_collection().insert_one({
+        "_id": BENCH_PROMPT_ID,
+        "prompt_id": "bench-summarize",
+        "name": "Benchmark summarizer",
+        "application_id": BENCH_APPLICATION_ID,
+        "is_active": True,
+        "created_at": now,
+        "current_version": "1.0.0",
+        "tags": []
+    })
+    await versions.insert_many([
+        {
+            "prompt_id": BENCH_PROMPT_ID,
+            "version": version,
+            "content": PROMPT,
+            "system_prompt": "You are a concise support analyst.",
+            "metaprompt": None,
+            "required_fields": [{"name": "ticket", "type": "string", "required": True}],
+            "model_params": fields["model_params"],
+            "guardrail_config": fields.get("guardrail_config", {}),
+            "is_published": True,
+            "created_at": now,
+            "metadata": {},
+            "sequence": sequence,
+            "storage": "full",
+            "base_version_id": None,
+            "deltas": {}
+        }
+        for sequence, (version, fields) in enumerate(BENCH_VERSIONS.items())
+    ])
+
+def check_tokenizer():
+    """Fail fast with a clear message instead of one download error per request"""
+    from app.utils.tokens import get_encoding
+
+    try:
+        get_encoding("openai", "gpt-3.5-turbo")
+        get_encoding("anthropic", "claude-3-sonnet")
+    except Exception as e:
+        raise SystemExit(
+            f"Could not load tiktoken encodings ({e}). Run once with network access "
+            f"to cache them in {os.environ['TIKTOKEN_CACHE_DIR']}."
+        )
+
+def build_scenarios(client: httpx.AsyncClient) -> Dict[str, Callable[[], Awaitable]]:
+    from app.services.analytics_service import AnalyticsService
+    from app.services.llm_service import LLMService
+
+    llm = LLMService()
+    analytics = AnalyticsService()
+    end = datetime.utcnow()
+    start = end - timedelta(days=7)
+
+    async def execute_openai():
+        _check(await llm.execute_single(PROMPT, "openai", "gpt-3.5-turbo", INPUT))
+
+    async def execute_anthropic():
+        _check(await llm.execute_single(PROMPT, "anthropic", "claude-3-sonnet", INPUT))
+
+    async def stream_openai():
+        _check(await llm.execute_streaming(PROMPT, "openai", "gpt-3.5-turbo", INPUT))
+
+    async def stream_anthropic():
+        _check(await llm.execute_streaming(PROMPT, "anthropic", "claude-3-sonnet", INPUT))
+
+    async def compare_models():
+        comparison = await llm.compare_models(PROMPT, [
+            {"provider": "openai", "name": "gpt-3.5-turbo"},
+            {"provider": "anthropic", "name": "claude-3-sonnet"}
+        ], INPUT)
+        for result in comparison.values():
+            _check(result)
+
+    async def execute_version(version: str):
+        response = await client.post(
+            f"/api/v1/execute/{BENCH_PROMPT_ID}/{version}",
+            json={"input_data": INPUT}
+        )
+        response.raise_for_status()
+        _check(response.json())
+
+    async def execute_api_openai():
+        await execute_version("1.0.0")
+
+    async def execute_api_anthropic():
+        await execute_version("1.1.0")
+
+    async def execute_api_guarded():
+        await execute_version("1.2.0")
+
+    async def usage_analytics():
+        await analytics.get_usage_analytics(str(BENCH_APPLICATION_ID), start, end)
+
+    async def logs_api():
+        response = await client.get("/api/v1/logs", params={"limit": 50})
+        response.raise_for_status()
+
+    return {
+        "execute_openai": execute_openai,
+        "execute_anthropic": execute_anthropic,
+        "stream_openai": stream_openai,
+        "stream_anthropic": stream_anthropic,
+        "compare_models": compare_models,
+        "execute_api_openai": execute_api_openai,
+        "execute_api_anthropic": execute_api_anthropic,
+        "execute_api_guarded": execute_api_guarded,
+        "usage_analytics": usage_analytics,
+        "logs_api": logs_api
+    }
+
+async def run(args) -> int:
+    from app.core.dependencies import get_api_key_required
+    from app.database import connect_to_mongodb, close_mongodb_connection
+    from app.main import app
+
+    check_tokenizer()
+    provider = FakeProviderServer(
+        FakeProviderConfig(
+            latency_ms=args.latency_ms,
+            tokens_per_second=args.tokens_per_second,
+            output_tokens=args.output_tokens,
+            error_rate=args.error_rate,
+            seed=42
+        ),
+        port=args.provider_port
+    )
+    provider.start()
+    settings.openai_base_url = provider.openai_base_url
+    settings.anthropic_base_url = provider.anthropic_base_url
+
+    await connect_to_mongodb()
+    await seed_logs(args.seed_logs)
+    await seed_prompt()
+    app.dependency_overrides[get_api_key_required] = lambda: str(BENCH_APPLICATION_ID)
+
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench"
+        ) as client:
+            scenarios = build_scenarios(client)
+            unknown = set(args.scenarios or []) - scenarios.keys()
+            if unknown:
+                print(f"Unknown scenarios: {', '.join(sorted(unknown))}", file=sys.stderr)
+                return 2
+
+            results = []
+            for name in args.scenarios or scenarios:
+                results.append(await run_benchmark(
+                    name,
+                    scenarios[name],
+                    requests=args.requests,
+                    concurrency=args.concurrency,
+                    alloc_requests=args.alloc_requests
+                ))
+    finally:
+        app.dependency_overrides.pop(get_api_key_required, None)
+        await close_mongodb_connection()
+        provider.stop()
+
+    print_results(results)
+    print(f"\nfake provider: {provider.stats}")
+
+    if args.save_baseline:
+        save_baseline(results, Path(args.save_baseline), {
+            key: value for key, value in vars(args).items()
+            if key not in ("save_baseline", "compare")
+        })
+        print(f"Baseline written to {args.save_baseline}")
+
+    if args.compare:
+        regressions = compare_to_baseline(results, Path(args.compare), args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"\nNo regressions beyond {args.tolerance:.0%} of {args.compare}")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--alloc-requests", type=int, default=50)
+    parser.add_argument("--seed-logs", type=int, default=5000)
+    parser.add_argument("--provider-port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--output-tokens", type=int, default=64)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--save-baseline")
+    parser.add_argument("--compare")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# benchmarks/startup.py
+"""
+Startup-time profile for the API.
+
+    python -m benchmarks.startup [--port 8765] [--modules app.main app.services.validation_service ...]
+
+Reports, for each module, the cumulative import time in a fresh interpreter
+(from `python -X importtime`) and the slowest transitive imports it pulls in.
+Then launches uvicorn and measures time to first response and time until
+/ready reports every warm-up component loaded.
+"""
+from typing import Dict, List, Tuple
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+DEFAULT_MODULES = [
+    "app.config",
+    "app.database",
+    "app.services.llm_service",
+    "app.services.validation_service",
+    "app.services.extraction_service",
+    "app.utils.pdf",
+    "app.main",
+]
+
+def import_profile(module: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """Cumulative import time of `module` in ms, plus the ten slowest imports under it"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    timings: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        timings[name] = int(cumulative) / 1000
+
+    total = timings.get(module, 0.0)
+    slowest = sorted(
+        ((name, ms) for name, ms in timings.items() if name != module and "." not in name),
+        key=lambda item: item[1],
+        reverse=True
+    )[:10]
+    return total, slowest
+
+def _get(url: str) -> Tuple[int, dict]:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status, json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+
+def serve_profile(port: int, timeout: float) -> Dict[str, object]:
+    """Time from process launch to first response and to warm-up complete"""
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE
+    )
+    first_response_ms = None
+    ready_ms = None
+    status: dict = {}
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited:\n{server.stderr.read().decode()}")
+            try:
+                code, status = _get(f"http://127.0.0.1:{port}/ready")
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.05)
+                continue
+
+            elapsed = (time.perf_counter() - started) * 1000
+            if first_response_ms is None:
+                first_response_ms = elapsed
+            if code == 200:
+                ready_ms = elapsed
+                break
+            time.sleep(0.1)
+    finally:
+        server.terminate()
+        server.wait()
+
+    return {
+        "first_response_ms": round(first_response_ms, 1) if first_response_ms else None,
+        "ready_ms": round(ready_ms, 1) if ready_ms else None,
+        "components": status.get("components", {}) if isinstance(status, dict) else {}
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--skip-serve", action="store_true", help="only profile imports")
+    args = parser.parse_args()
+
+    print("Import time (fresh interpreter, cumulative)")
+    for module in args.modules:
+        try:
+            total, slowest = import_profile(module)
+        except RuntimeError as e:
+            print(f"  {module:<40} error: {e}")
+            continue
+        print(f"  {module:<40} {total:>9.1f} ms")
+        for name, ms in slowest[:5]:
+            print(f"      {name:<36} {ms:>9.1f} ms")
+
+    if args.skip_serve:
+        return
+
+    result = serve_profile(args.port, args.timeout)
+    print("\nServing")
+    print(f"  first response   {result['first_response_ms']} ms")
+    print(f"  ready            {result['ready_ms']} ms")
+    for name, state in result["components"].items():
+        print(f"    {name:<16} {state['status']:<8} {state['duration_ms']} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# streamlit_app/api_client.py
+import streamlit as st
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import os
+import time
+
+API_URL = os.getenv("API_URL", "http://localhost:8000")
+
+# Reruns within this window reuse the cached body without a request;
+# after it, the body is revalidated with If-None-Match
+FRESH_SECONDS = float(os.getenv("API_CACHE_FRESH_SECONDS", "5"))
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One pooled, keep-alive session shared by every page and browser session"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=20,
+        max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504], allowed_methods=["GET"])
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def auth_headers() -> dict:
+    return {"Authorization": f"Bearer {st.session_state.get('api_key', '')}"}
+
+def _cache() -> dict:
+    # Per browser session: responses depend on the caller's API key
+    return st.session_state.setdefault('_api_cache', {})
+
+def api_get(path: str, params: dict = None, fresh_seconds: float = FRESH_SECONDS):
+    """GET with an ETag cache; a 304 reuses the body already held"""
+    params = {key: value for key, value in (params or {}).items() if value is not None}
+    key = (path, tuple(sorted(params.items())))
+    cached = _cache().get(key)
+    if cached and time.monotonic() - cached["fetched_at"] < fresh_seconds:
+        return cached["body"]
+
+    headers = auth_headers()
+    if cached:
+        headers["If-None-Match"] = cached["etag"]
+
+    response = get_session().get(f"{API_URL}{path}", params=params, headers=headers, timeout=30)
+    if response.status_code == 304 and cached:
+        cached["fetched_at"] = time.monotonic()
+        return cached["body"]
+    response.raise_for_status()
+
+    body = response.json()
+    if etag := response.headers.get("ETag"):
+        _cache()[key] = {"etag": etag, "body": body, "fetched_at": time.monotonic()}
+    return body
+
+def api_post(path: str, json: dict = None, timeout: float = 30):
+    """POST through the pooled session; drops cached reads, which it may have changed"""
+    response = get_session().post(f"{API_URL}{path}", json=json, headers=auth_headers(), timeout=timeout)
+    response.raise_for_status()
+    _cache().clear()
+    return response.json()
@@ -0,0 +1,118 @@
+# streamlit_app/pages/execution_logs.py
+import streamlit as st
+import os
+import tempfile
+from datetime import date, datetime, time
+from urllib.parse import urlencode
+from streamlit_app.api_client import API_URL, auth_headers, get_session
+
+PAGE_SIZE = 50
+# The download button still holds the file in memory while it renders,
+# so exports from the UI are limited to this many days
+EXPORT_MAX_DAYS = 31
+EXPORT_CHUNK_SIZE = 64 * 1024
+EXPORT_FORMATS = {
+    "ndjson": ("NDJSON", "application/x-ndjson"),
+    "csv": ("CSV", "text/csv")
+}
+
+def render():
+    st.title("Execution Logs")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        start_date = st.date_input("From", value=date.today())
+    with col2:
+        end_date = st.date_input("To", value=date.today())
+    with col3:
+        status = st.selectbox("Status", ["", "success", "failed", "timeout"])
+    
+    filters = {
+        "start_date": datetime.combine(start_date, time.min).isoformat(),
+        "end_date": datetime.combine(end_date, time.max).isoformat()
+    }
+    if status:
+        filters["status"] = status
+    
+    # Reset accumulated pages whenever the filters change
+    if st.session_state.get('log_filters') != filters:
+        st.session_state['log_filters'] = filters
+        st.session_state['log_rows'] = []
+        st.session_state['log_cursor'] = None
+        discard_export()
+        load_next_page(filters)
+    
+    st.dataframe(st.session_state['log_rows'], use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.session_state['log_cursor'] and st.button("Load More"):
+            load_next_page(filters)
+            st.rerun()
+    with col2:
+        export_format = st.radio(
+            "Export format",
+            list(EXPORT_FORMATS),
+            format_func=lambda key: EXPORT_FORMATS[key][0],
+            horizontal=True
+        )
+        # Fetched only on request: the export needs the API key header,
+        # which a plain link can't send
+        if (end_date - start_date).days >= EXPORT_MAX_DAYS:
+            st.info(f"Narrow the range to {EXPORT_MAX_DAYS} days or fewer to export from here")
+        elif st.button("Prepare Export"):
+            discard_export()
+            st.session_state['log_export'] = (export_format, fetch_export(filters, export_format))
+        
+        prepared = st.session_state.get('log_export')
+        if prepared and prepared[0] == export_format and os.path.exists(prepared[1]):
+            label, media_type = EXPORT_FORMATS[export_format]
+            with open(prepared[1], "rb") as export_file:
+                st.download_button(
+                    f"Download {label}",
+                    export_file,
+                    file_name=f"execution_logs.{export_format}",
+                    mime=media_type
+                )
+
+def fetch_export(filters: dict, export_format: str) -> str:
+    """Stream the export through the authenticated session into a temp file and return its path"""
+    query = urlencode({**filters, "format": export_format})
+    with get_session().get(
+        f"{API_URL}/api/v1/logs/export?{query}",
+        headers=auth_headers(),
+        timeout=300,
+        stream=True
+    ) as response:
+        response.raise_for_status()
+        with tempfile.NamedTemporaryFile(suffix=f".{export_format}", delete=False) as out:
+            for chunk in response.iter_content(chunk_size=EXPORT_CHUNK_SIZE):
+                out.write(chunk)
+    return out.name
+
+def discard_export():
+    """Remove the previously prepared export file, if any"""
+    prepared = st.session_state.pop('log_export', None)
+    if prepared:
+        try:
+            os.remove(prepared[1])
+        except FileNotFoundError:
+            pass
+
+def load_next_page(filters: dict):
+    """Fetch the next keyset page and append it to the session"""
+    params = {**filters, "limit": PAGE_SIZE}
+    if st.session_state['log_cursor']:
+        params["cursor"] = st.session_state['log_cursor']
+    
+    response = get_session().get(
+        f"{API_URL}/api/v1/logs",
+        params=params,
+        headers=auth_headers(),
+        timeout=30
+    )
+    response.raise_for_status()
+    page = response.json()
+    
+    st.session_state['log_rows'].extend(page["items"])
+    st.session_state['log_cursor'] = page["next_cursor"]
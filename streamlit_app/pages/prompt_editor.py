@@ -1,7 +1,7 @@
 # streamlit_app/pages/prompt_editor.py
 import streamlit as st
 from streamlit_ace import st_ace
-import requests
+from streamlit_app.api_client import api_get, api_post
 
 def render():
     st.title("Prompt Editor")
@@ -10,7 +10,12 @@ def render():
     
     with col1:
         # Prompt Selection
-        prompt_id = st.selectbox("Select Prompt", get_prompts())
+        prompt_id = st.selectbox(
+            "Select Prompt",
+            get_prompts(),
+            format_func=get_prompt_name,
+            key="selected_prompt"
+        )
         
         # Editor Tabs
         tab1, tab2, tab3, tab4 = st.tabs(["Edit", "Dependencies", "Test", "History"])
@@ -90,4 +95,95 @@ def render():
                 height=300
             )
             if st.button("Apply Boosted Version"):
-                apply_boosted_prompt()
\ No newline at end of file
+                apply_boosted_prompt()
+            if st.button("Regenerate", help="Ignore the cached boost and ask the model again"):
+                st.session_state['boosted_prompt'] = boost_prompt(prompt_content, regenerate=True)
+                st.rerun()
+
+def load_editor(prompt_id=None):
+    """
+    Prompt list, prompt info and the open version from one bootstrap request.
+    Reruns reuse it and revalidate with If-None-Match, so typing in the
+    editor doesn't refetch everything.
+    """
+    return api_get("/api/v1/prompts/editor", {"prompt_id": prompt_id})
+
+def get_prompts():
+    editor = load_editor(st.session_state.get('selected_prompt'))
+    return [prompt["id"] for prompt in editor["prompts"]]
+
+def get_prompt_name(prompt_id):
+    editor = load_editor(st.session_state.get('selected_prompt'))
+    names = {prompt["id"]: prompt["name"] for prompt in editor["prompts"]}
+    return names.get(prompt_id, prompt_id)
+
+def get_prompt_content(prompt_id):
+    version = load_editor(prompt_id)["version"] if prompt_id else None
+    return version["content"] if version else ""
+
+def get_required_fields(prompt_id):
+    version = load_editor(prompt_id)["version"] if prompt_id else None
+    return version["required_fields"] if version else []
+
+def get_prompt_info(prompt_id):
+    if not prompt_id:
+        return {}
+    editor = load_editor(prompt_id)
+    info = dict(editor["prompt"] or {})
+    if version := editor["version"]:
+        info["open_version"] = version["version"]
+        info["published"] = version["is_published"]
+    return info
+
+def boost_prompt(prompt_content, regenerate=False):
+    """Boosts are cached server-side per prompt text, so pressing Boost again is free"""
+    result = api_post(
+        "/api/v1/prompts/boost",
+        json={"original_prompt": prompt_content, "regenerate": regenerate},
+        timeout=120
+    )
+    return result["enhanced_prompt"]
+
+def show_version_history(prompt_id):
+    """History tab: version list plus a diff between any two versions"""
+    history = api_get(f"/api/v1/prompts/{prompt_id}/versions/history")
+    
+    if not history:
+        st.info("No versions yet")
+        return
+    
+    st.dataframe(
+        [
+            {
+                "Version": item["version"],
+                "Published": item["is_published"],
+                "Created": item["created_at"]
+            }
+            for item in history
+        ],
+        use_container_width=True
+    )
+    
+    versions = [item["version"] for item in history]
+    if len(versions) < 2:
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        from_version = st.selectbox("Compare", versions, index=1, key="diff_from")
+    with col2:
+        to_version = st.selectbox("With", versions, index=0, key="diff_to")
+    
+    if from_version == to_version:
+        return
+    
+    diffs = api_get(
+        f"/api/v1/prompts/{prompt_id}/versions/diff",
+        {"from_version": from_version, "to_version": to_version}
+    )["diffs"]
+    
+    if not diffs:
+        st.caption("No differences")
+    for field, diff in diffs.items():
+        st.caption(field.replace("_", " ").title())
+        st.code(diff, language="diff")
@@ -0,0 +1,4 @@
+import os
+
+# app.config requires these; tests never talk to MongoDB, Redis or providers
+os.environ.setdefault("JWT_SECRET", "test")
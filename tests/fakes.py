@@ -0,0 +1,174 @@
+"""In-memory stand-ins for the Motor collections and Redis client services talk to"""
+import copy
+
+OPERATORS = {
+    "$in": lambda value, operand, present: value in operand,
+    "$ne": lambda value, operand, present: value != operand,
+    "$gt": lambda value, operand, present: value is not None and value > operand,
+    "$gte": lambda value, operand, present: value is not None and value >= operand,
+    "$lt": lambda value, operand, present: value is not None and value < operand,
+    "$exists": lambda value, operand, present: present == operand
+}
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        if field == "$or":
+            if not any(_matches(doc, branch) for branch in condition):
+                return False
+            continue
+        value = doc.get(field)
+        if isinstance(condition, dict) and any(key.startswith("$") for key in condition):
+            for op, operand in condition.items():
+                if op not in OPERATORS:
+                    raise NotImplementedError(f"FakeCollection does not support {op}")
+                if not OPERATORS[op](value, operand, field in doc):
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+def _project(doc, projection):
+    if not projection:
+        return copy.deepcopy(doc)
+    fields = {"_id", *(field for field, keep in projection.items() if keep)}
+    return {field: copy.deepcopy(doc[field]) for field in fields if field in doc}
+
+def _apply(doc, update):
+    doc.update(copy.deepcopy(update.get("$set", {})))
+    for field in update.get("$unset", {}):
+        doc.pop(field, None)
+
+class FakeCursor:
+    def __init__(self, docs, projection=None):
+        # Sorts see the whole document; the projection applies on the way out
+        self._raw = docs
+        self._projection = projection
+
+    @property
+    def _docs(self):
+        return [_project(doc, self._projection) for doc in self._raw]
+
+    def batch_size(self, size):
+        return self
+
+    def sort(self, keys, direction=None):
+        if direction is not None:
+            keys = [(keys, direction)]
+        for field, order in reversed(keys):
+            self._raw.sort(key=lambda doc: (doc.get(field) is not None, doc.get(field)), reverse=order < 0)
+        return self
+
+    def limit(self, count):
+        self._raw = self._raw[:count]
+        return self
+
+    async def to_list(self, length=None):
+        return self._docs[:length] if length else self._docs
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self._docs:
+            yield doc
+
+class FakeCollection:
+    """Supports the equality, $in, $ne, $gt, $gte, $lt, $exists and $or filters and the $set/$unset updates the services use"""
+
+    def __init__(self, docs=()):
+        self.docs = [dict(doc) for doc in docs]
+        self.find_calls = 0
+
+    def find(self, query=None, projection=None):
+        self.find_calls += 1
+        return FakeCursor([doc for doc in self.docs if _matches(doc, query or {})], projection)
+
+    async def find_one(self, query=None, projection=None, sort=None):
+        cursor = self.find(query, projection)
+        if sort:
+            cursor.sort(sort)
+        for doc in cursor._docs:
+            return doc
+        return None
+
+    async def count_documents(self, query, limit=None):
+        return len(self.find(query)._docs)
+
+    async def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+    async def update_many(self, query, update):
+        for doc in self.docs:
+            if _matches(doc, query):
+                _apply(doc, update)
+
+    async def bulk_write(self, requests, ordered=True):
+        """UpdateOne requests only"""
+        for request in requests:
+            for doc in self.docs:
+                if _matches(doc, request._filter):
+                    _apply(doc, request._doc)
+                    break
+
+    async def delete_one(self, query):
+        for doc in self.docs:
+            if _matches(doc, query):
+                self.docs.remove(doc)
+                return
+
+class FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        return [await getattr(self._redis, name)(*args, **kwargs) for name, args, kwargs in self._calls]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class FakeRedis:
+    """Strings and sets only; values are stored as given, expiry is recorded but not enforced"""
+
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+        self.expiry = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        if ex:
+            self.expiry[key] = ex
+
+    async def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += (self.values.pop(key, None) is not None) + (self.sets.pop(key, None) is not None)
+        return removed
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    async def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+
+    async def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    async def expire(self, key, seconds):
+        self.expiry[key] = seconds
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
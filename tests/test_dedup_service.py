@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.config import settings
+from app.models.prompt import Prompt, PromptVersion
+from app.models.version_tombstone import VersionTombstone
+from app.services.dedup_service import DuplicateDetector
+from tests.fakes import FakeCollection
+
+CONTENT = (
+    "You are a support assistant. Summarize the customer's ticket in two "
+    "sentences, then list the product areas it mentions and suggest a priority."
+)
+APP_A, APP_B = ObjectId(), ObjectId()
+PROMPT_A, PROMPT_B = ObjectId(), ObjectId()
+
+@pytest.fixture
+def collections(monkeypatch):
+    collections = {
+        Prompt: FakeCollection([
+            {"_id": PROMPT_A, "application_id": APP_A},
+            {"_id": PROMPT_B, "application_id": APP_B}
+        ]),
+        PromptVersion: FakeCollection(),
+        VersionTombstone: FakeCollection()
+    }
+    for model, collection in collections.items():
+        monkeypatch.setattr(model, "get_motor_collection", lambda collection=collection: collection)
+    # Every lookup syncs, so tests see other processes' writes immediately
+    monkeypatch.setattr(settings, "dedup_refresh_seconds", 0)
+    return collections
+
+@pytest.fixture
+def detector():
+    return DuplicateDetector()
+
+def add_version(collections, detector, prompt_id, content=CONTENT):
+    version_id = ObjectId()
+    collections[PromptVersion].docs.append({
+        "_id": version_id,
+        "prompt_id": prompt_id,
+        "content_signature": detector.signature(content),
+        "signature_updated_at": datetime.utcnow()
+    })
+    return version_id
+
+async def test_matches_stay_within_the_application(collections, detector):
+    version_a = add_version(collections, detector, PROMPT_A)
+    add_version(collections, detector, PROMPT_B)
+
+    matches = await detector.find_duplicates(CONTENT.replace("two", "three"), str(APP_A))
+
+    assert [match["version_id"] for match in matches] == [str(version_a)]
+    assert await detector.find_duplicates(CONTENT, ObjectId()) == []
+
+async def test_own_prompt_is_excluded(collections, detector):
+    add_version(collections, detector, PROMPT_A)
+    assert await detector.find_duplicates(CONTENT, APP_A, exclude_prompt_id=PROMPT_A) == []
+
+async def test_lookup_reads_no_versions_between_syncs(collections, detector, monkeypatch):
+    add_version(collections, detector, PROMPT_A)
+    await detector.find_duplicates(CONTENT, APP_A)
+    monkeypatch.setattr(settings, "dedup_refresh_seconds", 3600)
+    reads = collections[PromptVersion].find_calls
+
+    assert await detector.find_duplicates(CONTENT, APP_A)
+    assert collections[PromptVersion].find_calls == reads
+
+async def test_tombstones_from_other_processes_remove_versions(collections, detector):
+    version_id = add_version(collections, detector, PROMPT_A)
+    assert await detector.find_duplicates(CONTENT, APP_A)
+
+    # Another process deletes the version
+    collections[PromptVersion].docs.clear()
+    collections[VersionTombstone].docs.append({"_id": ObjectId(), "version_id": version_id, "deleted_at": datetime.utcnow()})
+
+    assert await detector.find_duplicates(CONTENT, APP_A) == []
+    assert version_id not in detector._owners
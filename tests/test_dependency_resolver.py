@@ -0,0 +1,153 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.core.cache import cache_manager
+from app.models.prompt import PromptVersion
+from app.models.prompt_dependency import PromptDependency
+from app.services.dependency_resolver import DependencyCycleError, DependencyResolver
+from tests.fakes import FakeCollection, FakeRedis
+
+@pytest.fixture
+def redis(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(cache_manager, "redis", redis)
+    return redis
+
+@pytest.fixture
+def graph(monkeypatch, redis):
+    """Versions root -> a -> b and root -> c, keyed by name"""
+    ids = {name: ObjectId() for name in ("root", "a", "b", "c")}
+    versions = FakeCollection([
+        {
+            "_id": version_id,
+            "prompt_id": ObjectId(),
+            "version": "1.0.0",
+            "content": f"{name} body",
+            "storage": "full",
+            "embedding": [0.1, 0.2],
+            "created_at": datetime(2024, 5, 1),
+            "updated_at": datetime(2024, 5, 2)
+        }
+        for name, version_id in ids.items()
+    ])
+    dependencies = FakeCollection()
+    monkeypatch.setattr(PromptVersion, "get_motor_collection", lambda: versions)
+    monkeypatch.setattr(PromptDependency, "get_motor_collection", lambda: dependencies)
+
+    def link(parent, child, kind="system_prompt"):
+        dependencies.docs.append({
+            "_id": ObjectId(),
+            "prompt_version_id": ids[parent],
+            "dependency_id": ids[child],
+            "dependency_type": kind,
+            "config": {}
+        })
+
+    link("root", "a")
+    link("a", "b", "metaprompt")
+    link("root", "c")
+    return ids, versions, dependencies, link
+
+def names(ids, version_ids):
+    by_id = {str(version_id): name for name, version_id in ids.items()}
+    return sorted(by_id[version_id] for version_id in version_ids)
+
+async def test_resolves_one_query_per_level(graph):
+    ids, versions, dependencies, _ = graph
+
+    resolved = await DependencyResolver().resolve(str(ids["root"]))
+
+    assert names(ids, resolved["nodes"]) == ["a", "b", "c", "root"]
+    assert sorted((edge["from"], edge["to"]) for edge in resolved["edges"]) == sorted(
+        (str(ids[parent]), str(ids[child])) for parent, child in [("root", "a"), ("a", "b"), ("root", "c")]
+    )
+    assert resolved["nodes"][str(ids["b"])]["content"] == "b body"
+    # root, {a, c}, {b}
+    assert versions.find_calls == 3
+    assert dependencies.find_calls == 3
+
+async def test_nodes_hold_only_cacheable_serving_fields(graph):
+    ids, _, _, _ = graph
+
+    resolved = await DependencyResolver().resolve(str(ids["root"]))
+
+    node = resolved["nodes"][str(ids["a"])]
+    assert node["_id"] == str(ids["a"])
+    assert not {"embedding", "created_at", "updated_at"} & node.keys()
+
+async def test_cached_graph_is_served_without_queries(graph):
+    ids, versions, _, _ = graph
+    resolver = DependencyResolver()
+
+    first = await resolver.resolve(str(ids["root"]))
+    reads = versions.find_calls
+
+    assert await resolver.resolve(str(ids["root"])) == first
+    assert versions.find_calls == reads
+
+async def test_cached_subgraphs_are_merged_not_rewalked(graph):
+    ids, versions, _, _ = graph
+    resolver = DependencyResolver()
+    await resolver.resolve(str(ids["a"]))
+    reads = versions.find_calls
+
+    resolved = await resolver.resolve(str(ids["root"]))
+
+    assert names(ids, resolved["nodes"]) == ["a", "b", "c", "root"]
+    # root, then {c}; a's subgraph (a -> b) comes from the cache
+    assert versions.find_calls - reads == 2
+
+async def test_cycle_is_rejected(graph):
+    ids, _, _, link = graph
+    link("b", "root")
+
+    with pytest.raises(DependencyCycleError, match="Dependency cycle"):
+        await DependencyResolver().resolve(str(ids["root"]))
+
+async def test_unknown_dependency_is_rejected(graph):
+    ids, _, dependencies, _ = graph
+    dependencies.docs.append({
+        "_id": ObjectId(),
+        "prompt_version_id": ids["c"],
+        "dependency_id": ObjectId(),
+        "dependency_type": "guardrail"
+    })
+
+    with pytest.raises(ValueError, match="Unknown prompt versions"):
+        await DependencyResolver().resolve(str(ids["root"]))
+
+async def test_invalidating_a_node_drops_every_graph_containing_it(graph, redis):
+    ids, versions, _, _ = graph
+    resolver = DependencyResolver()
+    await resolver.resolve(str(ids["root"]))
+    await resolver.resolve(str(ids["a"]))
+    await resolver.resolve(str(ids["c"]))
+
+    await resolver.invalidate(ids["b"])
+
+    assert resolver._graph_key(str(ids["root"])) not in redis.values
+    assert resolver._graph_key(str(ids["a"])) not in redis.values
+    assert resolver._graph_key(str(ids["c"])) in redis.values
+
+    reads = versions.find_calls
+    await resolver.resolve(str(ids["root"]))
+    assert versions.find_calls > reads
+
+async def test_roots_are_registered_before_the_graph_is_cached(graph, redis, monkeypatch):
+    ids, _, _, _ = graph
+    resolver = DependencyResolver()
+    root = str(ids["root"])
+    set_value = cache_manager.set
+
+    async def set_after_registration(key, value, expire=None):
+        if key == resolver._graph_key(root):
+            for node_id in value["nodes"]:
+                assert root in redis.sets[resolver._members_key(node_id)]
+        await set_value(key, value, expire=expire)
+
+    monkeypatch.setattr(cache_manager, "set", set_after_registration)
+
+    await resolver.resolve(root)
+    assert resolver._graph_key(root) in redis.values
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from app.config import settings
+from app.core.exceptions import ExtractionFailedError
+from app.services import extraction_service
+from app.services.extraction_service import EXTRACTION_MODEL, ExtractionService
+from app.services.llm_service import LLMService
+
+class FakeLLM:
+    """Answers each chunk with one prompt named after its first word; chunks starting with "bad" fail"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def generate(self, prompt, model, **kwargs):
+        self.calls.append((model, kwargs))
+        text = prompt.split("Text: ", 1)[1].split("\n", 1)[0].strip()
+        if text.startswith("bad"):
+            raise json.JSONDecodeError("Unterminated string", text, 0)
+        return {"prompts": [{"content": f"Prompt from {text.split()[0]}"}]}
+
+@pytest.fixture
+def service(monkeypatch):
+    cache = {}
+
+    async def get(key):
+        return cache.get(key)
+
+    async def set(key, value, expire=None):
+        cache[key] = value
+
+    monkeypatch.setattr(extraction_service.cache_manager, "get", get)
+    monkeypatch.setattr(extraction_service.cache_manager, "set", set)
+    monkeypatch.setattr(settings, "extraction_chunk_size", 20)
+    monkeypatch.setattr(settings, "extraction_chunk_overlap", 0)
+
+    service = ExtractionService()
+    service.llm_service = FakeLLM()
+    return service
+
+TEXT = "alpha one two\n\nbad chunk here\n\ngamma three four"
+
+async def test_failed_chunk_does_not_lose_the_others(service):
+    failed_chunks = []
+    prompts = [
+        prompt async for prompt in service.stream_prompts_from_text(
+            TEXT, source_type="web", failed_chunks=failed_chunks
+        )
+    ]
+
+    assert sorted(prompt["content"] for prompt in prompts) == ["Prompt from alpha", "Prompt from gamma"]
+    assert [failure["chunk"] for failure in failed_chunks] == [1]
+    assert "Unterminated string" in failed_chunks[0]["error"]
+
+async def test_collected_extraction_records_failed_chunks(service):
+    prompts = await service._extract_prompts_from_text(TEXT, source_type="pdf")
+
+    assert len(prompts) == 2
+    assert all(prompt["extraction_metadata"]["failed_chunks"] == [1] for prompt in prompts)
+
+async def test_every_chunk_failing_raises(service):
+    with pytest.raises(ExtractionFailedError):
+        await service._extract_prompts_from_text("bad one\n\nbad two", source_type="web")
+
+async def test_chunks_request_json_mode_from_a_model_that_supports_it(service):
+    await service._extract_prompts_from_text("alpha", source_type="web")
+
+    model, kwargs = service.llm_service.calls[0]
+    assert model == EXTRACTION_MODEL
+    assert model in LLMService().model_configs["openai"]
+    assert kwargs["response_format"] == {"type": "json_object"}
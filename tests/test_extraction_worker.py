@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.workers.extraction_worker import ExtractionWorker
+
+class FakeCollection:
+    def __init__(self, claims):
+        self.claims = list(claims)
+        self.claim_queries = []
+        self.updates = []
+
+    async def find_one_and_update(self, query, update, **kwargs):
+        self.claim_queries.append((query, update))
+        claim = self.claims.pop(0) if self.claims else None
+        if isinstance(claim, Exception):
+            raise claim
+        return claim
+
+    async def update_one(self, query, update):
+        self.updates.append((query, update))
+
+    async def update_many(self, query, update):
+        self.updates.append((query, update))
+
+@pytest.fixture
+def worker(monkeypatch):
+    monkeypatch.setattr(settings, "extraction_worker_poll_seconds", 0)
+    worker = ExtractionWorker()
+    return worker
+
+def use_collection(monkeypatch, worker, collection):
+    monkeypatch.setattr(worker, "_collection", lambda: collection)
+
+async def test_claim_error_does_not_stop_the_worker(monkeypatch, worker):
+    collection = FakeCollection([ConnectionError("primary stepped down"), None, None])
+    use_collection(monkeypatch, worker, collection)
+
+    task = asyncio.create_task(worker.run())
+    while len(collection.claim_queries) < 3:
+        await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+async def test_failed_job_is_marked_failed(monkeypatch, worker):
+    collection = FakeCollection([{"_id": "job-1", "items": [], "application_id": None}])
+    use_collection(monkeypatch, worker, collection)
+
+    async def crash(job):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(worker, "_process", crash)
+
+    assert await worker._run_once()
+    query, update = collection.updates[-1]
+    assert query == {"_id": "job-1", "worker_id": worker.worker_id}
+    assert update["$set"]["status"] == "failed"
+    assert update["$set"]["error"] == "boom"
+
+async def test_claims_count_attempts_and_skip_exhausted_jobs(monkeypatch, worker):
+    collection = FakeCollection([None])
+    use_collection(monkeypatch, worker, collection)
+
+    assert not await worker._run_once()
+
+    exhausted_query, exhausted_update = collection.updates[0]
+    assert exhausted_query["attempts"] == {"$gte": settings.extraction_job_max_attempts}
+    assert exhausted_update["$set"]["status"] == "failed"
+
+    claim_query, claim_update = collection.claim_queries[0]
+    takeover = claim_query["$or"][1]
+    assert takeover["attempts"] == {"$lt": settings.extraction_job_max_attempts}
+    assert claim_update[0]["$set"]["attempts"] == {"$add": [{"$ifNull": ["$attempts", 0]}, 1]}
@@ -0,0 +1,77 @@
+from app.utils.guardrails import CompiledGuardrails, StreamingGuardrail, compile_guardrails
+
+def stream(guardrail: StreamingGuardrail, chunks):
+    for chunk in chunks:
+        reason = guardrail.feed(chunk)
+        if reason:
+            return reason
+    return guardrail.finish()
+
+def test_check_reports_terms_patterns_and_missing_elements():
+    guardrails = CompiledGuardrails({
+        "prohibited_terms": ["password", "SSN"],
+        "prohibited_patterns": [r"\d{3}-\d{2}-\d{4}"],
+        "required_elements": ["Summary:", "Next steps"]
+    })
+
+    issues = guardrails.check("Summary: the user's ssn is 123-45-6789")
+
+    assert issues == [
+        "Prohibited term found: SSN",
+        r"Prohibited pattern found: \d{3}-\d{2}-\d{4}",
+        "Required element missing: Next steps"
+    ]
+
+def test_clean_output_has_no_issues():
+    guardrails = CompiledGuardrails({"prohibited_terms": ["secret"], "required_elements": ["Done"]})
+    assert guardrails.check("Done. Nothing to report.") == []
+
+def test_empty_config_is_a_no_op():
+    guardrails = CompiledGuardrails({})
+    assert guardrails.is_empty
+    assert guardrails.check("anything at all") == []
+
+def test_whole_word_ignores_terms_inside_words():
+    guardrails = CompiledGuardrails({"prohibited_terms": ["ass"], "whole_word": True})
+    assert guardrails.check("a classic assessment") == []
+    assert guardrails.check("what an ass.") == ["Prohibited term found: ass"]
+
+def test_required_elements_are_case_sensitive_by_default():
+    config = {"required_elements": ["JSON"]}
+    assert CompiledGuardrails(config).check("returns json") == ["Required element missing: JSON"]
+    assert CompiledGuardrails({**config, "required_case_sensitive": False}).check("returns json") == []
+
+def test_required_element_found_when_casefold_changes_length():
+    guardrails = CompiledGuardrails({"required_elements": ["Straße"]})
+    assert guardrails.check("Große Straße 5") == []
+
+def test_compile_guardrails_shares_equal_configs():
+    first = compile_guardrails({"prohibited_terms": ["a"], "whole_word": True})
+    second = compile_guardrails({"whole_word": True, "prohibited_terms": ["a"]})
+    assert first is second
+
+def test_streaming_catches_term_split_across_chunks():
+    guardrail = StreamingGuardrail(CompiledGuardrails({"prohibited_terms": ["password"]}))
+    assert stream(guardrail, ["here is the pass", "word you asked for"]) == "Prohibited term found: password"
+
+def test_streaming_whole_word_waits_for_next_character():
+    guardrails = CompiledGuardrails({"prohibited_terms": ["ass"], "whole_word": True})
+
+    assert stream(StreamingGuardrail(guardrails), ["a cl", "ass", "ic example"]) is None
+    assert stream(StreamingGuardrail(guardrails), ["you ", "ass", " indeed"]) == "Prohibited term found: ass"
+    # A match at the very end is only decided by finish()
+    assert stream(StreamingGuardrail(guardrails), ["what an ", "ass"]) == "Prohibited term found: ass"
+
+def test_streaming_pattern_across_chunks():
+    guardrail = StreamingGuardrail(CompiledGuardrails({"prohibited_patterns": [r"\d{3}-\d{2}-\d{4}"]}))
+    assert stream(guardrail, ["id 123-4", "5-6789"]) == r"Prohibited pattern found: \d{3}-\d{2}-\d{4}"
+
+def test_streaming_format_checks():
+    empty = CompiledGuardrails({})
+
+    json_guardrail = StreamingGuardrail(empty, {"type": "json"})
+    assert stream(json_guardrail, ["  ", '{"a": 1}']) is None
+    assert stream(StreamingGuardrail(empty, {"type": "json"}), ["Sure! {"]) == (
+        "Output format does not match expected structure: expected JSON"
+    )
+    assert stream(StreamingGuardrail(empty, {"max_chars": 5}), ["abc", "def"]) == "Output exceeded 5 characters"
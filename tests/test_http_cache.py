@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core.http_cache import conditional_response, make_etag
+
+PAYLOAD = {"name": "greeting", "version": "1.0.0"}
+UPDATED_AT = datetime(2024, 5, 1, 12, 30, 15, 250000)
+
+app = FastAPI()
+
+@app.get("/resource")
+async def resource(request: Request):
+    return conditional_response(request, PAYLOAD, last_modified=UPDATED_AT)
+
+@app.get("/unversioned")
+async def unversioned(request: Request):
+    return conditional_response(request, PAYLOAD)
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+@pytest.fixture(scope="module")
+def etag(client):
+    return client.get("/resource").headers["etag"]
+
+def test_response_carries_validators(client):
+    response = client.get("/resource")
+
+    assert response.status_code == 200
+    assert response.json() == PAYLOAD
+    assert response.headers["etag"] == make_etag(b'{"name":"greeting","version":"1.0.0"}')
+    assert response.headers["cache-control"] == "private, no-cache"
+    assert response.headers["last-modified"] == "Wed, 01 May 2024 12:30:15 GMT"
+
+def test_etag_is_stable_and_content_addressed():
+    assert make_etag(b"abc") == make_etag(b"abc")
+    assert make_etag(b"abc") != make_etag(b"abd")
+
+@pytest.mark.parametrize("header", ["{etag}", "W/{etag}", '"other", {etag}', "*"])
+def test_matching_if_none_match_is_not_modified(client, etag, header):
+    response = client.get("/resource", headers={"If-None-Match": header.format(etag=etag)})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert "last-modified" in response.headers
+
+def test_stale_etag_gets_full_body(client):
+    response = client.get("/resource", headers={"If-None-Match": '"stale"'})
+
+    assert response.status_code == 200
+    assert response.json() == PAYLOAD
+
+@pytest.mark.parametrize("since,expected", [
+    ("Wed, 01 May 2024 12:30:15 GMT", 304),  # sub-second part of the timestamp is ignored
+    ("Thu, 02 May 2024 00:00:00 GMT", 304),
+    ("Wed, 01 May 2024 12:30:14 GMT", 200),
+    ("not a date", 200)
+])
+def test_if_modified_since(client, since, expected):
+    assert client.get("/resource", headers={"If-Modified-Since": since}).status_code == expected
+
+def test_if_none_match_takes_precedence(client):
+    later = (UPDATED_AT + timedelta(days=1)).strftime("%a, %d %b %Y %H:%M:%S GMT")
+    response = client.get("/resource", headers={"If-None-Match": '"stale"', "If-Modified-Since": later})
+
+    assert response.status_code == 200
+
+def test_if_modified_since_needs_last_modified(client):
+    response = client.get("/unversioned", headers={"If-Modified-Since": "Thu, 02 May 2024 00:00:00 GMT"})
+
+    assert response.status_code == 200
+    assert "last-modified" not in response.headers
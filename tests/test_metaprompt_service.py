@@ -0,0 +1,93 @@
+import pytest
+from bson import ObjectId
+
+from app.config import settings
+from app.core.cache import cache_manager
+from app.models.prompt import Prompt, PromptVersion
+from app.schemas.prompt import PromptVersionServing
+from app.services.metaprompt_service import MetapromptService
+from tests.fakes import FakeCollection, FakeRedis
+
+APPLICATION_ID = ObjectId()
+
+class FakeVersionQuery:
+    def __init__(self, versions):
+        self._versions = versions
+
+    def project(self, model):
+        return self
+
+    async def to_list(self):
+        return self._versions
+
+class FakeLLM:
+    def __init__(self):
+        self.prompts = []
+
+    async def generate(self, prompt, model, **kwargs):
+        self.prompts.append(prompt)
+        return f"Enhanced #{len(self.prompts)}"
+
+@pytest.fixture
+def prompts(monkeypatch):
+    prompt_ids = sorted(ObjectId() for _ in range(7))
+    prompts = FakeCollection([
+        {"_id": prompt_id, "application_id": APPLICATION_ID, "is_active": True, "current_version": "1.0.0"}
+        for prompt_id in prompt_ids
+    ])
+    monkeypatch.setattr(Prompt, "get_motor_collection", lambda: prompts)
+
+    def find_versions(query):
+        return FakeVersionQuery([
+            PromptVersionServing(
+                _id=ObjectId(), prompt_id=current["prompt_id"], version=current["version"],
+                content=f"Prompt {current['prompt_id']}"
+            )
+            for current in query["$or"]
+        ])
+
+    monkeypatch.setattr(PromptVersion, "find", find_versions)
+    monkeypatch.setattr(cache_manager, "redis", FakeRedis())
+    monkeypatch.setattr(settings, "metaprompt_batch_page_size", 3)
+    return [str(prompt_id) for prompt_id in prompt_ids]
+
+@pytest.fixture
+def service():
+    service = MetapromptService()
+    service.llm_service = FakeLLM()
+    return service
+
+async def boost_all(service, **kwargs):
+    pages, cursor = [], None
+    while True:
+        page = await service.boost_application(str(APPLICATION_ID), {}, cursor=cursor, **kwargs)
+        pages.append(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+async def test_batch_is_paged_by_prompt_id(prompts, service):
+    pages = await boost_all(service)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [item["prompt_id"] for page in pages for item in page] == prompts
+    assert all(item["status"] == "success" and not item["cached"] for page in pages for item in page)
+
+async def test_limit_is_capped_at_the_page_size(prompts, service):
+    page = await service.boost_application(str(APPLICATION_ID), {}, limit=100)
+    assert len(page["items"]) == 3
+    assert page["next_cursor"] == prompts[2]
+
+async def test_prompt_ids_are_paged_too(prompts, service):
+    chosen = prompts[1:6]
+    pages = await boost_all(service, prompt_ids=chosen, limit=2)
+    assert [item["prompt_id"] for page in pages for item in page] == chosen
+
+async def test_second_pass_is_served_from_cache(prompts, service):
+    await boost_all(service)
+    generated = len(service.llm_service.prompts)
+
+    pages = await boost_all(service)
+
+    assert len(service.llm_service.prompts) == generated
+    assert all(item["cached"] for page in pages for item in page)
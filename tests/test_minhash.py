@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from app.utils.minhash import LSHIndex, MinHasher, jaccard
+
+BASE = (
+    "You are a support assistant. Summarize the customer's ticket in two "
+    "sentences, then list the product areas it mentions and suggest a priority."
+)
+
+@pytest.fixture(scope="module")
+def hasher():
+    return MinHasher(num_perm=128)
+
+def test_signature_is_deterministic(hasher):
+    assert np.array_equal(hasher.signature(BASE), MinHasher(num_perm=128).signature(BASE))
+
+def test_signature_ignores_case_and_punctuation(hasher):
+    assert jaccard(hasher.signature(BASE), hasher.signature(BASE.upper().replace(",", ""))) == 1.0
+
+def test_similar_texts_score_higher_than_unrelated(hasher):
+    edited = BASE.replace("two sentences", "three sentences")
+    unrelated = "Translate the following paragraph into French and keep the original formatting intact."
+
+    similar = jaccard(hasher.signature(BASE), hasher.signature(edited))
+    different = jaccard(hasher.signature(BASE), hasher.signature(unrelated))
+
+    assert similar > 0.6
+    assert different < 0.2
+
+def test_short_and_empty_texts(hasher):
+    assert jaccard(hasher.signature("hi there"), hasher.signature("Hi there!")) == 1.0
+    empty = hasher.signature("")
+    assert empty.shape == (128,)
+    assert jaccard(empty, hasher.signature(BASE)) == 0.0
+
+def test_bands_must_divide_num_perm():
+    with pytest.raises(ValueError):
+        LSHIndex(num_perm=128, bands=30)
+
+def test_index_query_add_and_remove(hasher):
+    index = LSHIndex(num_perm=128, bands=32)
+    index.add("base", hasher.signature(BASE))
+    index.add("other", hasher.signature("Write a haiku about autumn leaves falling on a quiet pond."))
+
+    matches = index.query(hasher.signature(BASE.replace("priority", "severity")), threshold=0.6)
+    assert [key for key, _ in matches] == ["base"]
+
+    index.remove("base")
+    assert len(index) == 1
+    assert index.query(hasher.signature(BASE), threshold=0.6) == []
+    assert all(index.buckets)  # "other" is still in every band
+    assert not any("base" in bucket for band in index.buckets for bucket in band.values())
+
+def test_index_add_replaces_existing_signature(hasher):
+    index = LSHIndex(num_perm=128, bands=32)
+    index.add("v1", hasher.signature(BASE))
+    index.add("v1", hasher.signature("Completely different wording about invoices and refunds for customers."))
+
+    assert len(index) == 1
+    assert index.query(hasher.signature(BASE), threshold=0.6) == []
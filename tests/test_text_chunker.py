@@ -0,0 +1,56 @@
+# tests/test_text_chunker.py
+from app.utils.text_chunker import chunk_text
+
+def paragraphs(count, length=90):
+    return [f"Paragraph {i} " + "x" * (length - len(f"Paragraph {i} ")) for i in range(count)]
+
+def test_short_text_is_one_chunk():
+    assert chunk_text("hello world", chunk_size=100) == ["hello world"]
+
+def test_blank_text_has_no_chunks():
+    assert chunk_text("   \n\n  ", chunk_size=100) == []
+    assert chunk_text("", chunk_size=100) == []
+
+def test_chunks_respect_size_and_paragraph_boundaries():
+    paras = paragraphs(20)
+    chunks = chunk_text("\n\n".join(paras), chunk_size=400, overlap=0)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 400 for chunk in chunks)
+    # No paragraph is split across chunks
+    for chunk in chunks:
+        for part in chunk.split("\n"):
+            assert part in paras
+
+def test_every_paragraph_is_covered_in_order():
+    paras = paragraphs(30)
+    chunks = chunk_text("\n\n".join(paras), chunk_size=500, overlap=100)
+
+    seen = []
+    for chunk in chunks:
+        for part in chunk.split("\n"):
+            if part not in seen:
+                seen.append(part)
+    assert seen == paras
+
+def test_consecutive_chunks_overlap():
+    chunks = chunk_text("\n\n".join(paragraphs(30)), chunk_size=500, overlap=200)
+
+    for previous, current in zip(chunks, chunks[1:]):
+        shared = set(previous.split("\n")) & set(current.split("\n"))
+        assert shared
+        assert sum(len(part) + 1 for part in shared) <= 200
+
+def test_long_paragraph_splits_on_sentences():
+    sentence = "This is a sentence that is forty chars."
+    text = " ".join([sentence] * 20)
+    chunks = chunk_text(text, chunk_size=200, overlap=0)
+
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert all(part == sentence for chunk in chunks for part in chunk.split("\n"))
+
+def test_unbroken_text_is_hard_sliced():
+    chunks = chunk_text("a" * 1000, chunk_size=300, overlap=0)
+
+    assert all(len(chunk) <= 300 for chunk in chunks)
+    assert "".join(chunks) == "a" * 1000
@@ -0,0 +1,54 @@
+import pytest
+
+from app.utils.text_delta import apply_delta, delta_size, make_delta, text_diff
+
+SNAPSHOT = "You are a helpful assistant.\nAnswer in {language}.\nBe concise.\n"
+
+@pytest.mark.parametrize("target", [
+    SNAPSHOT,
+    SNAPSHOT.replace("concise", "thorough"),
+    "Preamble line.\n" + SNAPSHOT,
+    SNAPSHOT + "Cite your sources.",
+    "Answer in {language}.\n",
+    "",
+    "Completely rewritten\nprompt without a trailing newline",
+])
+def test_snapshot_plus_delta_round_trips(target):
+    assert apply_delta(SNAPSHOT, make_delta(SNAPSHOT, target)) == target
+
+def test_round_trip_from_empty_or_missing_base():
+    assert apply_delta(None, make_delta(None, "new body\n")) == "new body\n"
+    assert apply_delta("", make_delta("", "new body")) == "new body"
+
+def test_none_target_is_preserved():
+    assert make_delta(SNAPSHOT, None) is None
+    assert apply_delta(SNAPSHOT, None) is None
+
+def test_small_edit_delta_is_smaller_than_text():
+    base = "".join(f"Rule {i}: keep answers factual.\n" for i in range(50))
+    target = base.replace("Rule 25:", "Rule 25 (revised):")
+    delta = make_delta(base, target)
+
+    assert delta_size(delta) < len(target) / 10
+    assert apply_delta(base, delta) == target
+
+def test_unchanged_text_is_a_single_copy():
+    assert make_delta(SNAPSHOT, SNAPSHOT) == [3]
+    assert delta_size(None) == 0
+
+def test_deltas_against_one_snapshot_rebuild_each_version():
+    # Every delta applies to the snapshot, never to another delta
+    versions = [SNAPSHOT]
+    for i in range(5):
+        versions.append(versions[-1] + f"Extra instruction {i}.\n")
+    deltas = [make_delta(SNAPSHOT, version) for version in versions]
+
+    assert [apply_delta(SNAPSHOT, delta) for delta in deltas] == versions
+
+def test_text_diff_labels_and_changes():
+    diff = text_diff(SNAPSHOT, SNAPSHOT.replace("concise", "thorough"), "1.0.0", "1.1.0")
+
+    assert diff.startswith("--- 1.0.0\n+++ 1.1.0\n")
+    assert "-Be concise.\n" in diff
+    assert "+Be thorough.\n" in diff
+    assert text_diff(None, None, "a", "b") == ""
@@ -0,0 +1,115 @@
+import pytest
+
+from app.core.exceptions import ContextWindowExceededError
+from app.services.llm_service import LLMService
+from app.utils import tokens
+from app.utils.tokens import count_prompt_tokens, count_tokens, count_tokens_batch, trim_to_tokens
+
+class ByteEncoding:
+    """One token per UTF-8 byte; decoding a split character yields U+FFFD, as tiktoken does"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode_ordinary(self, text):
+        self.calls += 1
+        return list(text.encode())
+
+    def encode_ordinary_batch(self, texts, num_threads=8):
+        return [self.encode_ordinary(text) for text in texts]
+
+    def decode(self, tokens):
+        return bytes(tokens).decode("utf-8", errors="replace")
+
+@pytest.fixture(autouse=True)
+def encoding(monkeypatch):
+    fake = ByteEncoding()
+    monkeypatch.setattr(tokens, "get_encoding", lambda provider, model: fake)
+    tokens._count_cache.clear()
+    yield fake
+    tokens._count_cache.clear()
+
+def test_anthropic_counts_are_padded():
+    assert count_tokens("a" * 10, "openai", "gpt-4") == 10
+    assert count_tokens("a" * 10, "anthropic", "claude-3-sonnet") == 11
+    assert count_tokens("", "anthropic", "claude-3-sonnet") == 0
+
+def test_cache_is_keyed_on_a_digest(encoding):
+    text = "You are a careful assistant. " * 20
+    count_tokens(text, "openai", "gpt-4")
+    count_tokens(text, "openai", "gpt-4")
+
+    assert encoding.calls == 1
+    assert all(text not in key for key in tokens._count_cache._counts)
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(tokens._count_cache, "maxsize", 2)
+    for text in ("one", "two", "three"):
+        count_tokens(text, "openai", "gpt-4")
+    assert len(tokens._count_cache._counts) == 2
+
+@pytest.mark.parametrize("provider", ["openai", "anthropic"])
+def test_batch_matches_single_counts(provider, encoding):
+    texts = ["short", "", "a" * 37, "naïve café", "short"]
+    expected = [count_tokens(text, provider, "model") for text in texts]
+    tokens._count_cache.clear()
+
+    assert count_tokens_batch(texts, provider, "model") == expected
+    calls = encoding.calls
+    assert count_tokens_batch(texts, provider, "model") == expected
+    assert encoding.calls == calls  # second batch served from the cache
+
+@pytest.mark.parametrize("provider", ["openai", "anthropic"])
+@pytest.mark.parametrize("max_tokens", [1, 10, 11, 21, 33, 187, 363, 500])
+def test_trimmed_text_fits_by_count_tokens(provider, max_tokens):
+    text = "a" * 400
+    trimmed = trim_to_tokens(text, max_tokens, provider, "model")
+
+    assert count_tokens(trimmed, provider, "model") <= max_tokens
+    assert text.startswith(trimmed)
+    if trimmed != text:
+        # Nothing more could have been kept
+        assert count_tokens(text[:len(trimmed) + 1], provider, "model") > max_tokens
+
+def test_trim_backs_off_a_split_character():
+    text = "a" * 9 + "é"  # 11 bytes; a 10-byte cut splits the é
+    trimmed = trim_to_tokens(text, 10, "openai", "gpt-4")
+
+    assert trimmed == "a" * 9
+    assert count_tokens(trimmed, "openai", "gpt-4") <= 10
+
+def test_trim_keeps_text_that_already_fits():
+    assert trim_to_tokens("fits", 10, "anthropic", "claude-3-sonnet") == "fits"
+    assert trim_to_tokens("anything", 0, "openai", "gpt-4") == ""
+
+@pytest.mark.parametrize("provider,model", [("openai", "gpt-4"), ("anthropic", "claude-3-sonnet")])
+def test_preflight_trim_agrees_with_its_own_count(provider, model):
+    llm = LLMService()
+    llm.model_configs[provider][model]["context_window"] = 120
+    system_prompt = "Answer briefly."
+    prompt = "word " * 200
+
+    result = llm.preflight(prompt, provider, model, system_prompt=system_prompt, max_tokens=40, overflow="trim")
+
+    assert result["trimmed"]
+    assert result["input_tokens"] == count_prompt_tokens(result["prompt"], provider, model, system_prompt)
+    assert result["input_tokens"] + 40 <= 120
+    assert prompt.startswith(result["prompt"])
+
+def test_preflight_rejects_by_default():
+    llm = LLMService()
+    llm.model_configs["openai"]["gpt-4"]["context_window"] = 50
+
+    with pytest.raises(ContextWindowExceededError):
+        llm.preflight("word " * 100, "openai", "gpt-4", max_tokens=10, overflow="reject")
+
+def test_preflight_batch_matches_preflight():
+    llm = LLMService()
+    prompts = ["Summarize this.", "", "word " * 30]
+    batch = llm.preflight_batch(prompts, "anthropic", "claude-3-sonnet", system_prompt="Be terse.", max_tokens=100)
+    single = [
+        llm.preflight(prompt, "anthropic", "claude-3-sonnet", system_prompt="Be terse.", max_tokens=100)
+        for prompt in prompts
+    ]
+
+    assert [estimate["input_tokens"] for estimate in batch] == [result["input_tokens"] for result in single]
@@ -0,0 +1,234 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from app.core.cache import cache_manager
+from app.models.prompt import PromptVersion
+from app.services.version_store import VersionStore
+from tests.fakes import FakeCollection, FakeRedis
+
+PROMPT_ID = ObjectId()
+BASE_CONTENT = "\n".join(f"Step {number}: follow the support playbook carefully." for number in range(1, 21))
+
+@pytest.fixture
+def collection(monkeypatch):
+    collection = FakeCollection()
+    monkeypatch.setattr(PromptVersion, "get_motor_collection", lambda: collection)
+    monkeypatch.setattr(cache_manager, "redis", FakeRedis())
+    return collection
+
+@pytest.fixture
+def store():
+    store = VersionStore()
+    store.snapshot_interval = 20
+    return store
+
+def new_version(content, system_prompt="Be concise.", **fields):
+    return PromptVersion.model_construct(
+        prompt_id=PROMPT_ID,
+        version=f"1.0.{len(content)}",
+        content=content,
+        system_prompt=system_prompt,
+        metaprompt=None,
+        **fields
+    )
+
+async def insert(store, collection, version):
+    """What PromptVersion.insert does around the database write"""
+    async def write():
+        version.id = ObjectId()
+        collection.docs.append({
+            "_id": version.id,
+            "prompt_id": version.prompt_id,
+            "sequence": version.sequence,
+            "storage": version.storage,
+            "base_version_id": version.base_version_id,
+            "deltas": version.deltas,
+            "content": version.content,
+            "system_prompt": version.system_prompt,
+            "metaprompt": version.metaprompt,
+            "created_at": datetime.utcnow() + timedelta(microseconds=len(collection.docs))
+        })
+
+    await store.prepare_insert(version)
+    await write()
+    store.restore(version)
+    return version
+
+def stored(collection, version):
+    return next(doc for doc in collection.docs if doc["_id"] == version.id)
+
+def loaded(collection, version):
+    """A PromptVersion as read back from the database"""
+    doc = stored(collection, version)
+    return PromptVersion.model_construct(**{**doc, "id": doc["_id"]})
+
+async def bodies(store, version):
+    await cache_manager.redis.delete(store._cache_key(version.id))
+    return await store.get_bodies(version.id)
+
+async def test_versions_between_snapshots_are_stored_as_deltas(store, collection):
+    first = await insert(store, collection, new_version(BASE_CONTENT))
+    edited = BASE_CONTENT.replace("Step 7:", "Step 7 (new):")
+    second = await insert(store, collection, new_version(edited))
+
+    assert (first.sequence, second.sequence) == (0, 1)
+    assert stored(collection, first)["storage"] == "full"
+    doc = stored(collection, second)
+    assert doc["storage"] == "delta"
+    assert doc["base_version_id"] == first.id
+    assert doc["content"] == "" and doc["system_prompt"] is None
+    # The in-memory instance keeps its bodies after the write
+    assert second.content == edited
+    assert await bodies(store, second) == {"content": edited, "system_prompt": "Be concise.", "metaprompt": None}
+
+async def test_deltas_always_apply_to_the_nearest_snapshot(store, collection):
+    first = await insert(store, collection, new_version(BASE_CONTENT))
+    await insert(store, collection, new_version(BASE_CONTENT + "\nStep 21: close the ticket."))
+    third = await insert(store, collection, new_version(BASE_CONTENT + "\nStep 21: escalate."))
+
+    assert stored(collection, third)["base_version_id"] == first.id
+
+async def test_snapshot_interval_and_rewrites_store_full_bodies(store, collection):
+    store.snapshot_interval = 2
+    await insert(store, collection, new_version(BASE_CONTENT))
+    await insert(store, collection, new_version(BASE_CONTENT + "\nStep 21: close."))
+    on_interval = await insert(store, collection, new_version(BASE_CONTENT + "\nStep 21: escalate."))
+    rewrite = await insert(store, collection, new_version("Completely different instructions."))
+
+    assert stored(collection, on_interval)["storage"] == "full"
+    assert stored(collection, rewrite)["storage"] == "full"
+
+async def test_editing_a_snapshot_rebases_its_deltas(store, collection):
+    first = await insert(store, collection, new_version(BASE_CONTENT))
+    dependent_content = BASE_CONTENT + "\nStep 21: close the ticket."
+    dependent = await insert(store, collection, new_version(dependent_content))
+
+    snapshot = loaded(collection, first)
+    snapshot.content = BASE_CONTENT.replace("Step 1:", "First:")
+    await store.prepare_update(snapshot)
+    stored(collection, first)["content"] = snapshot.content
+
+    assert (await bodies(store, dependent))["content"] == dependent_content
+
+async def test_materialize_fills_blank_bodies_but_keeps_assignments(store, collection):
+    await insert(store, collection, new_version(BASE_CONTENT))
+    edited = BASE_CONTENT + "\nStep 21: close the ticket."
+    delta = await insert(store, collection, new_version(edited))
+
+    version = loaded(collection, delta)
+    version.system_prompt = "Be thorough."
+    await store.materialize(version)
+
+    assert version.content == edited
+    assert version.system_prompt == "Be thorough."
+    assert version._materialized
+
+async def test_saving_a_loaded_delta_only_replaces_assigned_bodies(store, collection):
+    await insert(store, collection, new_version(BASE_CONTENT))
+    edited = BASE_CONTENT + "\nStep 21: close the ticket."
+    delta = await insert(store, collection, new_version(edited))
+
+    version = loaded(collection, delta)
+    version.system_prompt = None
+    await store.prepare_update(version)
+    stored(collection, delta)["deltas"] = version.deltas
+
+    assert await bodies(store, delta) == {"content": edited, "system_prompt": None, "metaprompt": None}
+
+async def test_insert_retries_when_a_concurrent_insert_took_the_sequence(store, collection):
+    await insert(store, collection, new_version(BASE_CONTENT))
+    content = BASE_CONTENT + "\nStep 21: close the ticket."
+    version = new_version(content)
+    attempts = []
+
+    async def racing_insert():
+        await store.prepare_insert(version)
+        attempts.append((version.sequence, version.storage, version.content))
+        if len(attempts) == 1:
+            # Another writer commits sequence 1 first
+            await insert(store, collection, new_version(BASE_CONTENT + "\nStep 21: escalate."))
+            raise DuplicateKeyError("E11000 duplicate key error index: prompt_id_1_sequence_1_partial")
+        return version
+
+    assert await store.insert_with_retry(version, racing_insert) is version
+    assert [(sequence, storage) for sequence, storage, _ in attempts] == [(1, "delta"), (2, "delta")]
+    # Each attempt compressed the full bodies, not the previous attempt's blanks
+    assert version._stored_bodies["content"] == content
+
+async def test_insert_reraises_other_duplicate_keys(store, collection):
+    async def duplicate_version():
+        raise DuplicateKeyError("E11000 duplicate key error index: prompt_id_1_version_1")
+
+    with pytest.raises(DuplicateKeyError):
+        await store.insert_with_retry(new_version(BASE_CONTENT), duplicate_version)
+
+async def test_deleting_a_snapshot_promotes_its_first_delta(store, collection):
+    first = await insert(store, collection, new_version(BASE_CONTENT))
+    contents = [BASE_CONTENT + f"\nStep 21: option {number}." for number in range(3)]
+    dependents = [await insert(store, collection, new_version(content)) for content in contents]
+
+    await store.prepare_delete(loaded(collection, first))
+    collection.docs.remove(stored(collection, first))
+
+    promoted = stored(collection, dependents[0])
+    assert promoted["storage"] == "full" and promoted["base_version_id"] is None
+    assert all(stored(collection, version)["base_version_id"] == dependents[0].id for version in dependents[1:])
+    for version, content in zip(dependents, contents):
+        assert (await bodies(store, version))["content"] == content
+
+async def test_missing_snapshot_is_reported(store, collection):
+    first = await insert(store, collection, new_version(BASE_CONTENT))
+    delta = await insert(store, collection, new_version(BASE_CONTENT + "\nStep 21: close."))
+    collection.docs.remove(stored(collection, first))
+
+    with pytest.raises(ValueError, match="is missing"):
+        await bodies(store, delta)
+
+class LegacyCollection(FakeCollection):
+    """A prompt_versions collection from before sequences, with the unfiltered index"""
+
+    def __init__(self, docs):
+        super().__init__(docs)
+        self.dropped = []
+
+    async def index_information(self):
+        return {
+            "_id_": {"key": [("_id", 1)]},
+            "prompt_id_1_sequence_1": {"key": [("prompt_id", 1), ("sequence", 1)], "unique": True}
+        }
+
+    async def drop_index(self, name):
+        self.dropped.append(name)
+
+    def aggregate(self, pipeline):
+        # Prompts with a missing or duplicated sequence
+        counts = {}
+        for doc in self.docs:
+            key = (doc["prompt_id"], doc.get("sequence"))
+            counts[key] = counts.get(key, 0) + 1
+        return FakeCollection([
+            {"_id": prompt_id} for prompt_id in {
+                prompt_id for (prompt_id, sequence), count in counts.items()
+                if count > 1 or sequence is None
+            }
+        ]).find()
+
+async def test_backfill_numbers_legacy_versions_in_creation_order(store):
+    numbered = ObjectId()
+    start = datetime(2024, 1, 1)
+    docs = [
+        {"_id": ObjectId(), "prompt_id": PROMPT_ID, "created_at": start + timedelta(days=2)},
+        {"_id": ObjectId(), "prompt_id": PROMPT_ID, "created_at": start, "sequence": 0},
+        {"_id": ObjectId(), "prompt_id": PROMPT_ID, "created_at": start + timedelta(days=1), "sequence": 0},
+        {"_id": ObjectId(), "prompt_id": numbered, "created_at": start, "sequence": 0},
+        {"_id": ObjectId(), "prompt_id": numbered, "created_at": start + timedelta(days=1), "sequence": 5}
+    ]
+    collection = LegacyCollection(docs)
+
+    await store.backfill_sequences(collection)
+
+    assert collection.dropped == ["prompt_id_1_sequence_1"]
+    assert [doc.get("sequence") for doc in collection.docs] == [2, 0, 1, 0, 5]
@@ -0,0 +1,74 @@
+import pytest
+
+from app.config import settings
+from app.core.warmup import WarmupManager
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "warmup_max_attempts", 3)
+    monkeypatch.setattr(settings, "warmup_retry_seconds", 0)
+
+async def ok():
+    pass
+
+async def broken():
+    raise RuntimeError("no model")
+
+async def finish(manager: WarmupManager):
+    manager.start()
+    await manager._task
+
+def test_ready_when_warmup_disabled():
+    manager = WarmupManager()
+    manager.register("tokenizers", broken)
+
+    assert manager.is_ready
+    assert manager.status()["warmup"] == "disabled"
+
+async def test_pending_steps_hold_readiness_until_loaded():
+    manager = WarmupManager()
+    manager.register("tokenizers", ok)
+    manager.register("embedder", ok, required=False)
+    manager._started = True
+    assert not manager.is_ready
+
+    await finish(manager)
+    assert manager.is_ready
+    assert manager.status()["degraded"] == []
+
+async def test_failed_optional_step_is_degraded_not_blocking():
+    manager = WarmupManager()
+    manager.register("tokenizers", ok)
+    manager.register("embedder", broken, required=False)
+
+    await finish(manager)
+
+    assert manager.is_ready
+    assert manager.status()["degraded"] == ["embedder"]
+    assert manager.status()["components"]["embedder"]["attempts"] == 3
+
+async def test_failed_required_step_blocks_readiness():
+    manager = WarmupManager()
+    manager.register("tokenizers", broken)
+
+    await finish(manager)
+
+    assert not manager.is_ready
+    assert manager.status()["components"]["tokenizers"]["status"] == "failed"
+
+async def test_failed_step_is_retried():
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 2:
+            raise RuntimeError("download timed out")
+
+    manager = WarmupManager()
+    manager.register("tokenizers", flaky)
+    await finish(manager)
+
+    assert manager.is_ready
+    assert manager.status()["components"]["tokenizers"] == {
+        "status": "ready", "attempts": 2, "duration_ms": pytest.approx(0, abs=50), "error": None
+    }